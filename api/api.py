@@ -1,35 +1,103 @@
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from functools import partial
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-import pickle
+from pydantic import BaseModel, Field, ValidationInfo, field_validator, model_validator
 import numpy as np
-from typing import Optional
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional
 import os
+import sys
 
-# Load the saved model and scaler using pickle
-model_path = os.path.join(os.path.dirname(__file__), '..', 'summative', 'linear_regression', 'best_model.pkl')
-scaler_path = os.path.join(os.path.dirname(__file__), '..', 'summative', 'linear_regression', 'scaler.pkl')
-feature_columns_path = os.path.join(os.path.dirname(__file__), '..', 'summative', 'linear_regression', 'feature_columns.pkl')
-
-try:
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
-    with open(scaler_path, 'rb') as f:
-        scaler = pickle.load(f)
-    with open(feature_columns_path, 'rb') as f:
-        feature_columns = pickle.load(f)
-    print("✅ Model loaded successfully using pickle!")
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    model = None
-    scaler = None
-    feature_columns = None
+# Make the `api` package importable when running `python api.py` from this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.batcher import MicroBatcher
+from api.bulk import BULK_FORMATS, MEDIA_TYPES, BulkScorer, DuplexStreamingResponse
+from api.cache import PredictionCache
+from api.calendar_table import CALENDAR_DATA_PATH, CALENDAR_LAST_DAY, WEATHER_FEATURES, CalendarTable, DateOutOfRange
+from api.executor import ExecutorSaturated, InferenceExecutor, ModelVersionMismatch
+from api.climatology import CLIMATOLOGY_DIR, ClimatologyIndex, load_climatology
+from api.forecast import (FORECAST_SCENARIOS, MAX_FORECAST_DAYS, constant_weather, forecast_dates,
+                          stream_forecast_json)
+from api.features import HOURLY_RAW_FEATURES, RAW_FEATURES, RAW_INDEX, raw_from_records
+from api.metrics import Metrics, MetricsMiddleware, current_timer
+from api.bundle import HOURLY_ARTIFACT_DIR, HOURLY_BUNDLE_DIR
+from api.registry import ModelRegistry
+from api.validation import BatchValidator, holiday_workingday_conflict
+
+# The model is loaded in the lifespan, not at import time. MODEL_BACKEND="auto"
+# serves the memory-mapped model bundle when it exists and falls back to the
+# pickle files, "sklearn" always uses the pickles. The registry can swap in a
+# retrained model without a restart (MODEL_WATCH_SECONDS or POST /models/reload).
+model_registry = ModelRegistry.from_env()
+
+# The hourly model (hour.csv) behind /predict/hourly, loaded and reloaded the same way
+hourly_registry = ModelRegistry.from_env(
+    bundle_dir=os.environ.get('HOURLY_MODEL_BUNDLE_DIR', HOURLY_BUNDLE_DIR),
+    artifact_dir=HOURLY_ARTIFACT_DIR,
+    lookup_mode='off'
+)
+
+# Recent predictions by rounded input (PREDICTION_CACHE_SIZE=0 turns the cache off)
+prediction_cache = PredictionCache.from_env()
+
+# Pool the models run on, so predictions do not block the event loop
+# (INFERENCE_EXECUTOR=thread|process|inline, INFERENCE_WORKERS, INFERENCE_MAX_PENDING)
+inference_executor = InferenceExecutor.from_env()
+
+# Concurrent /predict requests are scored together in one vectorized call
+# (BATCH_MAX_SIZE rows or BATCH_MAX_WAIT_MS; BATCH_MAX_SIZE=1 turns it off)
+micro_batcher = MicroBatcher.from_env(partial(inference_executor.predict, model_registry))
+
+# Per-stage timings and request counters for GET /metrics (METRICS_ENABLED=1 turns them on)
+metrics = Metrics.from_env()
+
+# Calendar inputs (season, holiday, working day, ...) of each date, for the date-keyed
+# endpoints; built at startup from CALENDAR_DATA_PATH (default: day.csv) and extended by
+# rule up to CALENDAR_LAST_DAY
+calendar_table: Optional[CalendarTable] = None
+
+# Typical weather by day of year and hour, memory-mapped from CLIMATOLOGY_DIR (built with
+# `python -m api.climatology`); fills in weather fields date-keyed requests leave out
+climatology_index: Optional[ClimatologyIndex] = None
+
+def load_date_tables():
+    global calendar_table, climatology_index
+    if calendar_table is None:
+        path = os.environ.get('CALENDAR_DATA_PATH', CALENDAR_DATA_PATH)
+        try:
+            calendar_table = CalendarTable.from_csv(path, os.environ.get('CALENDAR_LAST_DAY', CALENDAR_LAST_DAY))
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️  Calendar table not available ({path}): {e}")
+    if climatology_index is None:
+        path = os.environ.get('CLIMATOLOGY_DIR', CLIMATOLOGY_DIR)
+        try:
+            climatology_index = load_climatology(path)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️  Climatology index not available ({path}): {e}")
+
+# When set, POST /models/reload requires this value in the X-Admin-Token header
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await model_registry.startup()
+    await hourly_registry.startup()
+    load_date_tables()
+    inference_executor.start([model_registry, hourly_registry])
+    yield
+    inference_executor.shutdown()
+    await hourly_registry.shutdown()
+    await model_registry.shutdown()
 
 app = FastAPI(
     title="Bike Sharing Demand Prediction API",
     description="API for predicting bike rental demand based on weather and temporal features",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -41,6 +109,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 # Pydantic model for input validation
 class BikeRentalRequest(BaseModel):
     season: int = Field(..., ge=1, le=4, description="Season (1=spring, 2=summer, 3=fall, 4=winter)")
@@ -58,25 +129,130 @@ class BikeRentalRequest(BaseModel):
     month: int = Field(..., ge=1, le=12, description="Month (1-12)")
     day_of_week: int = Field(..., ge=0, le=6, description="Day of week (0-6)")
 
-    @validator('workingday')
-    def validate_workingday(cls, v, values):
-        if 'holiday' in values and values['holiday'] == 1 and v == 1:
+    # weekday is declared before workingday, so a weekday/workingday check on weekday
+    # never saw workingday and never fired; it is not enforced (it would also reject
+    # public holidays that fall on a weekday)
+    @field_validator('workingday')
+    @classmethod
+    def validate_workingday(cls, v: int, info: ValidationInfo) -> int:
+        if holiday_workingday_conflict(info.data.get('holiday'), v):
             raise ValueError('Working day cannot be 1 when holiday is 1')
         return v
 
-    @validator('weekday')
-    def validate_weekday_workingday(cls, v, values):
-        if 'workingday' in values:
-            if values['workingday'] == 1 and v in [0, 6]:  # Sunday or Saturday
-                raise ValueError('Working day cannot be 1 on weekends (weekday 0 or 6)')
-            elif values['workingday'] == 0 and v in [1, 2, 3, 4, 5]:  # Weekdays
-                raise ValueError('Working day cannot be 0 on weekdays (weekday 1-5)')
-        return v
+# Validates /predict/batch records column-wise, with the rules of BikeRentalRequest
+batch_validator = BatchValidator(BikeRentalRequest, RAW_FEATURES,
+                                 [(holiday_workingday_conflict, ('holiday', 'workingday'))])
+
+# Rows of an hourly bulk upload, where the hour is required
+class HourlyRecord(BikeRentalRequest):
+    hr: int = Field(..., ge=0, le=23, description="Hour of day (0-23)")
+
+hourly_batch_validator = BatchValidator(HourlyRecord, HOURLY_RAW_FEATURES,
+                                        [(holiday_workingday_conflict, ('holiday', 'workingday'))])
 
 class BikeRentalResponse(BaseModel):
     predicted_rentals: int
     confidence: float
     message: str
+    model_version: Optional[str] = None
+
+# Weather of a date-keyed request; fields left out take the date's typical weather from the climatology index
+class WeatherInputs(BaseModel):
+    weathersit: Optional[int] = Field(None, ge=1, le=4, description="Weather situation (1=clear, 2=mist, 3=light rain/snow, 4=heavy rain/snow)")
+    temp: Optional[float] = Field(None, ge=0.0, le=1.0, description="Normalized temperature (0-1)")
+    atemp: Optional[float] = Field(None, ge=0.0, le=1.0, description="Normalized feeling temperature (0-1)")
+    hum: Optional[float] = Field(None, ge=0.0, le=1.0, description="Normalized humidity (0-1)")
+    windspeed: Optional[float] = Field(None, ge=0.0, le=1.0, description="Normalized wind speed (0-1)")
+
+    def values(self) -> List[Optional[float]]:
+        return [getattr(self, name) for name in WEATHER_FEATURES]
+
+class DatedBikeRentalRequest(WeatherInputs):
+    dteday: date = Field(..., description="Date (YYYY-MM-DD); the calendar inputs are derived from it")
+
+class ForecastRequest(BaseModel):
+    start: date = Field(..., description="First day of the forecast (YYYY-MM-DD)")
+    end: date = Field(..., description="Last day of the forecast, inclusive")
+    scenario: Literal[FORECAST_SCENARIOS] = Field(
+        "climatology", description="constant: `weather` on every day; daily: one `daily_weather` entry per day; "
+                                   "climatology: the typical weather of each day of the year")
+    weather: Optional[WeatherInputs] = Field(None, description="Weather of every day (constant scenario)")
+    daily_weather: Optional[List[WeatherInputs]] = Field(None, max_length=MAX_FORECAST_DAYS,
+                                                         description="Weather of each day (daily scenario)")
+
+    @model_validator(mode='after')
+    def check_range_and_scenario(self):
+        days = (self.end - self.start).days + 1
+        if days < 1:
+            raise ValueError('end must not be before start')
+        if days > MAX_FORECAST_DAYS:
+            raise ValueError(f'A forecast covers at most {MAX_FORECAST_DAYS} days')
+        if self.scenario == 'constant' and self.weather is None:
+            raise ValueError("The constant scenario needs `weather`")
+        if self.scenario == 'daily' and (self.daily_weather is None or len(self.daily_weather) != days):
+            raise ValueError(f"The daily scenario needs one `daily_weather` entry per day ({days})")
+        return self
+
+class HourlyBikeRentalRequest(BikeRentalRequest):
+    hr: Optional[int] = Field(None, ge=0, le=23,
+                              description="Hour of day (0-23); omit it to get the whole 24-hour profile")
+
+class HourlyPrediction(BaseModel):
+    hr: int
+    predicted_rentals: int
+
+class HourlyPredictionResponse(BaseModel):
+    predictions: List[HourlyPrediction]
+    total_rentals: int
+    peak_hour: int
+    confidence: float
+    model_version: Optional[str] = None
+
+class BatchPredictionRequest(BaseModel):
+    # Records are validated in the endpoint, column-wise by `batch_validator`,
+    # with pydantic only for the records that fail a check, so a bad row is
+    # reported back instead of rejecting the whole batch with a 422.
+    records: List[Dict[str, Any]] = Field(..., min_length=1, max_length=10000,
+                                          description="List of BikeRentalRequest records")
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    predicted_rentals: int
+    confidence: float
+
+class BatchPredictionError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[BatchPredictionItem]
+    errors: List[BatchPredictionError]
+    total: int
+    succeeded: int
+    failed: int
+    model_version: Optional[str] = None
+
+def saturated(e: Exception) -> HTTPException:
+    # A full executor, or inference processes still holding the model from before a reload: both pass
+    reason = "Model reload in progress" if isinstance(e, ModelVersionMismatch) else "Server busy"
+    return HTTPException(status_code=503, detail=f"{reason}: {e}", headers={"Retry-After": "1"})
+
+def complete_weather(dates: np.ndarray, weather) -> np.ndarray:
+    """Weather rows (WEATHER_FEATURES order) with missing (None/NaN) fields filled in from the climatology index"""
+    weather = np.asarray(weather, dtype=np.float64)
+    if np.isnan(weather).any():
+        if climatology_index is None:
+            raise HTTPException(status_code=503, detail="Climatology index not loaded; send every weather field")
+        weather = climatology_index.fill_missing(dates, weather)
+    return weather
+
+def compute_confidence(weathersit: np.ndarray, temp: np.ndarray) -> np.ndarray:
+    """Vectorized version of the weather-based confidence heuristic."""
+    confidence = np.full(len(temp), 0.8)
+    confidence += np.where(weathersit == 1, 0.1, np.where(weathersit >= 3, -0.2, 0.0))
+    confidence += np.where((temp >= 0.3) & (temp <= 0.7), 0.1,
+                           np.where((temp < 0.2) | (temp > 0.8), -0.1, 0.0))
+    return np.clip(confidence, 0.5, 0.95)
 
 @app.get("/")
 async def root():
@@ -84,15 +260,23 @@ async def root():
         "message": "Bike Sharing Demand Prediction API",
         "version": "1.0.0",
         "status": "running",
-        "model_loaded": model is not None
+        "model_loaded": model_registry.ready
     }
 
 @app.get("/health")
 async def health_check():
+    loaded = model_registry.current
     return {
         "status": "healthy",
-        "model_loaded": model is not None,
-        "scaler_loaded": scaler is not None
+        "model_loaded": loaded is not None,
+        "scaler_loaded": loaded is not None,
+        "backend": loaded.predictor.kind if loaded is not None else None,
+        "model_version": loaded.version if loaded is not None else None,
+        "loader": model_registry.status(),
+        "hourly_model_loaded": hourly_registry.ready,
+        "hourly_loader": hourly_registry.status(),
+        "inference_executor": inference_executor.stats(),
+        "micro_batching": micro_batcher.stats()
     }
 
 @app.post("/predict", response_model=BikeRentalResponse)
@@ -103,44 +287,22 @@ async def predict_bike_rentals(request: BikeRentalRequest):
     This endpoint accepts weather and temporal features and returns
     the predicted number of bike rentals for the given conditions.
     """
-    if model is None or scaler is None:
+    timer = current_timer()
+    if timer is not None:
+        timer.mark('validation')
+    loaded = model_registry.current
+    if loaded is None:
         raise HTTPException(status_code=500, detail="Model not loaded")
     
     try:
-        # Create feature vector
-        features = np.array([
-            request.season, request.yr, request.mnth, request.holiday, 
-            request.weekday, request.workingday, request.weathersit,
-            request.temp, request.atemp, request.hum, request.windspeed, 
-            request.day_of_year, request.month, request.day_of_week
-        ])
-        
-        # Create interaction features
-        temp_humidity = request.temp * request.hum
-        temp_windspeed = request.temp * request.windspeed
-        weather_temp = request.weathersit * request.temp
-        
-        # Create seasonal temperature features
-        spring_temp = (request.season == 1) * request.temp
-        summer_temp = (request.season == 2) * request.temp
-        fall_temp = (request.season == 3) * request.temp
-        winter_temp = (request.season == 4) * request.temp
-        
-        # Combine all features
-        all_features = np.concatenate([
-            features, 
-            [temp_humidity, temp_windspeed, weather_temp,
-             spring_temp, summer_temp, fall_temp, winter_temp]
-        ])
-        
-        # Reshape for prediction
-        features_reshaped = all_features.reshape(1, -1)
-        
-        # Scale features
-        features_scaled = scaler.transform(features_reshaped)
-        
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
+        # Look the inputs up in the prediction cache; misses are scored together
+        # with those of concurrent requests
+        raw = raw_from_records([request])
+        if timer is not None:
+            timer.mark('feature_build')
+        prediction = (await prediction_cache.predict_async(loaded, raw, micro_batcher.predict))[0]
+        if timer is not None:
+            timer.mark('inference')
         predicted_rentals = max(0, int(prediction))
         
         # Calculate confidence based on weather conditions
@@ -160,12 +322,313 @@ async def predict_bike_rentals(request: BikeRentalRequest):
         return BikeRentalResponse(
             predicted_rentals=predicted_rentals,
             confidence=round(confidence, 2),
-            message=f"Predicted {predicted_rentals} bike rentals for the given conditions"
+            message=f"Predicted {predicted_rentals} bike rentals for the given conditions",
+            model_version=loaded.version
         )
         
+    except (ExecutorSaturated, ModelVersionMismatch) as e:
+        raise saturated(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@app.post("/predict/date", response_model=BikeRentalResponse)
+async def predict_bike_rentals_for_date(request: DatedBikeRentalRequest):
+    """
+    Predict bike rental demand for a date and its weather.
+
+    The season, year, month, holiday, weekday and working-day inputs are
+    looked up in the calendar table for `dteday` instead of being sent by
+    the client. Dates after 2012 are scored as the model's latest year.
+    """
+    timer = current_timer()
+    if timer is not None:
+        timer.mark('validation')
+    loaded = model_registry.current
+    if loaded is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    if calendar_table is None:
+        raise HTTPException(status_code=503, detail="Calendar table not loaded")
+    try:
+        dates = np.array([request.dteday], dtype='datetime64[D]')
+        raw = calendar_table.raw_for_dates(dates, complete_weather(dates, [request.values()]))
+    except DateOutOfRange as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        if timer is not None:
+            timer.mark('feature_build')
+        prediction = (await prediction_cache.predict_async(loaded, raw, micro_batcher.predict))[0]
+        if timer is not None:
+            timer.mark('inference')
+        predicted_rentals = max(0, int(prediction))
+        confidence = compute_confidence(raw[:, RAW_INDEX['weathersit']], raw[:, RAW_INDEX['temp']])[0]
+    except (ExecutorSaturated, ModelVersionMismatch) as e:
+        raise saturated(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+    return BikeRentalResponse(
+        predicted_rentals=predicted_rentals,
+        confidence=round(float(confidence), 2),
+        message=f"Predicted {predicted_rentals} bike rentals for {request.dteday.isoformat()}",
+        model_version=loaded.version
+    )
+
+@app.post("/forecast")
+async def forecast(request: ForecastRequest):
+    """
+    Predict bike rental demand for every day from `start` to `end`.
+
+    The calendar inputs of the whole range come from the calendar table and
+    the weather from the chosen scenario, so the range is scored in a single
+    inference call. The response is streamed:
+    `{"start", "end", "scenario", "days", "total_rentals", "model_version",
+    "predictions": [{"date", "predicted_rentals", "confidence"}, ...]}`.
+    """
+    timer = current_timer()
+    if timer is not None:
+        timer.mark('validation')
+    loaded = model_registry.current
+    if loaded is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    if calendar_table is None:
+        raise HTTPException(status_code=503, detail="Calendar table not loaded")
+
+    dates = forecast_dates(request.start, request.end)
+    if request.scenario == 'constant':
+        weather = constant_weather(request.weather.values(), len(dates))
+    elif request.scenario == 'daily':
+        weather = np.array([day.values() for day in request.daily_weather], dtype=np.float64)
+    else:
+        weather = np.full((len(dates), len(WEATHER_FEATURES)), np.nan)
+    weather = complete_weather(dates, weather)
+    try:
+        raw = calendar_table.raw_for_dates(dates, weather)
+    except DateOutOfRange as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        if timer is not None:
+            timer.mark('feature_build')
+        predicted = await prediction_cache.predict_async(
+            loaded, raw, partial(inference_executor.predict, model_registry))
+        if timer is not None:
+            timer.mark('inference')
+        predicted_rentals = np.clip(predicted, 0, None).astype(np.int64)
+        confidence = compute_confidence(raw[:, RAW_INDEX['weathersit']], raw[:, RAW_INDEX['temp']])
+    except (ExecutorSaturated, ModelVersionMismatch) as e:
+        raise saturated(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+    header = {
+        "start": request.start.isoformat(),
+        "end": request.end.isoformat(),
+        "scenario": request.scenario,
+        "days": len(dates),
+        "total_rentals": int(predicted_rentals.sum()),
+        "model_version": loaded.version,
+    }
+    return StreamingResponse(stream_forecast_json(header, dates, predicted_rentals, confidence),
+                             media_type="application/json")
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_bike_rentals_batch(batch: BatchPredictionRequest):
+    """
+    Predict bike rental demand for many records in one call.
+
+    Every record is validated with the same rules as /predict. Valid records
+    missing from the prediction cache are scored together with a single call
+    into the prediction backend; invalid records are reported in `errors` with their index in the batch.
+    """
+    timer = current_timer()
+    if timer is not None:
+        timer.mark('validation')
+    loaded = model_registry.current
+    if loaded is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+
+    valid_indices, raw, invalid = batch_validator.validate(batch.records)
+    errors = [
+        BatchPredictionError(
+            index=index,
+            errors=[{"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]} for err in record_errors]
+        )
+        for index, record_errors in invalid
+    ]
+
+    # The column-wise validation also gathers the raw input rows
+    if timer is not None:
+        timer.mark('feature_build')
+
+    predictions = []
+    if valid_indices:
+        try:
+            predicted = await prediction_cache.predict_async(
+                loaded, raw, partial(inference_executor.predict, model_registry))
+            if timer is not None:
+                timer.mark('inference')
+            predicted_rentals = np.clip(predicted, 0, None).astype(np.int64)
+            confidence = compute_confidence(raw[:, RAW_INDEX['weathersit']], raw[:, RAW_INDEX['temp']])
+        except (ExecutorSaturated, ModelVersionMismatch) as e:
+            raise saturated(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+        predictions = [
+            BatchPredictionItem(index=index, predicted_rentals=int(rentals),
+                                confidence=round(float(conf), 2))
+            for index, rentals, conf in zip(valid_indices, predicted_rentals, confidence)
+        ]
+
+    return BatchPredictionResponse(
+        predictions=predictions,
+        errors=errors,
+        total=len(batch.records),
+        succeeded=len(predictions),
+        failed=len(errors),
+        model_version=loaded.version
+    )
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request, model: Literal["daily", "hourly"] = Query("daily")):
+    """
+    Score an NDJSON or CSV upload (Content-Type application/x-ndjson or
+    text/csv) with the daily (default) or hourly model, streaming the
+    predictions back in the same format as the upload is read.
+
+    NDJSON lines are /predict records (plus `hr` for the hourly model); CSV
+    uses the day.csv/hour.csv schema, so those files can be posted as they
+    are. The upload is processed in blocks of about BULK_CHUNK_BYTES, each
+    scored in one call, so memory does not grow with the upload size.
+    """
+    fmt = BULK_FORMATS.get(request.headers.get("content-type", "").split(";")[0].strip().lower())
+    if fmt is None:
+        raise HTTPException(status_code=415, detail=f"Content-Type must be one of {sorted(BULK_FORMATS)}")
+    registry = hourly_registry if model == "hourly" else model_registry
+    # The whole upload is scored by the model current when it starts, even across a reload
+    loaded = registry.current
+    if loaded is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    scorer = BulkScorer(fmt, hourly_batch_validator if model == "hourly" else batch_validator,
+                        partial(inference_executor.predict, registry, loaded))
+    return DuplexStreamingResponse(scorer.stream(request.stream()), media_type=MEDIA_TYPES[fmt],
+                                   headers={"X-Model-Version": loaded.version})
+
+@app.post("/predict/hourly", response_model=HourlyPredictionResponse)
+async def predict_bike_rentals_hourly(request: HourlyBikeRentalRequest):
+    """
+    Predict hourly bike rental demand with the model trained on hour.csv.
+
+    With `hr` the response holds that one hour; without it, all 24 hours of
+    the day, scored together in a single call into the prediction backend.
+    The day's weather inputs apply to every hour.
+    """
+    timer = current_timer()
+    if timer is not None:
+        timer.mark('validation')
+    loaded = hourly_registry.current
+    if loaded is None:
+        raise HTTPException(status_code=500, detail="Hourly model not loaded")
+
+    try:
+        hours = np.arange(24) if request.hr is None else np.array([request.hr])
+        day = raw_from_records([request])
+        raw = np.column_stack([np.repeat(day, len(hours), axis=0), hours])
+        if timer is not None:
+            timer.mark('feature_build')
+        predicted = await inference_executor.predict(hourly_registry, loaded, raw)
+        predicted_rentals = np.clip(predicted, 0, None).astype(np.int64)
+        if timer is not None:
+            timer.mark('inference')
+        confidence = compute_confidence(day[:, RAW_INDEX['weathersit']], day[:, RAW_INDEX['temp']])[0]
+    except (ExecutorSaturated, ModelVersionMismatch) as e:
+        raise saturated(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+    return HourlyPredictionResponse(
+        predictions=[HourlyPrediction(hr=int(hr), predicted_rentals=int(rentals))
+                     for hr, rentals in zip(hours, predicted_rentals)],
+        total_rentals=int(predicted_rentals.sum()),
+        peak_hour=int(hours[np.argmax(predicted_rentals)]),
+        confidence=round(float(confidence), 2),
+        model_version=loaded.version
+    )
+
+@app.get("/climatology")
+async def get_climatology(day: date = Query(..., alias="date", description="Date (YYYY-MM-DD); only its day of year matters"),
+                          hourly: bool = Query(False, description="Also return the 24 hourly entries")):
+    """
+    Typical weather of a day of the year: the mean and quantiles of temp,
+    atemp, hum and windspeed, and the share of each weathersit, from day.csv
+    (and hour.csv for the hourly entries).
+    """
+    if climatology_index is None:
+        raise HTTPException(status_code=503, detail="Climatology index not loaded")
+    return {"date": day.isoformat(), **climatology_index.describe(day, hourly=hourly)}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Prediction cache size and hit/miss/eviction counters.
+    """
+    return prediction_cache.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Request counters, per-stage latency histograms, prediction cache counters
+    and the served model versions in the Prometheus text format.
+    Only available when the API runs with METRICS_ENABLED=1.
+    """
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (set METRICS_ENABLED=1)")
+    text = metrics.render(models=[("daily", model_registry.current), ("hourly", hourly_registry.current)],
+                          cache_stats=prediction_cache.stats())
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+def describe_registry(registry: ModelRegistry) -> Dict[str, Any]:
+    loaded = registry.current
+    manifest = loaded.manifest if loaded is not None else None
+    return {
+        "current": None if loaded is None else {
+            "version": loaded.version,
+            "source": loaded.source,
+            "backend": loaded.predictor.kind,
+            "model_class": manifest.get("model_class") if manifest else None,
+            "created_at": manifest.get("created_at") if manifest else None,
+            "metrics": manifest.get("metrics") if manifest else None,
+        },
+        "watching": registry.status()["watching"],
+        "history": registry.history
+    }
+
+@app.get("/models")
+async def list_models():
+    """
+    The model versions being served and the most recent reload attempts.
+    """
+    return {**describe_registry(model_registry), "hourly": describe_registry(hourly_registry)}
+
+@app.post("/models/reload")
+async def reload_model(model: Literal["daily", "hourly"] = Query("daily"),
+                       x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Load the daily (default) or hourly model currently on disk, validate it
+    and swap it in.
+
+    The old model keeps serving while the new one loads, and stays in place
+    if the new one fails to load or to reproduce its reference predictions.
+    """
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    registry = hourly_registry if model == "hourly" else model_registry
+    result = await registry.reload(reason="admin")
+    if result["status"] == "failed":
+        raise HTTPException(status_code=500, detail=result)
+    return result
+
 @app.get("/docs")
 async def get_docs():
     """
@@ -0,0 +1,228 @@
+"""
+Offline batch scoring: the API's models applied to a CSV file, without a server.
+
+    python -m api.batch_score hour.csv [--model daily|hourly] [--out predictions.npy] [--workers N]
+
+The input uses the day.csv/hour.csv schema, so the training files can be
+scored as they are. The model is picked from the header (`hr` means hourly)
+unless --model says otherwise, and is loaded with the same settings as the
+API (MODEL_BUNDLE_DIR, HOURLY_MODEL_BUNDLE_DIR, MODEL_BACKEND, ...).
+
+The file is scanned once to cut it into byte ranges of complete lines and
+count their rows. The output, one float32 prediction per input row, is then
+created as a `.npy` file of its final size, and a process pool scores the
+ranges. Each worker loads the model once (bundle arrays are memory-mapped,
+so the workers share their pages), parses and validates its range as
+/predict/stream does (the column-wise rules, then pydantic for the rows
+they reject), and writes its predictions straight into its slice of the
+memory-mapped output. Nothing is sent back to the parent but row counts,
+so memory stays bounded by workers x range size whatever the size of the
+file.
+
+Predictions are clipped at 0, as the API does, but not rounded. Rows that
+fail validation (a missing or non-numeric value, a value out of bounds) are
+NaN. With an `--out` ending in `.parquet` the predictions are written to a
+Parquet file afterwards, which needs pyarrow or fastparquet.
+"""
+
+import io
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# Make the `api` package importable when running `python api/batch_score.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+MIN_CHUNK_BYTES = 1 << 16
+MAX_CHUNK_BYTES = 8 << 20
+SCAN_BYTES = 16 << 20
+
+# Set in each pool worker by _init_worker
+_WORKER = {}
+
+
+def plan_chunks(path, chunk_bytes):
+    """
+    The header line of a CSV file and its body as `(start, end, first_row, n_rows)`
+    byte ranges of complete lines, about `chunk_bytes` each
+    """
+    chunks = []
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = position = f.tell()
+        rows = 0
+        pending = b''
+        while True:
+            data = f.read(SCAN_BYTES)
+            if not data:
+                break
+            block = pending + data
+            offset = 0
+            # `offset` is where the current range starts in `block`; cut it at the
+            # first line end at least chunk_bytes further on
+            while True:
+                cut = block.find(b'\n', offset + chunk_bytes - 1)
+                if cut < 0:
+                    break
+                n_rows = block.count(b'\n', offset, cut + 1)
+                chunks.append((start, position + cut + 1, rows, n_rows))
+                rows += n_rows
+                offset = cut + 1
+                start = position + offset
+            pending = block[offset:]
+            position += offset
+        if pending.strip():
+            chunks.append((start, position + len(pending), rows, pending.count(b'\n') + (not pending.endswith(b'\n'))))
+    return header, chunks
+
+
+def _init_worker(data_path, header, out_path, model, settings, version):
+    from api.api import batch_validator, hourly_batch_validator
+    from api.loader import ModelLoader
+
+    loaded, _ = ModelLoader(**settings).load_candidate()
+    if loaded.version != version:
+        raise RuntimeError(f"Model on disk changed to {loaded.version} while scoring with {version}")
+    _WORKER.update(data_path=data_path, header=header, loaded=loaded,
+                   validator=hourly_batch_validator if model == 'hourly' else batch_validator,
+                   out=np.load(out_path, mmap_mode='r+'))
+
+
+def _score_chunk(chunk):
+    """Score one byte range into the output; returns `(rows, invalid rows)`"""
+    from api.bulk import _frame_record, frame_to_raw
+
+    start, end, first_row, n_rows = chunk
+    with open(_WORKER['data_path'], 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    validator = _WORKER['validator']
+    header = _WORKER['header']
+    names = header.decode().strip().split(',')
+    usecols = [name for name in names if name in validator.fields or name == 'dteday']
+    df = pd.read_csv(io.BytesIO(header + data), usecols=usecols, dtype={'dteday': str}, skip_blank_lines=False)
+    if len(df) != n_rows:
+        raise ValueError(f"Rows {first_row}-{first_row + n_rows - 1}: parsed {len(df)} rows, expected {n_rows}")
+
+    raw = frame_to_raw(df, validator.fields)
+    # Rows the column-wise rules reject go through pydantic, as in /predict/stream
+    valid, raw_valid, errors = validator.validate_matrix(raw, _frame_record(df, raw, validator.fields))
+    predictions = np.full(n_rows, np.nan, dtype=np.float32)
+    if valid:
+        predictions[valid] = np.clip(_WORKER['loaded'].predict_raw(raw_valid), 0, None)
+    out = _WORKER['out']
+    out[first_row:first_row + n_rows] = predictions
+    out.flush()
+    return n_rows, len(errors)
+
+
+def model_settings(model):
+    """Loader settings of the API's daily or hourly model"""
+    from api.api import hourly_registry, model_registry
+
+    return (hourly_registry if model == 'hourly' else model_registry).settings()
+
+
+def score_csv(data_path, out_path, model=None, workers=None, chunk_bytes=None, progress=None):
+    """
+    Score every row of `data_path` into the .npy file `out_path` and return a
+    report dict. `progress(rows_done, rows_total, seconds)` is called as
+    ranges complete.
+    """
+    from api.loader import ModelLoader
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if chunk_bytes is None:
+        # About four ranges per worker, for an even finish, within sensible bounds
+        chunk_bytes = min(max(math.ceil(os.path.getsize(data_path) / (workers * 4)), MIN_CHUNK_BYTES), MAX_CHUNK_BYTES)
+    header, chunks = plan_chunks(data_path, chunk_bytes)
+    if model is None:
+        model = 'hourly' if 'hr' in header.decode().strip().split(',') else 'daily'
+    settings = model_settings(model)
+    # Fail here, once, rather than in every worker
+    loaded, _ = ModelLoader(**settings).load_candidate()
+    n_rows = chunks[-1][2] + chunks[-1][3] if chunks else 0
+
+    out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float32, shape=(n_rows,))
+    del out
+    planned = time.perf_counter()
+
+    done = invalid = 0
+    if chunks:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(data_path, header, out_path, model, settings, loaded.version)) as pool:
+            for future in as_completed([pool.submit(_score_chunk, chunk) for chunk in chunks]):
+                rows, bad = future.result()
+                done += rows
+                invalid += bad
+                if progress is not None:
+                    progress(done, n_rows, time.perf_counter() - planned)
+    elapsed = time.perf_counter() - started
+    return {
+        'data': data_path,
+        'out': out_path,
+        'model': model,
+        'model_version': loaded.version,
+        'rows': n_rows,
+        'invalid_rows': invalid,
+        'chunks': len(chunks),
+        'workers': min(workers, len(chunks)),
+        'plan_seconds': round(planned - started, 4),
+        'seconds': round(elapsed, 4),
+        'rows_per_second': round(n_rows / elapsed) if elapsed else None,
+    }
+
+
+def main():
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Score a day.csv/hour.csv style file with the API's model, offline")
+    parser.add_argument('data')
+    parser.add_argument('--model', choices=('daily', 'hourly'), help="default: hourly if the file has an hr column")
+    parser.add_argument('--out', help="output .npy (or .parquet) file; default <data>_predictions.npy")
+    parser.add_argument('--workers', type=int, default=None, help="default: the CPU count")
+    parser.add_argument('--chunk-bytes', type=int, default=None, help="bytes of input per task")
+    args = parser.parse_args()
+
+    out = args.out or os.path.splitext(args.data)[0] + '_predictions.npy'
+    parquet = out.endswith('.parquet')
+    npy_path = out
+    if parquet:
+        try:
+            from pandas.io.parquet import get_engine
+
+            get_engine('auto')
+        except ImportError as e:
+            parser.error(f"Parquet output needs pyarrow or fastparquet: {e}".splitlines()[0])
+        handle, npy_path = tempfile.mkstemp(suffix='.npy', dir=os.path.dirname(os.path.abspath(out)))
+        os.close(handle)
+
+    def progress(done, total, seconds):
+        print(f"\r⏳ {done:,}/{total:,} rows ({done / total:.0%}), {done / max(seconds, 1e-9):,.0f} rows/s",
+              end='', flush=True)
+
+    try:
+        report = score_csv(args.data, npy_path, args.model, args.workers, args.chunk_bytes, progress)
+        print()
+        if parquet:
+            pd.DataFrame({'predicted_rentals': np.load(npy_path, mmap_mode='r')}).to_parquet(out, index=False)
+    finally:
+        if parquet:
+            os.remove(npy_path)
+
+    print(f"✅ {report['rows']:,} rows scored by the {report['model']} model {report['model_version']} "
+          f"in {report['seconds']:.2f}s ({report['rows_per_second']:,} rows/s, {report['workers']} workers, "
+          f"{report['chunks']} chunks) -> {os.path.abspath(out)}")
+    if report['invalid_rows']:
+        print(f"⚠️  {report['invalid_rows']:,} rows failed validation and are NaN")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Server-side micro-batching of concurrent /predict requests.
+
+Clients send one record per /predict call. When many of them arrive at once,
+`MicroBatcher` gathers their rows and scores them with a single vectorized
+call: one feature transform and one model prediction for the whole group.
+Each request then gets its own rows back, so the response is the same as
+without batching.
+
+A group is sent to the model when one of these happens first:
+  - it holds BATCH_MAX_SIZE rows (default 32);
+  - BATCH_MAX_WAIT_MS milliseconds (default 2) have passed since its first row;
+  - the model is idle: no group is being scored, so waiting would only add
+    latency. The group then goes out on the next event-loop iteration and
+    takes whatever arrived in the meantime.
+
+Under light load a request therefore waits for nothing. Under heavy load the
+groups grow toward BATCH_MAX_SIZE while the previous group is being scored.
+BATCH_MAX_SIZE=1 turns batching off.
+
+If a grouped call fails, each request in the group is retried on its own, so
+an error only reaches the request that caused it. A full inference executor
+is the exception: every request in the group gets the 503.
+"""
+
+import asyncio
+import contextvars
+import os
+
+import numpy as np
+
+from api.executor import ExecutorSaturated, ModelVersionMismatch
+
+
+class MicroBatcher:
+    """Groups rows from concurrent requests into one call of `run(loaded, raw)`."""
+
+    def __init__(self, run, max_batch=32, max_wait_ms=2.0):
+        self.run = run
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.in_flight = 0
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self._pending = {}  # LoadedModel -> [(raw, future), ...]
+        self._pending_rows = {}
+        self._timers = {}
+
+    @classmethod
+    def from_env(cls, run):
+        return cls(run, max_batch=int(os.environ.get('BATCH_MAX_SIZE', '32')),
+                   max_wait_ms=float(os.environ.get('BATCH_MAX_WAIT_MS', '2')))
+
+    @property
+    def enabled(self):
+        return self.max_batch > 1
+
+    async def predict(self, loaded, raw):
+        """Predictions of `loaded` for the rows of `raw`, scored together with other requests' rows"""
+        if not self.enabled:
+            return await self.run(loaded, raw)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Rows are grouped per model object, so a group never mixes versions across a hot reload
+        group = self._pending.get(loaded)
+        if group is None:
+            group = self._pending[loaded] = []
+            self._pending_rows[loaded] = 0
+            delay = self.max_wait if self.in_flight else 0.0
+            # An empty context: the group's work is not part of whichever request opened it
+            self._timers[loaded] = loop.call_later(delay, self._flush, loaded, context=contextvars.Context())
+        group.append((raw, future))
+        self._pending_rows[loaded] += len(raw)
+        if self._pending_rows[loaded] >= self.max_batch:
+            self._flush(loaded)
+        return await future
+
+    def _flush(self, loaded):
+        group = self._pending.pop(loaded, None)
+        self._pending_rows.pop(loaded, None)
+        timer = self._timers.pop(loaded, None)
+        if timer is not None:
+            timer.cancel()
+        if group:
+            self.in_flight += 1
+            asyncio.get_running_loop().create_task(self._score(loaded, group), context=contextvars.Context())
+
+    async def _score(self, loaded, group):
+        try:
+            raw = group[0][0] if len(group) == 1 else np.concatenate([rows for rows, _ in group])
+            self.batches += 1
+            self.rows += len(raw)
+            self.largest_batch = max(self.largest_batch, len(raw))
+            predictions = await self.run(loaded, raw)
+        except Exception as e:
+            if len(group) == 1 or isinstance(e, (ExecutorSaturated, ModelVersionMismatch)):
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            # Score each request on its own so one bad request does not fail the rest
+            for rows, future in group:
+                try:
+                    result = await self.run(loaded, rows)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        else:
+            start = 0
+            for rows, future in group:
+                if not future.done():  # the client may have gone away
+                    future.set_result(predictions[start:start + len(rows)])
+                start += len(rows)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': round(self.rows / self.batches, 2) if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+        }
@@ -0,0 +1,308 @@
+"""
+Streaming bulk scoring: an NDJSON or CSV upload in, predictions out as they are made.
+
+The upload is read as it arrives and cut into blocks of about
+BULK_CHUNK_BYTES of complete lines. Each block is parsed, validated and
+scored as a whole:
+
+    NDJSON   one /predict record per line, parsed with a single json.loads
+             per block and validated column-wise (api/validation.py)
+    CSV      the day.csv/hour.csv schema, parsed by pandas. A header line
+             names the columns, extra columns such as cnt are ignored, and
+             day_of_year/month/day_of_week are derived from dteday when
+             absent. day.csv and hour.csv can be posted as they are.
+
+Every block is one vectorized feature build and one model call. Its
+results are sent before the next block is read, so memory stays bounded
+by the block size however large the upload is. Output follows the input
+format, in input order:
+
+    NDJSON   {"index": 0, "predicted_rentals": 985}
+             {"index": 1, "errors": [{"loc": [...], "msg": "...", "type": "..."}]}
+    CSV      index,predicted_rentals,error
+
+`index` counts records from 0 (header and blank lines excluded). A row that
+fails validation gets the same errors /predict/batch reports and does not
+stop the stream.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from api.executor import ExecutorSaturated, ModelVersionMismatch
+from api.features import calendar_columns
+
+BULK_CHUNK_BYTES = int(os.environ.get('BULK_CHUNK_BYTES', str(1 << 20)))
+# A line longer than this fails the stream rather than growing the buffer without bound
+MAX_LINE_BYTES = 1 << 20
+# Results a client has not read yet, past which the stream stops rather than fill the disk
+BULK_MAX_SPOOL_BYTES = int(os.environ.get('BULK_MAX_SPOOL_BYTES', str(256 << 20)))
+
+BULK_FORMATS = {
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv',
+}
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+DERIVED_CALENDAR = ('day_of_year', 'month', 'day_of_week')
+
+
+class BulkInputError(ValueError):
+    """Raised when an upload cannot be read any further (e.g. a line longer than MAX_LINE_BYTES)."""
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse whose body is produced while the request body is
+    still being read.
+
+    StreamingResponse also listens on `receive` for a disconnect while it
+    streams (ASGI spec < 2.4). That listener would take the upload's body
+    messages out from under the endpoint. The upload stream already ends
+    with ClientDisconnect when the client goes away, so this class only
+    streams.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+async def iter_blocks(stream, chunk_bytes=BULK_CHUNK_BYTES):
+    """Blocks of complete lines, about `chunk_bytes` each, from an async byte stream"""
+    buffer = bytearray()
+    async for data in stream:
+        buffer += data
+        if len(buffer) < chunk_bytes:
+            continue
+        cut = buffer.rfind(b'\n') + 1
+        if cut == 0:
+            if len(buffer) > MAX_LINE_BYTES:
+                raise BulkInputError(f"Line longer than {MAX_LINE_BYTES} bytes")
+            continue
+        yield bytes(buffer[:cut])
+        del buffer[:cut]
+    if buffer.strip():
+        yield bytes(buffer)
+
+
+def parse_ndjson(block):
+    """The records of an NDJSON block, plus {position: error} for lines that are not valid JSON"""
+    lines = [line for line in block.split(b'\n') if line.strip()]
+    try:
+        records = json.loads(b'[' + b','.join(lines) + b']')
+    except ValueError:
+        records = None
+    # A line holding several comma-separated values parses fine inside the
+    # array; the record count catches it and the lines are parsed one by one
+    if records is not None and len(records) == len(lines):
+        return records, {}
+    records, bad = [], {}
+    for position, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+        except ValueError as e:
+            records.append(None)
+            bad[position] = [{"loc": [], "msg": f"Invalid JSON: {e}", "type": "json_invalid"}]
+    return records, bad
+
+
+def frame_to_raw(df, raw_features):
+    """
+    The float64 raw input matrix of a CSV block. Values that are not numbers
+    and fields that are missing or cannot be derived are NaN, which
+    validation rejects.
+    """
+    raw = np.full((len(df), len(raw_features)), np.nan)
+    derived = {}
+    if 'dteday' in df.columns and any(name not in df.columns for name in DERIVED_CALENDAR):
+        # Each distinct date is parsed once (hour.csv repeats every date 24 times)
+        days, inverse = np.unique(df['dteday'].to_numpy(dtype=str), return_inverse=True)
+        days = pd.to_datetime(days, errors='coerce').to_numpy()
+        parsed = ~np.isnat(days)
+        for name, values in zip(DERIVED_CALENDAR, calendar_columns(days[parsed])):
+            column = np.full(len(days), np.nan)
+            column[parsed] = values
+            derived[name] = column[inverse]
+    for j, name in enumerate(raw_features):
+        if name in df.columns:
+            column = df[name]
+            if column.dtype.kind not in 'biuf':
+                column = pd.to_numeric(column, errors='coerce')
+            raw[:, j] = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        elif name in derived:
+            raw[:, j] = derived[name]
+    return raw
+
+
+def _frame_record(df, raw, raw_features):
+    """record_at(i) for a CSV block: row i as the dict pydantic would have been given"""
+    present = [name for name in raw_features if name in df.columns]
+    derived = [(j, name) for j, name in enumerate(raw_features) if name not in df.columns]
+
+    def record_at(i):
+        record = {}
+        for name in present:
+            value = df[name].iat[i]
+            if isinstance(value, np.generic):
+                value = value.item()
+            if not (isinstance(value, float) and np.isnan(value)):  # an empty cell is a missing field
+                record[name] = value
+        for j, name in derived:
+            if not np.isnan(raw[i, j]):
+                record[name] = raw[i, j].item()
+        return record
+
+    return record_at
+
+
+class BulkScorer:
+    """Parses, validates and scores the blocks of one upload."""
+
+    def __init__(self, fmt, validator, run, retry_seconds=0.05, max_spool_bytes=BULK_MAX_SPOOL_BYTES):
+        self.fmt = fmt
+        self.validator = validator
+        self.raw_features = validator.fields
+        self.run = run
+        self.retry_seconds = retry_seconds
+        self.max_spool_bytes = max_spool_bytes
+        self.header = None
+        self._usecols = None
+        self.rows = 0
+
+    def parse(self, block):
+        """`(valid_indices, raw, errors, n_records)` of a block, indices relative to the block"""
+        if self.fmt == 'ndjson':
+            records, bad = parse_ndjson(block)
+            valid, raw, errors = self.validator.validate(records)
+            if bad:
+                errors = sorted([(i, e) for i, e in errors if i not in bad] + list(bad.items()))
+            return valid, raw, errors, len(records)
+
+        if self.header is None:
+            header, _, block = block.partition(b'\n')
+            self.header = header.rstrip(b'\r') + b'\n'
+            names = set(self.header.decode().strip().split(','))
+            self._usecols = [name for name in names if name in self.raw_features or name == 'dteday']
+            if not block.strip():
+                return [], np.empty((0, len(self.raw_features))), [], 0
+        df = pd.read_csv(io.BytesIO(self.header + block), usecols=self._usecols, dtype={'dteday': str})
+        raw = frame_to_raw(df, self.raw_features)
+        valid, raw, errors = self.validator.validate_matrix(raw, _frame_record(df, raw, self.raw_features))
+        return valid, raw, errors, len(df)
+
+    async def predict(self, raw):
+        # A full executor slows the upload down instead of failing it
+        while True:
+            try:
+                return await self.run(raw)
+            except ExecutorSaturated:
+                await asyncio.sleep(self.retry_seconds)
+
+    def format(self, start, n_records, valid, predicted_rentals, errors):
+        if not errors:
+            template = '{{"index":{},"predicted_rentals":{}}}' if self.fmt == 'ndjson' else '{},{},'
+            return ''.join([template.format(i, rentals) + '\n' for i, rentals in
+                            zip(range(start, start + n_records), predicted_rentals.tolist())])
+        lines = [None] * n_records
+        if self.fmt == 'ndjson':
+            for i, rentals in zip(valid, predicted_rentals.tolist()):
+                lines[i] = f'{{"index":{start + i},"predicted_rentals":{rentals}}}'
+            for i, record_errors in errors:
+                lines[i] = json.dumps({"index": start + i, "errors": record_errors})
+        else:
+            for i, rentals in zip(valid, predicted_rentals.tolist()):
+                lines[i] = f'{start + i},{rentals},'
+            for i, record_errors in errors:
+                message = '; '.join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in record_errors)
+                lines[i] = f'{start + i},,"{message.replace(chr(34), chr(34) * 2)}"'
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def format_failure(self, message):
+        if self.fmt == 'ndjson':
+            return json.dumps({"error": message}) + '\n'
+        return f',,"{message.replace(chr(34), chr(34) * 2)}"\n'
+
+    async def results(self, body):
+        """Output text for an async byte stream of the upload, block by block"""
+        if self.fmt == 'csv':
+            yield 'index,predicted_rentals,error\n'
+        try:
+            async for block in iter_blocks(body):
+                valid, raw, errors, n_records = self.parse(block)
+                errors = [(i, [{"loc": list(e["loc"]), "msg": e["msg"], "type": e["type"]} for e in record_errors])
+                          for i, record_errors in errors]
+                predicted_rentals = np.empty(0, dtype=np.int64)
+                if len(valid):
+                    predicted_rentals = np.clip(await self.predict(raw), 0, None).astype(np.int64)
+                yield self.format(self.rows, n_records, valid, predicted_rentals, errors)
+                self.rows += n_records
+        except (BulkInputError, ModelVersionMismatch, ValueError) as e:
+            yield self.format_failure(f"Upload stopped after {self.rows} records: {e}")
+
+    async def stream(self, body):
+        """
+        `results` as bytes, decoupled from the client through a spool file.
+
+        Many HTTP clients (requests, httpx) send the whole upload before they
+        read any of the response. If results went straight to the socket,
+        the server would block writing once the client's receive buffer was
+        full, stop reading the upload, and both sides would wait for ever.
+        A task therefore reads and scores the upload into a temporary file,
+        and the response sends from that file whenever the client reads.
+        Clients that read while uploading get each block's results as soon
+        as they are ready; for the others, the results wait on disk, not in
+        memory. The spool is emptied whenever the client has caught up; once
+        more than `max_spool_bytes` of results wait unread, the upload is
+        stopped with a failure line after the records already written.
+        """
+        with tempfile.TemporaryFile() as spool:
+            written = asyncio.Event()
+
+            async def consume():
+                try:
+                    async with contextlib.aclosing(self.results(body)) as results:
+                        async for text in results:
+                            data = text.encode()
+                            end = spool.seek(0, io.SEEK_END)
+                            if end + len(data) > self.max_spool_bytes:
+                                spool.write(self.format_failure(
+                                    f"Upload stopped after {self.rows} records: more than {self.max_spool_bytes} "
+                                    f"bytes of results not read by the client").encode())
+                                break
+                            spool.write(data)
+                            written.set()
+                finally:
+                    written.set()
+
+            task = asyncio.create_task(consume())
+            try:
+                while True:
+                    finished = task.done()
+                    spool.seek(0)
+                    data = spool.read()
+                    if data:
+                        # Everything written so far is read: empty the spool (no await in between)
+                        spool.seek(0)
+                        spool.truncate()
+                        yield data
+                    elif finished:
+                        break
+                    else:
+                        await written.wait()
+                        written.clear()
+                try:
+                    task.result()
+                except ClientDisconnect:
+                    pass
+            finally:
+                task.cancel()
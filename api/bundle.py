@@ -0,0 +1,238 @@
+"""
+Versioned model bundle: the serving artifact written by generate_models.py.
+
+A bundle is a directory holding one `.npy` file per numeric array of the
+prediction backend plus a `manifest.json` with the feature order, model type,
+training metrics, a hash of the training data and a hash of the
+best_model.pkl it was exported with:
+
+    model_bundle/
+        manifest.json
+        coef.npy                      (linear)
+        feature.npy, threshold.npy,   (forest)
+        children.npy, value.npy, ...
+
+Unlike the pickle files, the arrays are loaded with `np.load(mmap_mode='r')`,
+so uvicorn workers on the same machine share one read-only copy through the
+page cache instead of each unpickling its own.
+
+The bundle is served in preference to the pickles, so a script that
+retrains must write both: `export_bundle(..., pickle_dir=...)` records the
+hash, size and mtime of the pickled model next to it. A bundle whose
+recorded hash no longer matches best_model.pkl is stale, and the loader
+serves the pickles instead (see `bundle_matches_pickles`). The pickle is
+only hashed when its size or mtime differ from the recorded ones, so a
+load normally costs one stat, not a read of the whole file.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from api.features import FeatureTransform
+from api.predictors import PREDICTOR_TYPES, SklearnPredictor, predictor_from_sklearn
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+MODEL_PICKLE_FILE = 'best_model.pkl'
+
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'summative', 'linear_regression')
+BUNDLE_DIR = os.path.join(ARTIFACT_DIR, 'model_bundle')
+# The hourly model (trained on hour.csv) uses the same layout in its own directory
+HOURLY_ARTIFACT_DIR = os.path.join(ARTIFACT_DIR, 'hourly')
+HOURLY_BUNDLE_DIR = os.path.join(HOURLY_ARTIFACT_DIR, 'model_bundle')
+
+# Raw inputs (RAW_FEATURES order) whose sklearn predictions are stored in the
+# manifest, so a loaded bundle can be checked against the model it came from
+SMOKE_ROWS = [
+    [2, 1, 6, 0, 1, 1, 1, 0.5, 0.5, 0.6, 0.2, 150, 6, 1],
+    [4, 0, 1, 0, 0, 0, 2, 0.2, 0.1, 0.8, 0.4, 15, 1, 6],
+    [1, 1, 4, 1, 6, 0, 3, 0.4, 0.4, 0.6, 0.3, 100, 4, 5],
+]
+# Hour of day appended to SMOKE_ROWS for models with hourly inputs
+SMOKE_HOURS = [8, 17, 3]
+
+
+def smoke_rows(raw_features):
+    """SMOKE_ROWS in the given raw layout (RAW_FEATURES or HOURLY_RAW_FEATURES)"""
+    rows = np.array(SMOKE_ROWS, dtype=np.float64)
+    if 'hr' in raw_features:
+        rows = np.column_stack([rows, SMOKE_HOURS])
+    return rows
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stat(path):
+    """The size and mtime of a file, as recorded in manifests to skip re-hashing it"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def install_directory(tmp_dir, path):
+    """Swap a fully written `tmp_dir` into place at `path`, then remove the previous one."""
+    old_dir = None
+    if os.path.exists(path):
+        old_dir = tmp_dir + '-old'
+        os.rename(path, old_dir)
+    os.rename(tmp_dir, path)
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def save_bundle(predictor, path=BUNDLE_DIR, model_class=None, metrics=None, data_hash=None,
+                smoke_predictions=None, model_pickle_hash=None, model_pickle_stat=None):
+    """
+    Write `predictor` as a bundle directory at `path` and return its manifest.
+
+    The bundle is written to a temporary sibling directory first and then
+    renamed into place, so readers never see a half-written bundle.
+    """
+    arrays, params = predictor.to_arrays()
+    version = hashlib.sha256()
+    array_entries = {}
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.bundle-', dir=parent)
+    try:
+        os.chmod(tmp_dir, 0o755)
+        for name, array in sorted(arrays.items()):
+            array = np.ascontiguousarray(array)
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), array)
+            version.update(name.encode())
+            version.update(array.tobytes())
+            array_entries[name] = {'file': f'{name}.npy', 'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+        version.update(json.dumps([predictor.feature_columns, params], sort_keys=True).encode())
+        manifest = {
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'version': version.hexdigest()[:12],
+            'model_type': predictor.kind,
+            'model_class': model_class,
+            'feature_columns': predictor.feature_columns,
+            'params': params,
+            'arrays': array_entries,
+            'metrics': metrics or {},
+            'data_hash': data_hash,
+            'model_pickle_hash': model_pickle_hash,
+            'model_pickle_stat': model_pickle_stat,
+            'smoke_predictions': smoke_predictions,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        install_directory(tmp_dir, path)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return manifest
+
+
+def read_manifest(path=BUNDLE_DIR):
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format version {manifest.get('format_version')}")
+    return manifest
+
+
+def load_bundle(path=BUNDLE_DIR, mmap=True):
+    """
+    Load a bundle and return `(predictor, manifest)`.
+
+    With `mmap=True` the arrays are memory-mapped read-only; nothing is
+    copied into the process until a page is touched, and touched pages are
+    shared with every other process mapping the same files.
+    """
+    manifest = read_manifest(path)
+    predictor_cls = PREDICTOR_TYPES.get(manifest['model_type'])
+    if predictor_cls is None:
+        raise ValueError(f"Unknown model type '{manifest['model_type']}' in bundle")
+    arrays = {}
+    for name, entry in manifest['arrays'].items():
+        array = np.load(os.path.join(path, entry['file']), mmap_mode='r' if mmap else None)
+        if array.dtype.str != entry['dtype'] or list(array.shape) != entry['shape']:
+            raise ValueError(f"Array '{name}' does not match the bundle manifest")
+        arrays[name] = array
+    predictor = predictor_cls.from_arrays(arrays, manifest['params'], manifest['feature_columns'])
+    return predictor, manifest
+
+
+# (path, size, mtime_ns) -> SHA-256 of pickles hashed by bundle_matches_pickles
+_PICKLE_HASHES = {}
+
+
+def bundle_matches_pickles(manifest, artifact_dir):
+    """
+    False when the bundle was exported with a best_model.pkl other than the one
+    now in `artifact_dir`, i.e. the pickles were rewritten without the bundle.
+    Bundles that recorded no hash, or a directory without the pickle, pass.
+    The pickle is hashed only when its size or mtime is not the recorded one
+    (e.g. after a checkout), and then once per process for that stat.
+    """
+    expected = manifest.get('model_pickle_hash')
+    pickle_path = os.path.join(artifact_dir, MODEL_PICKLE_FILE)
+    if expected is None or not os.path.exists(pickle_path):
+        return True
+    stat = file_stat(pickle_path)
+    if stat == manifest.get('model_pickle_stat'):
+        return True
+    key = (os.path.abspath(pickle_path), stat['size'], stat['mtime_ns'])
+    if key not in _PICKLE_HASHES:
+        _PICKLE_HASHES[key] = file_sha256(pickle_path)
+    return _PICKLE_HASHES[key] == expected
+
+
+def export_bundle(model, scaler, feature_columns, path=BUNDLE_DIR, metrics=None, data_path=None, pickle_dir=None):
+    """
+    Convert a fitted scaler + model to a bundle and return `(predictor, manifest)`.
+
+    `pickle_dir` is where the same model was just pickled as best_model.pkl;
+    its hash and stat go in the manifest so the loader can tell when the two
+    diverge.
+    """
+    predictor = predictor_from_sklearn(model, scaler, feature_columns)
+    data_hash = file_sha256(data_path) if data_path is not None else None
+    model_pickle_hash = model_pickle_stat = None
+    if pickle_dir is not None:
+        model_pickle_hash = file_sha256(os.path.join(pickle_dir, MODEL_PICKLE_FILE))
+        model_pickle_stat = file_stat(os.path.join(pickle_dir, MODEL_PICKLE_FILE))
+    feature_transform = FeatureTransform(feature_columns)
+    smoke_features = feature_transform.transform(smoke_rows(feature_transform.raw_features))
+    smoke_predictions = SklearnPredictor(model, scaler).predict(smoke_features).tolist()
+    manifest = save_bundle(predictor, path, model_class=type(model).__name__, metrics=metrics,
+                           data_hash=data_hash, smoke_predictions=smoke_predictions,
+                           model_pickle_hash=model_pickle_hash, model_pickle_stat=model_pickle_stat)
+    return predictor, manifest
+
+
+if __name__ == "__main__":
+    # Export a bundle from the pickles already in summative/linear_regression
+    import pickle
+
+    with open(os.path.join(ARTIFACT_DIR, MODEL_PICKLE_FILE), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(ARTIFACT_DIR, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(ARTIFACT_DIR, 'feature_columns.pkl'), 'rb') as f:
+        feature_columns = pickle.load(f)
+    day_csv = os.path.join(ARTIFACT_DIR, '..', '..', 'day.csv')
+    predictor, manifest = export_bundle(model, scaler, feature_columns,
+                                        data_path=day_csv if os.path.exists(day_csv) else None,
+                                        pickle_dir=ARTIFACT_DIR)
+    print(f"✅ Exported {manifest['model_class']} as a '{manifest['model_type']}' bundle "
+          f"(version {manifest['version']}) to {os.path.abspath(BUNDLE_DIR)}")
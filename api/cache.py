@@ -0,0 +1,154 @@
+"""
+Prediction cache for the API.
+
+Clients repeat the same inputs: the same day, the same weather category and
+the same temperature/humidity/wind. `PredictionCache` keeps recent
+predictions in a bounded LRU map with a time-to-live, keyed on the raw input
+row.
+
+Misses are always scored from the row the client sent. By default the key
+is that exact row, so a hit returns exactly what inference would. With
+`decimals` set, keys are rounded to that many places: more requests hit,
+but a hit returns the prediction of the first row seen in its bucket, which
+can differ from the model's answer for the row sent. The cache belongs to
+one model version and empties itself as soon as it is asked for a
+prediction from a different one (e.g. after a hot reload).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Bounded LRU + TTL cache of raw predictions, with hit/miss counters."""
+
+    def __init__(self, max_entries=4096, ttl_seconds=3600.0, decimals=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.decimals = decimals
+        self.version = None
+
+        self._entries = OrderedDict()  # key -> (prediction, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls):
+        decimals = os.environ.get('PREDICTION_CACHE_DECIMALS')
+        return cls(max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', '4096')),
+                   ttl_seconds=float(os.environ.get('PREDICTION_CACHE_TTL_SECONDS', '3600')),
+                   decimals=int(decimals) if decimals else None)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def quantize(self, raw):
+        """Cache keys of a raw matrix (any width): rows rounded if `decimals` is set, -0.0 folded into 0.0"""
+        raw = np.asarray(raw, dtype=np.float64)
+        raw = raw.reshape(1, -1) if raw.ndim == 1 else raw
+        return (raw if self.decimals is None else np.round(raw, self.decimals)) + 0.0
+
+    def _use_version(self, version):
+        # Called with the lock held
+        if version != self.version:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self.version = version
+
+    def get_many(self, keys, version):
+        """Cached predictions for `keys` (None where missing or expired)"""
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            self._use_version(version)
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] < now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    values.append(entry[0])
+        return values
+
+    def put_many(self, keys, predictions, version):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else float('inf')
+        with self._lock:
+            self._use_version(version)
+            for key, prediction in zip(keys, predictions):
+                self._entries[key] = (float(prediction), expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _lookup(self, loaded, raw):
+        keys = [tuple(row) for row in self.quantize(raw).tolist()]
+        cached = self.get_many(keys, loaded.version)
+        missing = [i for i, value in enumerate(cached) if value is None]
+        predictions = np.array([np.nan if value is None else value for value in cached])
+        return keys, missing, predictions
+
+    def predict(self, loaded, raw):
+        """
+        Predictions for a raw input matrix using the `loaded` model, running
+        the model only for the rows that are not cached.
+        """
+        if not self.enabled:
+            return loaded.predict_raw(raw)
+        keys, missing, predictions = self._lookup(loaded, raw)
+        if missing:
+            predictions[missing] = loaded.predict_raw(np.asarray(raw)[missing])
+            self.put_many([keys[i] for i in missing], predictions[missing], loaded.version)
+        return predictions
+
+    async def predict_async(self, loaded, raw, run):
+        """
+        `predict` for async endpoints: the rows that are not cached are scored
+        by awaiting `run(loaded, rows)`, e.g. on the inference executor.
+        """
+        if not self.enabled:
+            return await run(loaded, raw)
+        keys, missing, predictions = self._lookup(loaded, raw)
+        if missing:
+            predictions[missing] = await run(loaded, np.asarray(raw)[missing])
+            self.put_many([keys[i] for i in missing], predictions[missing], loaded.version)
+        return predictions
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for the /cache/stats endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'model_version': self.version,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'decimals': self.decimals,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
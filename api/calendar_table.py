@@ -0,0 +1,161 @@
+"""
+Calendar table: the temporal model inputs of each date, looked up by the date.
+
+Nine of the 14 raw inputs describe the calendar, not the weather. These are
+season, yr, mnth, holiday, weekday, workingday, day_of_year, month and
+day_of_week. They all follow from the date, so a date-keyed request only
+sends `dteday` and the five weather fields; the server fills in the rest.
+
+The table is built once, at startup. The dates of day.csv take their rows
+from the data, so they are exactly what the model was trained on. Later
+dates, up to CALENDAR_LAST_DAY, are filled in with `calendar_rows`. It
+applies the rules the data follows: Washington DC public holidays, moved
+to the nearest weekday when they fall on a weekend, and fixed season
+start days. These rules reproduce every row of day.csv. The model only
+knows yr 0 (2011) and 1 (2012), so later years are scored as yr=1, the
+latest demand level it has seen.
+
+Row i holds the date `first_day + i`, so looking dates up is a subtraction
+and an array gather. Turning many dates and their weather into a raw input
+matrix costs the same for 1 row as for 10,000.
+"""
+
+import os
+
+import numpy as np
+
+from api.bundle import ARTIFACT_DIR
+from api.features import RAW_FEATURES, RAW_INDEX, calendar_columns, raw_matrix_from_frame
+
+CALENDAR_DATA_PATH = os.path.join(ARTIFACT_DIR, '..', '..', 'day.csv')
+CALENDAR_LAST_DAY = '2035-12-31'
+
+CALENDAR_FEATURES = ('season', 'yr', 'mnth', 'holiday', 'weekday', 'workingday',
+                     'day_of_year', 'month', 'day_of_week')
+WEATHER_FEATURES = ('weathersit', 'temp', 'atemp', 'hum', 'windspeed')
+
+_CALENDAR_INDEX = np.array([RAW_INDEX[name] for name in CALENDAR_FEATURES], dtype=np.intp)
+_WEATHER_INDEX = np.array([RAW_INDEX[name] for name in WEATHER_FEATURES], dtype=np.intp)
+
+FIRST_MODEL_YEAR = 2011  # yr=0
+LAST_MODEL_YR = 1
+
+# First (month, day) of seasons 2 (spring), 3 (summer), 4 (fall) and 1 (winter)
+SEASON_STARTS = ((3, 21), (6, 21), (9, 23), (12, 21))
+
+# Public holidays on a fixed date, as (month, day): New Year's Day, DC Emancipation Day,
+# Independence Day, Veterans Day and Christmas
+FIXED_HOLIDAYS = ((1, 1), (4, 16), (7, 4), (11, 11), (12, 25))
+# Public holidays on the n-th weekday (Monday=0) of a month, as (month, weekday, n); n=-1 is the last:
+# Martin Luther King Jr. Day, Presidents' Day, Memorial Day, Labor Day, Columbus Day and Thanksgiving
+WEEKDAY_HOLIDAYS = ((1, 0, 3), (2, 0, 3), (5, 0, -1), (9, 0, 1), (10, 0, 2), (11, 3, 4))
+
+
+class DateOutOfRange(ValueError):
+    """Raised for dates the calendar table does not cover."""
+
+
+def _dates(years, month, day):
+    """datetime64[D] of (year, month, day) for an array of years"""
+    months = ((np.asarray(years) - 1970) * 12 + (month - 1)).astype('datetime64[M]')
+    return months.astype('datetime64[D]') + np.timedelta64(day - 1, 'D')
+
+
+def _day_of_week(days):
+    # 1970-01-01 was a Thursday (Monday=0)
+    return (days.astype(np.int64) + 3) % 7
+
+
+def public_holidays(years):
+    """The (observed) public holiday dates of the given years, sorted"""
+    years = np.asarray(years)
+    holidays = []
+    for month, day in FIXED_HOLIDAYS:
+        dates = _dates(years, month, day)
+        weekday = _day_of_week(dates)
+        # Saturday holidays are observed on the Friday before, Sunday ones on the Monday after
+        holidays.append(dates + np.where(weekday == 5, -1, np.where(weekday == 6, 1, 0)).astype('timedelta64[D]'))
+    for month, weekday, n in WEEKDAY_HOLIDAYS:
+        if n > 0:
+            first = _dates(years, month, 1)
+            holidays.append(first + ((weekday - _day_of_week(first)) % 7 + 7 * (n - 1)).astype('timedelta64[D]'))
+        else:
+            last = _dates(years, month + 1, 1) - np.timedelta64(1, 'D')
+            holidays.append(last - ((_day_of_week(last) - weekday) % 7).astype('timedelta64[D]'))
+    return np.sort(np.concatenate(holidays))
+
+
+def calendar_rows(days):
+    """The (N, len(CALENDAR_FEATURES)) calendar inputs of an array of dates, by rule"""
+    days = np.asarray(days, dtype='datetime64[D]')
+    years = days.astype('datetime64[Y]').astype(np.int64) + 1970
+    day_of_year, month, day_of_week = calendar_columns(days)
+    day_of_month = (days - days.astype('datetime64[M]')).astype(np.int64) + 1
+    month_day = month * 100 + day_of_month
+    season = np.ones(len(days), dtype=np.int64)
+    for s, (start_month, start_day) in enumerate(SEASON_STARTS[:-1], start=2):
+        season = np.where(month_day >= start_month * 100 + start_day, s, season)
+    winter_month, winter_day = SEASON_STARTS[-1]
+    season = np.where(month_day >= winter_month * 100 + winter_day, 1, season)
+
+    holiday = np.isin(days, public_holidays(np.unique(years))) if len(days) else np.zeros(0, dtype=bool)
+    weekday = (day_of_week + 1) % 7  # Sunday=0, as in the data
+    workingday = (weekday >= 1) & (weekday <= 5) & ~holiday
+    yr = np.clip(years - FIRST_MODEL_YEAR, 0, LAST_MODEL_YR)
+    return np.column_stack([season, yr, month, holiday, weekday, workingday,
+                            day_of_year, month, day_of_week]).astype(np.float64)
+
+
+class CalendarTable:
+    """The CALENDAR_FEATURES values of a contiguous range of dates."""
+
+    def __init__(self, first_day, rows):
+        """`rows[i]` holds the calendar inputs of `first_day + i`"""
+        self.first_day = np.datetime64(first_day, 'D')
+        self.rows = np.asarray(rows, dtype=np.float64)
+        self.last_day = self.first_day + np.timedelta64(len(self.rows) - 1, 'D')
+
+    @classmethod
+    def from_frame(cls, df, last_day=CALENDAR_LAST_DAY):
+        """
+        Table from the first date of a day.csv/hour.csv style frame to `last_day`
+        (or the frame's last date, if later). The frame's dates keep their own
+        rows; other dates get `calendar_rows`.
+        """
+        days = np.asarray(df['dteday'].to_numpy(), dtype='datetime64[D]')
+        calendar = raw_matrix_from_frame(df)[:, _CALENDAR_INDEX]
+        days, first = np.unique(days, return_index=True)
+        last_day = max(days[-1], np.datetime64(last_day, 'D'))
+        rows = calendar_rows(np.arange(days[0], last_day + np.timedelta64(1, 'D')))
+        rows[(days - days[0]).astype(np.intp)] = calendar[first]
+        return cls(days[0], rows)
+
+    @classmethod
+    def from_csv(cls, path=CALENDAR_DATA_PATH, last_day=CALENDAR_LAST_DAY):
+        from api.ingest import read_bike_csv
+
+        return cls.from_frame(read_bike_csv(path), last_day)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def offsets(self, dates):
+        """Row of each date in the table; raises DateOutOfRange if any date is not covered"""
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        offsets = (dates - self.first_day).astype(np.intp)
+        covered = (offsets >= 0) & (offsets < len(self.rows))
+        if not covered.all():
+            raise DateOutOfRange(f"No calendar data for {dates[~covered][0]}; dates must be between "
+                                 f"{self.first_day} and {self.last_day}")
+        return offsets
+
+    def raw_for_dates(self, dates, weather):
+        """
+        The (N, len(RAW_FEATURES)) raw input matrix for N dates and their
+        (N, len(WEATHER_FEATURES)) weather values.
+        """
+        offsets = self.offsets(dates)
+        raw = np.empty((len(offsets), len(RAW_FEATURES)), dtype=np.float64)
+        raw[:, _CALENDAR_INDEX] = self.rows[offsets]
+        raw[:, _WEATHER_INDEX] = weather
+        return raw
@@ -0,0 +1,258 @@
+"""
+Weather climatology index: typical weather for each day of the year and hour.
+
+Forecast-style requests need weather for dates nobody has observed yet. The
+index holds, for each day of the year (and each hour of it), the weather
+recorded in day.csv (and hour.csv):
+
+    mean         temp, atemp, hum and windspeed
+    quantiles    the same four at CLIMATOLOGY_QUANTILES
+    weathersit   the share of each weather situation 1-4
+
+Every day pools the observations within WINDOW_DAYS days of it, wrapping
+around the new year. That smooths out single odd days and keeps a few
+dozen samples behind each quantile, even with only two years of data.
+
+The arrays are indexed by day of year - 1 (and hour), so the weather of any
+date is one array read. They are written by `python -m api.climatology`
+as float16 `.npy` files plus a manifest, next to the model bundle, and
+memory-mapped at startup:
+
+    summative/linear_regression/climatology/
+        manifest.json
+        daily_mean.npy        (366, 4)
+        daily_quantiles.npy   (366, Q, 4)
+        daily_weathersit.npy  (366, 4)
+        hourly_mean.npy       (366, 24, 4)
+        hourly_quantiles.npy  (366, 24, Q, 4)
+        hourly_weathersit.npy (366, 24, 4)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from api.bundle import ARTIFACT_DIR, file_sha256, install_directory
+from api.calendar_table import WEATHER_FEATURES
+from api.features import calendar_columns
+
+CLIMATOLOGY_FORMAT_VERSION = 1
+CLIMATOLOGY_DIR = os.path.join(ARTIFACT_DIR, 'climatology')
+DAY_DATA_PATH = os.path.join(ARTIFACT_DIR, '..', '..', 'day.csv')
+HOUR_DATA_PATH = os.path.join(ARTIFACT_DIR, '..', '..', 'hour.csv')
+
+CLIMATE_FEATURES = ('temp', 'atemp', 'hum', 'windspeed')
+CLIMATOLOGY_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+WINDOW_DAYS = 7
+DAYS = 366
+HOURS = 24
+ARRAY_NAMES = ('daily_mean', 'daily_quantiles', 'daily_weathersit',
+               'hourly_mean', 'hourly_quantiles', 'hourly_weathersit')
+
+_CLIMATE_INDEX = np.array([WEATHER_FEATURES.index(name) for name in CLIMATE_FEATURES], dtype=np.intp)
+_WEATHERSIT = WEATHER_FEATURES.index('weathersit')
+
+
+def _grouped_stats(groups, n_groups, values, situations):
+    """
+    Mean, CLIMATOLOGY_QUANTILES (linear interpolation, as np.quantile) and
+    weathersit shares of `values` (M, F) per group id in `groups` (M,)
+    """
+    counts = np.bincount(groups, minlength=n_groups)
+    if counts.min() == 0:
+        raise ValueError("Not enough data: some days of the year have no observations within the window")
+    n_features = values.shape[1]
+    mean = np.stack([np.bincount(groups, weights=values[:, i], minlength=n_groups) for i in range(n_features)],
+                    axis=1) / counts[:, None]
+
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    last = starts + counts - 1
+    quantiles = np.empty((n_groups, len(CLIMATOLOGY_QUANTILES), n_features))
+    for i in range(n_features):
+        ordered = values[np.lexsort((values[:, i], groups)), i]
+        for j, q in enumerate(CLIMATOLOGY_QUANTILES):
+            position = starts + q * (counts - 1)
+            lower = np.floor(position).astype(np.intp)
+            fraction = position - lower
+            quantiles[:, j, i] = ordered[lower] * (1 - fraction) + ordered[np.minimum(lower + 1, last)] * fraction
+
+    shares = np.zeros((n_groups, 4))
+    np.add.at(shares, (groups, situations - 1), 1.0)
+    return mean, quantiles, shares / counts[:, None]
+
+
+def _window(day_index, window=WINDOW_DAYS):
+    """(target day, source row) pairs pooling each row into the days within `window` of its own"""
+    offsets = np.arange(-window, window + 1)
+    target = (day_index[None, :] + offsets[:, None]) % DAYS
+    source = np.broadcast_to(np.arange(len(day_index)), target.shape)
+    return target.ravel(), source.ravel()
+
+
+def _frame_stats(df, hourly, window):
+    day_index = calendar_columns(df['dteday'].to_numpy())[0] - 1
+    values = df[list(CLIMATE_FEATURES)].to_numpy(dtype=np.float64)
+    situations = df['weathersit'].to_numpy().astype(np.intp)
+    days, rows = _window(day_index, window)
+    if hourly:
+        groups, n_groups = days * HOURS + df['hr'].to_numpy().astype(np.intp)[rows], DAYS * HOURS
+    else:
+        groups, n_groups = days, DAYS
+    mean, quantiles, shares = _grouped_stats(groups, n_groups, values[rows], situations[rows])
+    if hourly:
+        mean = mean.reshape(DAYS, HOURS, -1)
+        quantiles = quantiles.reshape(DAYS, HOURS, len(CLIMATOLOGY_QUANTILES), -1)
+        shares = shares.reshape(DAYS, HOURS, -1)
+    return mean, quantiles, shares
+
+
+def build_climatology(day_df, hour_df, window=WINDOW_DAYS):
+    """The index arrays (float16, by ARRAY_NAMES) of a day.csv and an hour.csv frame"""
+    arrays = {}
+    for prefix, df, hourly in (('daily', day_df, False), ('hourly', hour_df, True)):
+        mean, quantiles, shares = _frame_stats(df, hourly, window)
+        arrays[f'{prefix}_mean'] = mean.astype(np.float16)
+        arrays[f'{prefix}_quantiles'] = quantiles.astype(np.float16)
+        arrays[f'{prefix}_weathersit'] = shares.astype(np.float16)
+    return arrays
+
+
+class ClimatologyIndex:
+    """Typical weather by day of year and hour, looked up by index."""
+
+    def __init__(self, arrays, manifest=None):
+        self.arrays = arrays
+        self.manifest = manifest or {}
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def from_csv(cls, day_path=DAY_DATA_PATH, hour_path=HOUR_DATA_PATH, window=WINDOW_DAYS):
+        from api.ingest import read_bike_csv
+
+        usecols = ['dteday', 'weathersit', *CLIMATE_FEATURES]
+        arrays = build_climatology(read_bike_csv(day_path, usecols=usecols),
+                                   read_bike_csv(hour_path, usecols=usecols + ['hr']), window)
+        return cls(arrays, climatology_manifest(arrays, day_path, hour_path, window))
+
+    @staticmethod
+    def day_index(dates):
+        """Row of each date in the index (day of year - 1)"""
+        return calendar_columns(dates)[0] - 1
+
+    def typical_weather(self, dates, hours=None):
+        """
+        (N, len(WEATHER_FEATURES)) weather of each date (and hour): the mean
+        of the continuous fields and the most frequent weathersit
+        """
+        days = self.day_index(dates)
+        if hours is None:
+            mean, shares = self.daily_mean[days], self.daily_weathersit[days]
+        else:
+            hours = np.asarray(hours, dtype=np.intp)
+            mean, shares = self.hourly_mean[days, hours], self.hourly_weathersit[days, hours]
+        weather = np.empty((len(days), len(WEATHER_FEATURES)), dtype=np.float64)
+        weather[:, _CLIMATE_INDEX] = mean
+        weather[:, _WEATHERSIT] = np.argmax(shares, axis=1) + 1
+        return weather
+
+    def fill_missing(self, dates, weather):
+        """`weather` (N, len(WEATHER_FEATURES)) with its NaN fields replaced by the typical weather"""
+        weather = np.array(weather, dtype=np.float64)
+        missing = np.isnan(weather)
+        if missing.any():
+            rows = missing.any(axis=1)
+            weather[rows] = np.where(missing[rows], self.typical_weather(np.asarray(dates)[rows]), weather[rows])
+        return weather
+
+    def describe(self, day, hourly=False):
+        """The index entries of one date as plain Python values"""
+        index = int(self.day_index(np.array([day], dtype='datetime64[D]'))[0])
+
+        def entry(mean, quantiles, shares):
+            return {
+                'mean': {name: round(float(v), 4) for name, v in zip(CLIMATE_FEATURES, mean)},
+                'quantiles': {name: {str(q): round(float(v), 4) for q, v in zip(CLIMATOLOGY_QUANTILES, quantiles[:, i])}
+                              for i, name in enumerate(CLIMATE_FEATURES)},
+                'weathersit': {str(s): round(float(v), 4) for s, v in enumerate(shares, start=1)},
+            }
+
+        result = {'day_of_year': index + 1, **entry(self.daily_mean[index], self.daily_quantiles[index],
+                                                    self.daily_weathersit[index])}
+        if hourly:
+            result['hours'] = [{'hr': hr, **entry(self.hourly_mean[index, hr], self.hourly_quantiles[index, hr],
+                                                  self.hourly_weathersit[index, hr])}
+                               for hr in range(HOURS)]
+        return result
+
+
+def climatology_manifest(arrays, day_path, hour_path, window):
+    return {
+        'format_version': CLIMATOLOGY_FORMAT_VERSION,
+        'features': list(CLIMATE_FEATURES),
+        'quantiles': list(CLIMATOLOGY_QUANTILES),
+        'window_days': window,
+        'arrays': {name: {'file': f'{name}.npy', 'dtype': array.dtype.str, 'shape': list(array.shape)}
+                   for name, array in arrays.items()},
+        'data_hashes': {os.path.basename(path): file_sha256(path) for path in (day_path, hour_path)},
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def save_climatology(index, path=CLIMATOLOGY_DIR):
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.climatology-', dir=os.path.dirname(path))
+    try:
+        os.chmod(tmp_dir, 0o755)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(index.arrays[name]))
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(index.manifest, f, indent=2)
+        install_directory(tmp_dir, path)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_climatology(path=CLIMATOLOGY_DIR):
+    """Load a saved index, memory-mapped read-only"""
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != CLIMATOLOGY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported climatology format version {manifest.get('format_version')}")
+    arrays = {}
+    for name, entry in manifest['arrays'].items():
+        array = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if array.dtype.str != entry['dtype'] or list(array.shape) != entry['shape']:
+            raise ValueError(f"Array '{name}' does not match the climatology manifest")
+        arrays[name] = array
+    return ClimatologyIndex(arrays, manifest)
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the weather climatology index from day.csv and hour.csv")
+    parser.add_argument('--day-data', default=DAY_DATA_PATH)
+    parser.add_argument('--hour-data', default=HOUR_DATA_PATH)
+    parser.add_argument('--window', type=int, default=WINDOW_DAYS, help="days pooled on each side of a day")
+    parser.add_argument('--out', default=CLIMATOLOGY_DIR)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = ClimatologyIndex.from_csv(args.day_data, args.hour_data, args.window)
+    build_seconds = time.perf_counter() - started
+    save_climatology(index, args.out)
+    size = sum(array.nbytes for array in index.arrays.values())
+    print(f"✅ Climatology index ({len(CLIMATOLOGY_QUANTILES)} quantiles, ±{args.window} days): "
+          f"{size / 1024:.0f} KB, built in {build_seconds * 1000:.0f} ms -> {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
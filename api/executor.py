@@ -0,0 +1,171 @@
+"""
+Inference executor: runs model predictions off the event loop.
+
+The prediction endpoints are `async def`. Calling the model directly in them
+would block the event loop for the length of a forest prediction, stalling
+every other connection on the worker, /health included. The endpoints
+instead await `InferenceExecutor.predict`, which runs the model on a pool:
+
+    thread    (default) a ThreadPoolExecutor of INFERENCE_WORKERS threads.
+              NumPy releases the GIL inside its array kernels, so other
+              requests are served while a prediction runs.
+    process   a ProcessPoolExecutor. Each process loads the model itself,
+              from the same bundle/pickles and with the same loader
+              settings as the registry. When a registry swaps in another
+              version, the pool is replaced once by one that loads it;
+              predictions already running finish on the old processes.
+              A request for a version the processes do not hold (e.g. one
+              still scoring with the model from before a reload) raises
+              `ModelVersionMismatch`, answered with a 503. Bundle arrays
+              are memory-mapped, so the processes share their pages.
+    inline    no pool: predict on the event loop, as before.
+
+Backpressure: at most INFERENCE_MAX_PENDING predictions may be queued or
+running. Past that, `predict` raises `ExecutorSaturated` and the endpoint
+answers 503 with Retry-After, rather than letting the queue and the latency
+of every request grow without bound.
+"""
+
+import asyncio
+import contextvars
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTOR_KINDS = ('thread', 'process', 'inline')
+
+# Models loaded in an inference process, by loader settings (process mode only)
+_PROCESS_MODELS = {}
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the executor already has its maximum number of pending predictions."""
+
+
+class ModelVersionMismatch(Exception):
+    """Raised when the inference processes hold another model version than the one a request asks for."""
+
+
+def _settings_key(settings):
+    return json.dumps(settings, sort_keys=True)
+
+
+def _process_model(settings):
+    from api.loader import ModelLoader
+
+    key = _settings_key(settings)
+    loaded = _PROCESS_MODELS.get(key)
+    if loaded is None:
+        loaded, _ = ModelLoader(**settings).load_candidate()
+        _PROCESS_MODELS[key] = loaded
+    return loaded
+
+
+def _init_process(settings_list):
+    """Load the served models when an inference process starts, not on its first request"""
+    for settings in settings_list:
+        try:
+            _process_model(settings)
+        except Exception as e:  # the request path retries and reports the error
+            print(f"⚠️  Inference process could not preload a model: {e}")
+
+
+def _predict_in_process(settings, version, raw):
+    loaded = _process_model(settings)
+    if loaded.version != version:
+        raise ModelVersionMismatch(f"Inference process holds model {loaded.version}, not {version}")
+    return loaded.predict_raw(raw)
+
+
+class InferenceExecutor:
+    """Thread or process pool for predictions, with a bound on pending work."""
+
+    def __init__(self, kind='thread', workers=None, max_pending=64):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown inference executor {kind!r}; expected one of {EXECUTOR_KINDS}")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.recycles = 0
+        self._pool = None
+        self._registries = []
+        # Settings key -> model version each registry served when the process pool was created
+        self._pool_versions = {}
+
+    @classmethod
+    def from_env(cls):
+        workers = os.environ.get('INFERENCE_WORKERS')
+        return cls(kind=os.environ.get('INFERENCE_EXECUTOR', 'thread'),
+                   workers=int(workers) if workers else None,
+                   max_pending=int(os.environ.get('INFERENCE_MAX_PENDING', '64')))
+
+    def start(self, registries=()):
+        """Create the pool; process workers preload the models of `registries`"""
+        if self.kind == 'thread':
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+        elif self.kind == 'process':
+            self._registries = list(registries)
+            self._pool = self._process_pool()
+
+    def _process_pool(self):
+        self._pool_versions = {_settings_key(registry.settings()): getattr(registry.current, 'version', None)
+                               for registry in self._registries}
+        # spawn: the API process already runs threads, which fork does not copy safely
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_process,
+                                   initargs=([registry.settings() for registry in self._registries],))
+
+    def _recycle_if_swapped(self, registry):
+        """Replace the process pool, once, when `registry` serves a version the pool was not started with"""
+        version = getattr(registry.current, 'version', None)
+        if self._pool_versions.get(_settings_key(registry.settings())) == version:
+            return
+        if registry not in self._registries:
+            self._registries.append(registry)
+        old_pool, self._pool = self._pool, self._process_pool()
+        self.recycles += 1
+        old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def predict(self, registry, loaded, raw):
+        """Predictions of `loaded` (served by `registry`) for a raw input matrix"""
+        if self._pool is None:
+            return loaded.predict_raw(raw)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorSaturated(f"{self.pending} predictions already pending")
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            if self.kind == 'process':
+                self._recycle_if_swapped(registry)
+                future = loop.run_in_executor(self._pool, _predict_in_process, registry.settings(), loaded.version,
+                                              raw)
+            else:
+                # Carry the request's context (its metrics timer) into the pool thread
+                context = contextvars.copy_context()
+                future = loop.run_in_executor(self._pool, context.run, loaded.predict_raw, raw)
+            result = await future
+            self.completed += 1
+            return result
+        finally:
+            self.pending -= 1
+
+    def stats(self):
+        return {
+            'kind': self.kind,
+            'workers': self.workers if self.kind != 'inline' else 0,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'recycles': self.recycles,
+        }
@@ -0,0 +1,171 @@
+"""
+On-disk cache of the preprocessed training matrix.
+
+Every training script turns day.csv/hour.csv into the same float64 feature
+matrix and target vector before fitting anything: parse the CSV text,
+convert `dteday`, build the interaction and seasonal columns. The cache
+writes the result once as raw `.npy` files and later runs memory-map them:
+
+    feature_cache/
+        day-3f0c9a1e5b7d2c48/
+            X.npy           (rows, n_features) float64
+            y.npy           (rows,) int32
+            meta.json       source path, key, feature columns, shapes
+
+An entry is keyed by a SHA-256 over the CSV contents, the feature columns,
+the raw input layout, the CSV dtypes and the source of api/features.py and
+api/ingest.py. Editing the CSV, the feature list or the transform code
+therefore selects a new entry, and the stale entry for the same CSV is
+removed when the new one is written.
+
+    python -m api.feature_cache [day.csv hour.csv] [--clear]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from api.bundle import file_sha256, install_directory
+from api.features import FEATURE_COLUMNS, HOURLY_FEATURE_COLUMNS, FeatureTransform
+from api.ingest import BIKE_CSV_DTYPES, read_bike_csv
+
+FEATURE_CACHE_FORMAT_VERSION = 1
+FEATURE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'feature_cache')
+META_FILE = 'meta.json'
+
+_SOURCE_FILES = [os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                 for name in ('features.py', 'ingest.py')]
+
+
+def default_feature_columns(data_path):
+    """The hourly feature set for hour.csv-style files (with an `hr` column), the daily one otherwise"""
+    with open(data_path) as f:
+        header = f.readline().strip().split(',')
+    return list(HOURLY_FEATURE_COLUMNS if 'hr' in header else FEATURE_COLUMNS)
+
+
+def cache_key(data_path, feature_columns):
+    """Hex key identifying the CSV contents together with the feature spec that processes them"""
+    feature_transform = FeatureTransform(feature_columns)
+    spec = {
+        'format': FEATURE_CACHE_FORMAT_VERSION,
+        'data': file_sha256(data_path),
+        'feature_columns': list(feature_columns),
+        'raw_features': list(feature_transform.raw_features),
+        'dtypes': {name: np.dtype(dtype).str for name, dtype in BIKE_CSV_DTYPES.items()},
+        'source': [file_sha256(path) for path in _SOURCE_FILES],
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def entry_dir(data_path, key, cache_dir=FEATURE_CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{key[:16]}")
+
+
+def _read_meta(path):
+    try:
+        with open(os.path.join(path, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove_stale_entries(data_path, keep, cache_dir):
+    """Delete older entries built from the same CSV path"""
+    source = os.path.abspath(data_path)
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if path == keep or name.startswith('.'):
+            continue
+        meta = _read_meta(path)
+        if meta is not None and meta.get('source') == source:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def build_entry(data_path, feature_columns, key, cache_dir=FEATURE_CACHE_DIR):
+    """Preprocess the CSV and write it as a cache entry; returns (X, y) in memory"""
+    data = read_bike_csv(data_path)
+    X = FeatureTransform(feature_columns).transform_frame(data)
+    y = data['cnt'].to_numpy()
+
+    path = entry_dir(data_path, key, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.entry-', dir=cache_dir)
+    try:
+        np.save(os.path.join(tmp_dir, 'X.npy'), X)
+        np.save(os.path.join(tmp_dir, 'y.npy'), y)
+        meta = {
+            'source': os.path.abspath(data_path),
+            'key': key,
+            'feature_columns': list(feature_columns),
+            'rows': int(X.shape[0]),
+            'n_features': int(X.shape[1]),
+        }
+        with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+        install_directory(tmp_dir, path)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    _remove_stale_entries(data_path, path, cache_dir)
+    return X, y
+
+
+def load_training_matrix(data_path, feature_columns=None, cache_dir=FEATURE_CACHE_DIR):
+    """
+    The feature matrix and target for a bike-sharing CSV as `(X, y, cached)`.
+
+    When a current cache entry exists X and y are read-only memory maps of
+    it and `cached` is True; otherwise the CSV is preprocessed, written to
+    the cache and returned in memory. `cache_dir=None` skips the cache.
+    """
+    feature_columns = list(feature_columns or default_feature_columns(data_path))
+    if cache_dir is None:
+        data = read_bike_csv(data_path)
+        return FeatureTransform(feature_columns).transform_frame(data), data['cnt'].to_numpy(), False
+
+    key = cache_key(data_path, feature_columns)
+    path = entry_dir(data_path, key, cache_dir)
+    meta = _read_meta(path)
+    if meta is not None and meta.get('key') == key:
+        try:
+            X = np.load(os.path.join(path, 'X.npy'), mmap_mode='r')
+            y = np.load(os.path.join(path, 'y.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            pass  # damaged entry: rebuild it below
+        else:
+            if X.shape == (meta['rows'], len(feature_columns)) and y.shape == (meta['rows'],):
+                return X, y, True
+    X, y = build_entry(data_path, feature_columns, key, cache_dir)
+    return X, y, False
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build or inspect the preprocessed training matrix cache")
+    parser.add_argument('data', nargs='*', default=['day.csv', 'hour.csv'])
+    parser.add_argument('--cache-dir', default=FEATURE_CACHE_DIR)
+    parser.add_argument('--clear', action='store_true', help="delete the whole cache first")
+    args = parser.parse_args()
+
+    if args.clear and os.path.isdir(args.cache_dir):
+        shutil.rmtree(args.cache_dir)
+        print(f"🗑️  Cleared {os.path.abspath(args.cache_dir)}")
+
+    for data_path in args.data:
+        started = time.perf_counter()
+        X, y, cached = load_training_matrix(data_path, cache_dir=args.cache_dir)
+        elapsed = time.perf_counter() - started
+        source = "memory-mapped from cache" if cached else "preprocessed from CSV and cached"
+        print(f"📦 {data_path}: X {X.shape}, y {y.shape} {source} in {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Feature engineering shared by the training scripts and the API.
+
+The model is trained on 14 raw columns plus 7 derived features (weather
+interactions and per-season temperature). Instead of repeating that column
+math in every script, a FeatureTransform is compiled once from the saved
+`feature_columns.pkl` ordering into a few index arrays, and then fills a
+preallocated float64 matrix with whole-column NumPy operations. The same
+code path is used for a single API request and for the full training set.
+"""
+
+from operator import attrgetter, itemgetter
+
+import numpy as np
+
+# Raw inputs, in the order they appear in BikeRentalRequest
+RAW_FEATURES = [
+    'season', 'yr', 'mnth', 'holiday', 'weekday', 'workingday', 'weathersit',
+    'temp', 'atemp', 'hum', 'windspeed', 'day_of_year', 'month', 'day_of_week'
+]
+RAW_INDEX = {name: i for i, name in enumerate(RAW_FEATURES)}
+
+# Raw inputs of the hourly model: the daily inputs plus the hour of day (0-23)
+HOURLY_RAW_FEATURES = RAW_FEATURES + ['hr']
+
+# Derived features: products of two raw columns
+INTERACTION_FEATURES = {
+    'temp_humidity': ('temp', 'hum'),
+    'temp_windspeed': ('temp', 'windspeed'),
+    'weather_temp': ('weathersit', 'temp'),
+}
+
+# Derived features: temperature gated by the season code
+SEASON_TEMP_FEATURES = {
+    'spring_temp': 1,
+    'summer_temp': 2,
+    'fall_temp': 3,
+    'winter_temp': 4,
+}
+
+# Default column order used by the training scripts and saved to feature_columns.pkl
+FEATURE_COLUMNS = RAW_FEATURES + list(INTERACTION_FEATURES) + list(SEASON_TEMP_FEATURES)
+HOURLY_FEATURE_COLUMNS = FEATURE_COLUMNS + ['hr']
+
+# Precompiled field getters per raw layout: (attribute getter, item getter)
+_RECORD_GETTERS = {
+    tuple(layout): (attrgetter(*layout), itemgetter(*layout))
+    for layout in (RAW_FEATURES, HOURLY_RAW_FEATURES)
+}
+
+
+def raw_from_records(records, raw_features=RAW_FEATURES):
+    """
+    Build the (N, len(raw_features)) raw input matrix from request objects or dicts.
+
+    Field access goes through a precompiled attrgetter/itemgetter, so there
+    is no Python-level loop over the individual features.
+    """
+    if not records:
+        return np.empty((0, len(raw_features)), dtype=np.float64)
+    attrs, items = _RECORD_GETTERS[tuple(raw_features)]
+    getter = items if isinstance(records[0], dict) else attrs
+    return np.array([getter(r) for r in records], dtype=np.float64)
+
+
+def calendar_columns(dates):
+    """
+    Return day_of_year (1-366), month (1-12) and day_of_week (Monday=0)
+    for an array of dates, matching pandas' `dt.dayofyear`, `dt.month`
+    and `dt.dayofweek`.
+    """
+    days = np.asarray(dates, dtype='datetime64[D]')
+    day_of_year = (days - days.astype('datetime64[Y]')).astype(np.int64) + 1
+    month = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    # 1970-01-01 was a Thursday (dayofweek 3)
+    day_of_week = (days.astype(np.int64) + 3) % 7
+    return day_of_year, month, day_of_week
+
+
+def raw_features_for(feature_columns):
+    """The raw input layout a list of model feature columns is computed from"""
+    return HOURLY_RAW_FEATURES if 'hr' in feature_columns else RAW_FEATURES
+
+
+def raw_matrix_from_frame(df, raw_features=RAW_FEATURES):
+    """
+    Build the (N, len(raw_features)) raw input matrix from a day.csv/hour.csv
+    style DataFrame.
+
+    `day_of_year`, `month` and `day_of_week` are derived from `dteday` when
+    the frame does not already have them.
+    """
+    raw = np.empty((len(df), len(raw_features)), dtype=np.float64)
+    missing = [name for name in raw_features if name not in df.columns]
+    derived = {}
+    if missing:
+        if 'dteday' not in df.columns:
+            raise KeyError(f"Missing columns {missing} and no 'dteday' column to derive them from")
+        day_of_year, month, day_of_week = calendar_columns(df['dteday'].to_numpy())
+        derived = {'day_of_year': day_of_year, 'month': month, 'day_of_week': day_of_week}
+    for i, name in enumerate(raw_features):
+        if name in df.columns:
+            raw[:, i] = df[name].to_numpy()
+        elif name in derived:
+            raw[:, i] = derived[name]
+        else:
+            raise KeyError(f"Missing required column '{name}'")
+    return raw
+
+
+class FeatureTransform:
+    """
+    Maps the (N, 14) raw matrix to the (N, len(feature_columns)) model input.
+    Feature lists that include `hr` (the hourly model) read an (N, 15) raw
+    matrix in HOURLY_RAW_FEATURES order instead.
+
+    The feature list is compiled at construction time into three groups of
+    index arrays (plain copies, interaction products, seasonal temperature),
+    so `transform` runs a fixed handful of vectorized operations regardless
+    of how many columns or rows there are.
+    """
+
+    def __init__(self, feature_columns=None):
+        self.feature_columns = list(feature_columns if feature_columns is not None else FEATURE_COLUMNS)
+        self.raw_features = raw_features_for(self.feature_columns)
+        raw_index = {name: i for i, name in enumerate(self.raw_features)}
+
+        copy_src, copy_dst = [], []
+        prod_a, prod_b, prod_dst = [], [], []
+        season_codes, season_dst = [], []
+        for dst, name in enumerate(self.feature_columns):
+            if name in raw_index:
+                copy_src.append(raw_index[name])
+                copy_dst.append(dst)
+            elif name in INTERACTION_FEATURES:
+                a, b = INTERACTION_FEATURES[name]
+                prod_a.append(RAW_INDEX[a])
+                prod_b.append(RAW_INDEX[b])
+                prod_dst.append(dst)
+            elif name in SEASON_TEMP_FEATURES:
+                season_codes.append(SEASON_TEMP_FEATURES[name])
+                season_dst.append(dst)
+            else:
+                raise ValueError(f"Unknown feature column '{name}'")
+
+        self._copy_src = np.array(copy_src, dtype=np.intp)
+        self._copy_dst = np.array(copy_dst, dtype=np.intp)
+        self._prod_a = np.array(prod_a, dtype=np.intp)
+        self._prod_b = np.array(prod_b, dtype=np.intp)
+        self._prod_dst = np.array(prod_dst, dtype=np.intp)
+        self._season_codes = np.array(season_codes, dtype=np.float64)
+        self._season_dst = np.array(season_dst, dtype=np.intp)
+
+    @property
+    def n_features(self):
+        return len(self.feature_columns)
+
+    def transform(self, raw, out=None):
+        """
+        Compute the model input for a raw matrix of shape (N, n_raw) or (n_raw,),
+        where n_raw is len(self.raw_features).
+
+        If `out` is given it must be a float64 array of shape
+        (N, n_features) and is filled in place.
+        """
+        raw = np.asarray(raw, dtype=np.float64)
+        if raw.ndim == 1:
+            raw = raw.reshape(1, -1)
+        if raw.shape[1] != len(self.raw_features):
+            raise ValueError(f"Expected {len(self.raw_features)} raw columns, got {raw.shape[1]}")
+        if out is None:
+            out = np.empty((raw.shape[0], self.n_features), dtype=np.float64)
+
+        if self._copy_dst.size:
+            out[:, self._copy_dst] = raw[:, self._copy_src]
+        if self._prod_dst.size:
+            out[:, self._prod_dst] = raw[:, self._prod_a] * raw[:, self._prod_b]
+        if self._season_dst.size:
+            season = raw[:, RAW_INDEX['season'], None]
+            temp = raw[:, RAW_INDEX['temp'], None]
+            out[:, self._season_dst] = (season == self._season_codes) * temp
+        return out
+
+    def transform_records(self, records, out=None):
+        """Compute the model input for a list of request objects or dicts."""
+        return self.transform(raw_from_records(records, self.raw_features), out=out)
+
+    def transform_frame(self, df, out=None):
+        """Compute the model input for a day.csv/hour.csv style DataFrame."""
+        return self.transform(raw_matrix_from_frame(df, self.raw_features), out=out)
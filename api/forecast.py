@@ -0,0 +1,55 @@
+"""
+Date-range forecasts: raw inputs for every day of a range, built as arrays.
+
+A forecast covers the days `start..end` under one of these weather scenarios:
+
+    constant     the same weather on every day
+    daily        one weather record per day of the range, in order
+    climatology  for each day, the typical weather of that day of the year
+                 from the climatology index (api/climatology.py)
+
+Weather fields left out of a constant or daily record are filled in from the
+climatology index too.
+
+The dates are one `np.arange` and their calendar inputs one gather from the
+calendar table, so the whole range becomes a single raw matrix that is
+scored in one inference call. The response is streamed as JSON in chunks of
+days rather than built as one list of objects.
+"""
+
+import json
+
+import numpy as np
+
+FORECAST_SCENARIOS = ('constant', 'daily', 'climatology')
+MAX_FORECAST_DAYS = 3660
+STREAM_CHUNK_DAYS = 512
+
+
+def forecast_dates(start, end):
+    """The dates start..end (inclusive) as datetime64[D]"""
+    return np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + np.timedelta64(1, 'D'))
+
+
+def constant_weather(values, n_days):
+    """The same weather row (WEATHER_FEATURES order) for n_days days"""
+    return np.tile(np.asarray(values, dtype=np.float64), (n_days, 1))
+
+
+def stream_forecast_json(header, dates, predicted_rentals, confidence, chunk_days=STREAM_CHUNK_DAYS):
+    """
+    Yield a JSON object made of `header`'s fields plus a `predictions`
+    list with one {date, predicted_rentals, confidence} entry per day,
+    `chunk_days` entries at a time.
+    """
+    yield json.dumps(header)[:-1] + (', ' if header else '') + '"predictions": ['
+    days = np.datetime_as_string(dates, unit='D')
+    for start in range(0, len(days), chunk_days):
+        stop = min(start + chunk_days, len(days))
+        entries = ','.join(
+            f'{{"date":"{day}","predicted_rentals":{rentals},"confidence":{conf}}}'
+            for day, rentals, conf in zip(days[start:stop].tolist(),
+                                          predicted_rentals[start:stop].tolist(),
+                                          np.round(confidence[start:stop], 2).tolist()))
+        yield (',' if start else '') + entries
+    yield ']}'
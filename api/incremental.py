@@ -0,0 +1,207 @@
+"""
+Incremental training of the linear model.
+
+Linear regression on standardized features only needs a few sufficient
+statistics of the data: the row count, the feature and target means, the
+centered co-moment matrix of the features (the 21x21 "XᵀX" after
+centering) and the centered feature/target cross-moments ("Xᵀy"). The
+StandardScaler's mean and variance come from the same numbers. Those
+statistics are merged batch by batch with Chan's parallel update, which
+keeps them numerically stable without ever holding the whole dataset.
+
+`python -m api.incremental` streams the CSV in bounded-memory chunks (see
+api/ingest.py), reading only the rows appended since the last run (it
+remembers the byte offset it had reached). It folds them into the saved
+statistics, re-solves the 21x21 system and writes the usual pickles + model
+bundle. The first run, or `--rebuild`, reads the whole file.
+New data must be appended as whole lines; rewriting earlier rows needs a
+`--rebuild`.
+"""
+
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from api.bundle import ARTIFACT_DIR, export_bundle
+from api.features import FEATURE_COLUMNS, HOURLY_FEATURE_COLUMNS, FeatureTransform
+from api.ingest import DEFAULT_CHUNK_ROWS, BikeCsvReader
+
+INCREMENTAL_DIR = os.path.join(ARTIFACT_DIR, 'incremental')
+STATE_FILE = 'incremental_state.npz'
+
+
+class RunningLinearStats:
+    """Mergeable sufficient statistics for (standardized) least squares."""
+
+    def __init__(self, n_features):
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.comoment = np.zeros((n_features, n_features))  # sum of (x - mean)(x - mean)ᵀ
+        self.mean_y = 0.0
+        self.cross = np.zeros(n_features)  # sum of (x - mean)(y - mean_y)
+
+    def update(self, X, y):
+        """Fold a batch of rows into the statistics"""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n_b = len(y)
+        if n_b == 0:
+            return
+        mean_b = X.mean(axis=0)
+        mean_y_b = y.mean()
+        Xc = X - mean_b
+        comoment_b = Xc.T @ Xc
+        cross_b = Xc.T @ (y - mean_y_b)
+
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        delta_y = mean_y_b - self.mean_y
+        weight = self.n * n_b / n
+        self.comoment += comoment_b + weight * np.outer(delta, delta)
+        self.cross += cross_b + weight * delta * delta_y
+        self.mean += delta * n_b / n
+        self.mean_y += delta_y * n_b / n
+        self.n = n
+
+    def scaler_scale(self):
+        """StandardScaler's population standard deviation, 1 for constant features"""
+        var = np.diag(self.comoment) / self.n
+        scale = np.sqrt(var)
+        scale[scale == 0.0] = 1.0
+        return var, scale
+
+    def solve(self):
+        """Coefficients on standardized features and the intercept, as LinearRegression would fit"""
+        _, scale = self.scaler_scale()
+        gram = self.comoment / np.outer(scale, scale)
+        # Minimum-norm solution: the feature set has exactly collinear columns
+        # (mnth == month, the season temperatures sum to temp)
+        coef = np.linalg.lstsq(gram, self.cross / scale, rcond=1e-10)[0]
+        return coef, self.mean_y
+
+    def to_sklearn(self):
+        """A fitted (StandardScaler, LinearRegression) pair, as generate_models.py saves them"""
+        from sklearn.linear_model import LinearRegression
+        from sklearn.preprocessing import StandardScaler
+
+        var, scale = self.scaler_scale()
+        scaler = StandardScaler()
+        scaler.mean_, scaler.var_, scaler.scale_ = self.mean.copy(), var, scale
+        scaler.n_samples_seen_ = self.n
+        scaler.n_features_in_ = len(self.mean)
+
+        coef, intercept = self.solve()
+        model = LinearRegression()
+        model.coef_, model.intercept_ = coef, intercept
+        model.n_features_in_ = len(coef)
+        return scaler, model
+
+    def to_arrays(self):
+        return {'n': np.array(self.n), 'mean': self.mean, 'comoment': self.comoment,
+                'mean_y': np.array(self.mean_y), 'cross': self.cross}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        stats = cls(len(arrays['mean']))
+        stats.n = int(arrays['n'])
+        stats.mean = np.array(arrays['mean'], dtype=np.float64)
+        stats.comoment = np.array(arrays['comoment'], dtype=np.float64)
+        stats.mean_y = float(arrays['mean_y'])
+        stats.cross = np.array(arrays['cross'], dtype=np.float64)
+        return stats
+
+
+class IncrementalTrainer:
+    """The running statistics for one CSV plus how far into the file they reach."""
+
+    def __init__(self, data_path, feature_columns, stats=None, offset=None, rows=0,
+                 chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.data_path = data_path
+        self.chunk_rows = chunk_rows
+        self.feature_columns = list(feature_columns)
+        self.feature_transform = FeatureTransform(self.feature_columns)
+        self.stats = stats or RunningLinearStats(len(self.feature_columns))
+        self.offset = offset
+        self.rows = rows
+
+    @classmethod
+    def load(cls, state_path, data_path):
+        with np.load(state_path) as state:
+            meta = json.loads(str(state['meta']))
+            stats = RunningLinearStats.from_arrays(state)
+        if os.path.abspath(meta['data_path']) != os.path.abspath(data_path):
+            raise ValueError(f"Saved statistics are for {meta['data_path']}, not {data_path}; use --rebuild")
+        return cls(data_path, meta['feature_columns'], stats, meta['offset'], meta['rows'])
+
+    def save(self, state_path):
+        meta = {'data_path': os.path.abspath(self.data_path), 'feature_columns': self.feature_columns,
+                'offset': self.offset, 'rows': self.rows}
+        tmp_path = state_path + '.tmp.npz'
+        np.savez(tmp_path, meta=json.dumps(meta), **self.stats.to_arrays())
+        os.replace(tmp_path, state_path)
+
+    def update(self):
+        """Fold in the rows appended since the last update; returns the number of new rows"""
+        if self.offset is not None and os.path.getsize(self.data_path) < self.offset:
+            raise ValueError(f"{self.data_path} is shorter than when it was last read; use --rebuild")
+        reader = BikeCsvReader(self.data_path, chunk_rows=self.chunk_rows, offset=self.offset)
+        new_rows = 0
+        for chunk in reader:
+            self.stats.update(self.feature_transform.transform_frame(chunk), chunk['cnt'].to_numpy())
+            new_rows += len(chunk)
+        self.offset = reader.end_offset
+        self.rows += new_rows
+        return new_rows
+
+    def export(self, out_dir):
+        """Write best_model.pkl, scaler.pkl, feature_columns.pkl and model_bundle/ to out_dir"""
+        scaler, model = self.stats.to_sklearn()
+        os.makedirs(out_dir, exist_ok=True)
+        for name, obj in (('best_model.pkl', model), ('scaler.pkl', scaler),
+                          ('feature_columns.pkl', self.feature_columns)):
+            with open(os.path.join(out_dir, name), 'wb') as f:
+                pickle.dump(obj, f)
+        metrics = {'best_model': 'Linear Regression', 'training': 'incremental', 'rows': self.rows}
+        _, manifest = export_bundle(model, scaler, self.feature_columns, os.path.join(out_dir, 'model_bundle'),
+                                    metrics=metrics, pickle_dir=out_dir)
+        return manifest
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fold newly appended rows into the linear model")
+    parser.add_argument('--data', default='day.csv', help="day.csv or hour.csv (hourly model)")
+    parser.add_argument('--out', default=INCREMENTAL_DIR,
+                        help="where the statistics, pickles and model_bundle/ are written")
+    parser.add_argument('--rebuild', action='store_true', help="discard the saved statistics and read the whole file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    state_path = os.path.join(args.out, STATE_FILE)
+    if os.path.exists(state_path) and not args.rebuild:
+        trainer = IncrementalTrainer.load(state_path, args.data)
+    else:
+        with open(args.data) as f:
+            header = f.readline().strip().split(',')
+        trainer = IncrementalTrainer(args.data, HOURLY_FEATURE_COLUMNS if 'hr' in header else FEATURE_COLUMNS)
+
+    new_rows = trainer.update()
+    updated = time.perf_counter()
+    if new_rows == 0 and not args.rebuild and os.path.exists(state_path):
+        print(f"✅ No new rows in {args.data} ({trainer.rows} rows already included)")
+        return
+    manifest = trainer.export(args.out)
+    trainer.save(state_path)
+    finished = time.perf_counter()
+
+    print(f"✅ Folded {new_rows} new rows into the linear model ({trainer.rows} rows total)")
+    print(f"   read + update: {(updated - started) * 1e3:.1f} ms, solve + export: {(finished - updated) * 1e3:.1f} ms")
+    print(f"   bundle {manifest['version']} -> {os.path.abspath(os.path.join(args.out, 'model_bundle'))}")
+
+
+if __name__ == "__main__":
+    main()
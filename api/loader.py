@@ -0,0 +1,256 @@
+"""
+Model loading for the API process.
+
+Nothing is read from disk when the API module is imported. The FastAPI
+lifespan calls `ModelLoader.startup()`, which runs the load in a worker
+thread in explicit phases:
+
+    pending -> loading -> warming -> ready
+                       \-> failed (retried in the background with backoff)
+
+The pickle/sklearn imports only happen if the bundle is unavailable, the
+warm-up prediction touches the model pages and code paths before the first
+real request, and the duration of each phase is reported through /health.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from api.bundle import ARTIFACT_DIR, BUNDLE_DIR, MANIFEST_FILE, bundle_matches_pickles, file_sha256, smoke_rows
+from api.features import FeatureTransform
+from api.metrics import current_timer
+
+PICKLE_FILES = ('best_model.pkl', 'scaler.pkl', 'feature_columns.pkl')
+
+
+class LoadedModel:
+    """Everything a request needs from one loaded model, replaced as a unit."""
+
+    __slots__ = ('predictor', 'feature_transform', 'manifest', 'source', 'version', 'lookup_table')
+
+    def __init__(self, predictor, manifest=None, source='pickle', version=None):
+        self.predictor = predictor
+        # Compiled once from the saved column order and reused by every request
+        self.feature_transform = FeatureTransform(predictor.feature_columns)
+        self.manifest = manifest
+        self.source = source
+        self.version = version or (manifest['version'] if manifest is not None else source)
+        self.lookup_table = None
+
+    def predict_model(self, raw):
+        """Predictions for an (N, 14) raw input matrix (15 for hourly models) from the model itself."""
+        timer = current_timer()
+        if timer is None:
+            return self.predictor.predict(self.feature_transform.transform(raw))
+        features = self.feature_transform.transform(raw)
+        timer.mark('feature_build')
+        predictions = self.predictor.predict(features)
+        timer.mark('inference')
+        return predictions
+
+    def predict_raw(self, raw):
+        """Predictions for an (N, 14) raw input matrix, from the lookup table where attached."""
+        if self.lookup_table is not None:
+            return self.lookup_table.predict_raw(raw, fallback=self.predict_model)
+        return self.predict_model(raw)
+
+
+def load_pickled_model(artifact_dir=ARTIFACT_DIR):
+    """Load the saved model, scaler and feature columns using pickle"""
+    import pickle
+
+    from api.predictors import SklearnPredictor
+
+    paths = [os.path.join(artifact_dir, name) for name in PICKLE_FILES]
+    with open(paths[0], 'rb') as f:
+        model = pickle.load(f)
+    with open(paths[1], 'rb') as f:
+        scaler = pickle.load(f)
+    with open(paths[2], 'rb') as f:
+        feature_columns = pickle.load(f)
+    # Pickles carry no version, so identify them by the model file's content
+    version = 'pickle-' + file_sha256(paths[0])[:12]
+    return LoadedModel(SklearnPredictor(model, scaler, feature_columns), version=version)
+
+
+def load_model(backend='auto', bundle_dir=BUNDLE_DIR, artifact_dir=ARTIFACT_DIR):
+    """
+    Load the model for serving.
+
+    With backend "auto" the memory-mapped bundle is used when it exists, loads
+    cleanly and was exported with the best_model.pkl now in `artifact_dir`;
+    otherwise, or with backend "sklearn", the pickle files.
+    """
+    if backend == 'auto' and os.path.exists(os.path.join(bundle_dir, MANIFEST_FILE)):
+        try:
+            from api.bundle import load_bundle
+
+            predictor, manifest = load_bundle(bundle_dir)
+            if bundle_matches_pickles(manifest, artifact_dir):
+                return LoadedModel(predictor, manifest, source='bundle')
+            print(f"⚠️  Model bundle {manifest['version']} was not exported with the current "
+                  f"{os.path.join(artifact_dir, 'best_model.pkl')}; serving the pickles instead")
+        except Exception as e:
+            print(f"❌ Error loading model bundle, falling back to pickle: {e}")
+    return load_pickled_model(artifact_dir)
+
+
+def attach_lookup_table(loaded, lookup_dir, mode):
+    """Serve `loaded` from the precomputed table in `lookup_dir` if it was built for this model"""
+    from api.lookup_table import load_lookup_table
+
+    if not os.path.exists(os.path.join(lookup_dir, 'manifest.json')):
+        print(f"⚠️  No lookup table in {lookup_dir}, serving from the model")
+        return
+    table = load_lookup_table(lookup_dir, mode)
+    if table.model_version != loaded.version:
+        print(f"⚠️  Lookup table was built for model {table.model_version}, not {loaded.version}; "
+              f"serving from the model")
+        return
+    loaded.lookup_table = table
+    loaded.predict_raw(smoke_rows(loaded.feature_transform.raw_features))
+    # Answers come from the table, so the served version names it too: a rebuilt
+    # table is a new version to hot reload, the prediction cache and process pools
+    table_hash = hashlib.sha256(json.dumps(table.manifest, sort_keys=True).encode()).hexdigest()
+    loaded.version = f"{loaded.version}+lookup.{table_hash[:8]}"
+
+
+def validate_model(loaded):
+    """
+    Smoke-test a freshly loaded model before it serves traffic.
+
+    Predictions on the smoke rows must be finite and, when the bundle manifest
+    recorded the sklearn predictions for those rows at export time, match
+    them. This doubles as the warm-up prediction.
+    """
+    predictions = loaded.predict_model(smoke_rows(loaded.feature_transform.raw_features))
+    if not np.all(np.isfinite(predictions)):
+        raise ValueError("Smoke prediction returned non-finite values")
+    expected = loaded.manifest.get('smoke_predictions') if loaded.manifest is not None else None
+    if expected is not None and not np.allclose(predictions, expected, rtol=1e-9, atol=1e-6):
+        raise ValueError("Model does not reproduce the reference predictions in its manifest")
+
+
+class ModelLoader:
+    """Loads, warms up and (on failure) retries loading the serving model."""
+
+    def __init__(self, backend='auto', bundle_dir=BUNDLE_DIR, artifact_dir=ARTIFACT_DIR,
+                 max_attempts=5, retry_seconds=2.0, lookup_mode='off', lookup_dir=None):
+        self.backend = backend
+        self.bundle_dir = bundle_dir
+        self.artifact_dir = artifact_dir
+        self.lookup_mode = lookup_mode
+        self.lookup_dir = lookup_dir or os.path.join(artifact_dir, 'lookup_table')
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+
+        self.current = None
+        self.phase = 'pending'
+        self.attempts = 0
+        self.last_error = None
+        self.timings = {}
+        self._retry_task = None
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Settings from the environment; keyword arguments override them"""
+        artifact_dir = os.environ.get('MODEL_ARTIFACT_DIR', ARTIFACT_DIR)
+        settings = dict(backend=os.environ.get('MODEL_BACKEND', 'auto'),
+                        artifact_dir=artifact_dir,
+                        bundle_dir=os.environ.get('MODEL_BUNDLE_DIR', os.path.join(artifact_dir, 'model_bundle')),
+                        max_attempts=int(os.environ.get('MODEL_LOAD_ATTEMPTS', '5')),
+                        retry_seconds=float(os.environ.get('MODEL_LOAD_RETRY_SECONDS', '2.0')),
+                        lookup_mode=os.environ.get('LOOKUP_TABLE', 'off'),
+                        lookup_dir=os.environ.get('LOOKUP_TABLE_DIR'))
+        settings.update(kwargs)
+        return cls(**settings)
+
+    def settings(self):
+        """Constructor arguments that load the same model elsewhere (e.g. in an inference process)"""
+        return dict(backend=self.backend, bundle_dir=self.bundle_dir, artifact_dir=self.artifact_dir,
+                    lookup_mode=self.lookup_mode, lookup_dir=self.lookup_dir)
+
+    @property
+    def ready(self):
+        return self.current is not None
+
+    def load_candidate(self, on_phase=None):
+        """
+        Load and validate a model without touching the one being served.
+
+        Returns `(loaded_model, timings)`; raises if loading or validation fails.
+        """
+        started = time.perf_counter()
+        if on_phase is not None:
+            on_phase('loading')
+        loaded = load_model(self.backend, self.bundle_dir, self.artifact_dir)
+        loaded_at = time.perf_counter()
+
+        if on_phase is not None:
+            on_phase('warming')
+        validate_model(loaded)
+        if self.lookup_mode != 'off':
+            attach_lookup_table(loaded, self.lookup_dir, self.lookup_mode)
+        warmed_at = time.perf_counter()
+        return loaded, {
+            'load_seconds': round(loaded_at - started, 4),
+            'warmup_seconds': round(warmed_at - loaded_at, 4),
+            'total_seconds': round(warmed_at - started, 4),
+        }
+
+    def load(self):
+        """One synchronous load + warm-up attempt. Returns True on success."""
+        self.attempts += 1
+        try:
+            loaded, timings = self.load_candidate(on_phase=lambda phase: setattr(self, 'phase', phase))
+        except Exception as e:
+            self.phase = 'failed'
+            self.last_error = str(e)
+            print(f"❌ Error loading model (attempt {self.attempts}/{self.max_attempts}): {e}")
+            return False
+
+        self.timings = timings
+        self.current = loaded
+        self.phase = 'ready'
+        self.last_error = None
+        print(f"✅ Model {loaded.version} loaded from {loaded.source} "
+              f"in {timings['total_seconds'] * 1e3:.0f} ms")
+        return True
+
+    async def startup(self):
+        """Run the first load attempt; keep retrying in the background if it fails."""
+        if self.ready:  # preloaded, e.g. by the preforking server before it started the workers
+            return
+        if not await asyncio.to_thread(self.load) and self.attempts < self.max_attempts:
+            self._retry_task = asyncio.create_task(self._retry())
+
+    async def _retry(self):
+        while not self.ready and self.attempts < self.max_attempts:
+            await asyncio.sleep(self.retry_seconds * 2 ** (self.attempts - 1))
+            await asyncio.to_thread(self.load)
+
+    async def shutdown(self):
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            try:
+                await self._retry_task
+            except asyncio.CancelledError:
+                pass
+            self._retry_task = None
+
+    def status(self):
+        """Loader state for the /health endpoint"""
+        return {
+            'phase': self.phase,
+            'attempts': self.attempts,
+            'source': self.current.source if self.current is not None else None,
+            'lookup_table': (self.current.lookup_table.describe()
+                             if self.current is not None and self.current.lookup_table is not None else None),
+            'timings': self.timings,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,297 @@
+"""
+Precomputed lookup-table serving mode.
+
+Apart from the four normalized weather floats, every model input is either
+the weather category or a function of the calendar date. A lookup table
+stores the model's prediction for every date in day.csv, every weathersit
+and every node of a regular grid over temp/atemp/hum/windspeed, as one dense
+float32 array:
+
+    table[date, weathersit - 1, temp_bin, atemp_bin, hum_bin, windspeed_bin]
+
+A request is answered by indexing the table with its date and weather
+category and either the nearest grid node ("nearest", one read) or a
+multilinear blend of the 16 surrounding nodes ("linear"). Requests whose
+temporal fields do not match the calendar row for their (yr, day_of_year),
+e.g. a client flagging an ordinary day as a holiday, are passed to the model.
+
+Build the table for the current model with
+
+    python -m api.lookup_table [--bins 5] [--temp-bins 9] ...
+
+which also reports the maximum error of both lookup modes against the model,
+so the grid resolution can be chosen knowing what it costs in accuracy.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from api.bundle import ARTIFACT_DIR, install_directory
+from api.features import RAW_FEATURES, RAW_INDEX, raw_matrix_from_frame
+
+LOOKUP_FORMAT_VERSION = 1
+LOOKUP_DIR = os.path.join(ARTIFACT_DIR, 'lookup_table')
+LOOKUP_MODES = ('nearest', 'linear')
+
+CONTINUOUS_FEATURES = ('temp', 'atemp', 'hum', 'windspeed')
+TEMPORAL_FEATURES = ('season', 'yr', 'mnth', 'holiday', 'weekday', 'workingday',
+                     'day_of_year', 'month', 'day_of_week')
+WEATHERSIT_VALUES = (1, 2, 3, 4)
+DEFAULT_BINS = 5
+
+_CONTINUOUS_INDEX = np.array([RAW_INDEX[name] for name in CONTINUOUS_FEATURES], dtype=np.intp)
+_TEMPORAL_INDEX = np.array([RAW_INDEX[name] for name in TEMPORAL_FEATURES], dtype=np.intp)
+_WEATHERSIT = RAW_INDEX['weathersit']
+_CORNERS = np.array(list(itertools.product((0, 1), repeat=len(CONTINUOUS_FEATURES))), dtype=np.intp)
+
+
+def calendar_from_frame(df):
+    """Distinct temporal rows (TEMPORAL_FEATURES order) of a day.csv/hour.csv frame, sorted by date"""
+    temporal = raw_matrix_from_frame(df)[:, _TEMPORAL_INDEX].astype(np.int16)
+    calendar = np.unique(temporal, axis=0)
+    order = np.lexsort((calendar[:, TEMPORAL_FEATURES.index('day_of_year')],
+                        calendar[:, TEMPORAL_FEATURES.index('yr')]))
+    return calendar[order]
+
+
+def _date_slots(yr, day_of_year):
+    return yr * 366 + day_of_year - 1
+
+
+class LookupTable:
+    """Predictions for a grid of inputs, served by indexing instead of inference."""
+
+    def __init__(self, table, calendar, grid_min, grid_max, mode='linear', manifest=None):
+        if mode not in LOOKUP_MODES:
+            raise ValueError(f"Unknown lookup mode '{mode}', expected one of {LOOKUP_MODES}")
+        self.table = table
+        self.calendar = np.asarray(calendar)
+        self.grid_min = np.asarray(grid_min, dtype=np.float64)
+        self.grid_max = np.asarray(grid_max, dtype=np.float64)
+        self.bins = np.array(table.shape[2:], dtype=np.intp)
+        self.mode = mode
+        self.manifest = manifest
+        self.model_version = manifest['model_version'] if manifest is not None else None
+        self._step = (self.grid_max - self.grid_min) / (self.bins - 1)
+
+        # (yr, day_of_year) -> calendar row, -1 for dates the table does not cover
+        self._date_index = np.full(2 * 366, -1, dtype=np.intp)
+        slots = _date_slots(self.calendar[:, TEMPORAL_FEATURES.index('yr')].astype(np.intp),
+                            self.calendar[:, TEMPORAL_FEATURES.index('day_of_year')].astype(np.intp))
+        self._date_index[slots] = np.arange(len(self.calendar))
+
+    def locate(self, raw):
+        """Calendar row for each raw row, or -1 where the table cannot answer it"""
+        yr = raw[:, RAW_INDEX['yr']].astype(np.intp)
+        day_of_year = raw[:, RAW_INDEX['day_of_year']].astype(np.intp)
+        slots = _date_slots(yr, day_of_year)
+        in_range = (yr >= 0) & (yr <= 1) & (day_of_year >= 1) & (day_of_year <= 366)
+        dates = np.where(in_range, self._date_index[np.where(in_range, slots, 0)], -1)
+
+        weather = raw[:, _CONTINUOUS_INDEX]
+        covered = ((dates >= 0)
+                   & np.isin(raw[:, _WEATHERSIT], WEATHERSIT_VALUES)
+                   & np.all((weather >= self.grid_min) & (weather <= self.grid_max), axis=1))
+        covered &= np.all(raw[:, _TEMPORAL_INDEX] == self.calendar[np.maximum(dates, 0)], axis=1)
+        return np.where(covered, dates, -1)
+
+    def lookup(self, dates, weathersit, weather):
+        """Table values for located rows: dates/weathersit codes and (N, 4) weather floats"""
+        position = (weather - self.grid_min) / self._step
+        prefix = (dates, weathersit.astype(np.intp) - 1)
+        if self.mode == 'nearest':
+            nodes = np.rint(position).astype(np.intp)
+            return self.table[prefix + tuple(nodes.T)].astype(np.float64)
+
+        # Multilinear: gather the 2^4 nodes around each point in one indexing
+        # operation and weight them by their closeness, shape (N, 16)
+        lower = np.minimum(np.floor(position).astype(np.intp), self.bins - 2)
+        fraction = (position - lower)[:, None, :]
+        weights = np.where(_CORNERS == 1, fraction, 1.0 - fraction).prod(axis=2)
+        nodes = lower[:, None, :] + _CORNERS
+        values = self.table[(prefix[0][:, None], prefix[1][:, None]) + tuple(np.moveaxis(nodes, 2, 0))]
+        return (weights * values).sum(axis=1)
+
+    def predict_raw(self, raw, fallback):
+        """Predictions for an (N, 14) raw matrix; rows the table does not cover go to `fallback`"""
+        raw = np.asarray(raw, dtype=np.float64).reshape(-1, len(RAW_FEATURES))
+        dates = self.locate(raw)
+        covered = dates >= 0
+        if covered.all():
+            return self.lookup(dates, raw[:, _WEATHERSIT], raw[:, _CONTINUOUS_INDEX])
+        predictions = np.empty(len(raw))
+        if covered.any():
+            predictions[covered] = self.lookup(dates[covered], raw[covered, _WEATHERSIT],
+                                               raw[covered][:, _CONTINUOUS_INDEX])
+        predictions[~covered] = fallback(raw[~covered])
+        return predictions
+
+    def describe(self):
+        return {
+            'mode': self.mode,
+            'model_version': self.model_version,
+            'shape': list(self.table.shape),
+            'max_abs_error': (self.manifest or {}).get('errors', {}).get(self.mode, {}).get('max_abs_error'),
+        }
+
+
+def grid_range(raw, step=0.05):
+    """Per-feature grid bounds covering the weather values in `raw`, rounded outward to `step`"""
+    weather = raw[:, _CONTINUOUS_INDEX]
+    grid_min = np.clip(np.floor(weather.min(axis=0) / step) * step, 0.0, 1.0)
+    grid_max = np.clip(np.ceil(weather.max(axis=0) / step) * step, 0.0, 1.0)
+    return np.round(grid_min, 6), np.round(grid_max, 6)
+
+
+def build_table(loaded, calendar, bins, grid_min, grid_max, max_rows=1 << 16):
+    """
+    Evaluate `loaded` (a LoadedModel) on every grid node for every calendar date.
+
+    `bins` gives the number of grid nodes per continuous feature (>= 2), in
+    CONTINUOUS_FEATURES order, spread evenly between grid_min and grid_max.
+    """
+    bins = [int(b) for b in bins]
+    if min(bins) < 2:
+        raise ValueError("Every continuous feature needs at least 2 grid nodes")
+    grids = [np.linspace(lo, hi, b) for lo, hi, b in zip(grid_min, grid_max, bins)]
+    shape = (len(WEATHERSIT_VALUES),) + tuple(bins)
+
+    # Weather part of the raw rows for one date, in table order
+    weather_block = np.empty((int(np.prod(shape)), len(RAW_FEATURES)))
+    mesh = np.meshgrid(np.array(WEATHERSIT_VALUES, dtype=np.float64), *grids, indexing='ij')
+    weather_block[:, _WEATHERSIT] = mesh[0].ravel()
+    for column, values in zip(_CONTINUOUS_INDEX, mesh[1:]):
+        weather_block[:, column] = values.ravel()
+
+    table = np.empty((len(calendar),) + shape, dtype=np.float32)
+    dates_per_call = max(1, max_rows // len(weather_block))
+    for start in range(0, len(calendar), dates_per_call):
+        dates = calendar[start:start + dates_per_call]
+        raw = np.tile(weather_block, (len(dates), 1))
+        raw[:, _TEMPORAL_INDEX] = np.repeat(dates, len(weather_block), axis=0)
+        table[start:start + len(dates)] = loaded.predict_raw(raw).reshape((len(dates),) + shape)
+    return table
+
+
+def measure_errors(loaded, table, calendar, grid_min, grid_max, raw_sets):
+    """Max and mean absolute error of each lookup mode against the model, per input set"""
+    errors = {}
+    for mode in LOOKUP_MODES:
+        lookup = LookupTable(table, calendar, grid_min, grid_max, mode=mode)
+        errors[mode] = {}
+        for name, raw in raw_sets.items():
+            dates = lookup.locate(raw)
+            raw = raw[dates >= 0]
+            diff = np.abs(lookup.lookup(dates[dates >= 0], raw[:, _WEATHERSIT], raw[:, _CONTINUOUS_INDEX])
+                          - loaded.predict_raw(raw))
+            errors[mode][name] = {'rows': int(len(raw)), 'max_abs_error': float(diff.max()),
+                                  'mean_abs_error': float(diff.mean())}
+        errors[mode]['max_abs_error'] = max(entry['max_abs_error'] for entry in errors[mode].values())
+    return errors
+
+
+def random_raw_rows(calendar, n_rows, grid_min, grid_max, seed=0):
+    """Uniformly random weather on random calendar dates, for error measurement"""
+    rng = np.random.default_rng(seed)
+    raw = np.empty((n_rows, len(RAW_FEATURES)))
+    raw[:, _TEMPORAL_INDEX] = calendar[rng.integers(len(calendar), size=n_rows)]
+    raw[:, _WEATHERSIT] = rng.choice(WEATHERSIT_VALUES, size=n_rows)
+    raw[:, _CONTINUOUS_INDEX] = rng.uniform(grid_min, grid_max, size=(n_rows, len(grid_min)))
+    return raw
+
+
+def save_lookup_table(path, table, calendar, manifest):
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.lookup-', dir=os.path.dirname(path))
+    try:
+        os.chmod(tmp_dir, 0o755)
+        np.save(os.path.join(tmp_dir, 'table.npy'), table)
+        np.save(os.path.join(tmp_dir, 'calendar.npy'), calendar)
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        install_directory(tmp_dir, path)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_lookup_table(path=LOOKUP_DIR, mode='linear'):
+    """Load a saved table, memory-mapped read-only"""
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != LOOKUP_FORMAT_VERSION:
+        raise ValueError(f"Unsupported lookup table format version {manifest.get('format_version')}")
+    table = np.load(os.path.join(path, 'table.npy'), mmap_mode='r')
+    calendar = np.load(os.path.join(path, 'calendar.npy'))
+    grid = manifest['grid']
+    return LookupTable(table, calendar, [grid[name]['min'] for name in CONTINUOUS_FEATURES],
+                       [grid[name]['max'] for name in CONTINUOUS_FEATURES], mode=mode, manifest=manifest)
+
+
+def main():
+    import argparse
+    import time
+
+    import pandas as pd
+
+    from api.loader import load_model
+
+    parser = argparse.ArgumentParser(description="Build the prediction lookup table for the current model")
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS, help="grid nodes per weather feature")
+    for name in CONTINUOUS_FEATURES:
+        parser.add_argument(f'--{name}-bins', type=int, help=f"grid nodes for {name} (overrides --bins)")
+    parser.add_argument('--data', default=os.path.join(ARTIFACT_DIR, '..', '..', 'day.csv'),
+                        help="CSV whose dates the table covers")
+    parser.add_argument('--backend', default='auto', help="model backend to tabulate (auto or sklearn)")
+    parser.add_argument('--samples', type=int, default=20000, help="random rows for the error report")
+    parser.add_argument('--out', default=LOOKUP_DIR)
+    args = parser.parse_args()
+
+    bins = [getattr(args, f'{name}_bins') or args.bins for name in CONTINUOUS_FEATURES]
+    data = pd.read_csv(args.data)
+    data_raw = raw_matrix_from_frame(data)
+    calendar = calendar_from_frame(data)
+    grid_min, grid_max = grid_range(data_raw)
+    loaded = load_model(args.backend)
+
+    started = time.perf_counter()
+    table = build_table(loaded, calendar, bins, grid_min, grid_max)
+    build_seconds = time.perf_counter() - started
+    errors = measure_errors(loaded, table, calendar, grid_min, grid_max, {
+        'data_rows': data_raw,
+        'random_rows': random_raw_rows(calendar, args.samples, grid_min, grid_max),
+    })
+
+    manifest = {
+        'format_version': LOOKUP_FORMAT_VERSION,
+        'model_version': loaded.version,
+        'model_type': loaded.predictor.kind,
+        'temporal_features': list(TEMPORAL_FEATURES),
+        'weathersit_values': list(WEATHERSIT_VALUES),
+        'grid': {name: {'min': float(lo), 'max': float(hi), 'bins': b}
+                 for name, lo, hi, b in zip(CONTINUOUS_FEATURES, grid_min, grid_max, bins)},
+        'shape': list(table.shape),
+        'errors': errors,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    save_lookup_table(args.out, table, calendar, manifest)
+
+    print(f"✅ Lookup table for model {loaded.version}: shape {table.shape}, "
+          f"{table.nbytes / 1e6:.1f} MB, built in {build_seconds:.1f}s -> {os.path.abspath(args.out)}")
+    print(f"{'Mode':<10} {'Inputs':<14} {'rows':>8} {'max |error|':>12} {'mean |error|':>13}")
+    for mode in LOOKUP_MODES:
+        for name in ('data_rows', 'random_rows'):
+            entry = errors[mode][name]
+            print(f"{mode:<10} {name:<14} {entry['rows']:>8} {entry['max_abs_error']:>12.1f} "
+                  f"{entry['mean_abs_error']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
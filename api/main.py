@@ -2,9 +2,14 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, validator
 import joblib
-import numpy as np
 from typing import Optional
 import os
+import sys
+
+# Make the `api` package importable when running `python main.py` from this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.features import FeatureTransform
 
 # Load the saved model and scaler
 model_path = os.path.join(os.path.dirname(__file__), '..', 'summative', 'linear_regression', 'best_model.pkl')
@@ -22,6 +27,9 @@ except Exception as e:
     scaler = None
     feature_columns = None
 
+# Compiled once from the saved column order and reused by every request
+feature_transform = FeatureTransform(feature_columns)
+
 app = FastAPI(
     title="Bike Sharing Demand Prediction API",
     description="API for predicting bike rental demand based on weather and temporal features",
@@ -102,37 +110,11 @@ async def predict_bike_rentals(request: BikeRentalRequest):
         raise HTTPException(status_code=500, detail="Model not loaded")
     
     try:
-        # Create feature vector
-        features = np.array([
-            request.season, request.yr, request.mnth, request.holiday, 
-            request.weekday, request.workingday, request.weathersit,
-            request.temp, request.atemp, request.hum, request.windspeed, 
-            request.day_of_year, request.month, request.day_of_week
-        ])
-        
-        # Create interaction features
-        temp_humidity = request.temp * request.hum
-        temp_windspeed = request.temp * request.windspeed
-        weather_temp = request.weathersit * request.temp
-        
-        # Create seasonal temperature features
-        spring_temp = (request.season == 1) * request.temp
-        summer_temp = (request.season == 2) * request.temp
-        fall_temp = (request.season == 3) * request.temp
-        winter_temp = (request.season == 4) * request.temp
-        
-        # Combine all features
-        all_features = np.concatenate([
-            features, 
-            [temp_humidity, temp_windspeed, weather_temp,
-             spring_temp, summer_temp, fall_temp, winter_temp]
-        ])
-        
-        # Reshape for prediction
-        features_reshaped = all_features.reshape(1, -1)
+        # Build the feature matrix in the saved column order
+        features = feature_transform.transform_records([request])
         
         # Scale features
-        features_scaled = scaler.transform(features_reshaped)
+        features_scaled = scaler.transform(features)
         
         # Make prediction
         prediction = model.predict(features_scaled)[0]
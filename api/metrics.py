@@ -0,0 +1,208 @@
+"""
+Request instrumentation and the Prometheus text exposition for GET /metrics.
+
+With METRICS_ENABLED=1 the API wraps every request in `MetricsMiddleware`.
+The middleware starts a `RequestTimer` and publishes it in a context
+variable. The code on the hot path marks each stage as it finishes:
+
+    validation      reading the body, routing and pydantic validation,
+                    up to the start of the endpoint function
+    feature_build   the raw NumPy input rows and the model's feature matrix
+    scaling         scaler.transform (sklearn backend only; the bundle
+                    backends fold scaling into the model)
+    inference       the model itself (or the prediction cache/lookup table)
+    serialization   the response model, JSON encoding and the response start
+
+A mark records the time since the previous one, so the stages of a request
+add up to its total. When metrics are disabled the middleware is not
+installed. `current_timer()` then returns None and each mark costs one
+context-variable lookup.
+
+Everything is kept in process memory. With several workers each one serves
+its own counts, labelled with `worker` (WORKER_ID, or the process id).
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+
+# Histogram buckets (seconds), from tens of microseconds to seconds
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+           2.5, 5.0)
+
+_current_timer = contextvars.ContextVar('request_timer', default=None)
+
+
+def current_timer():
+    """The RequestTimer of the request being handled, or None when metrics are off"""
+    return _current_timer.get()
+
+
+class RequestTimer:
+    """Lap timer: each mark() adds the time since the previous mark to a stage."""
+
+    __slots__ = ('started', 'last', 'stages')
+
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+        self.stages = {}
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.last)
+        self.last = now
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set."""
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # the last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels.items()) + '}'
+
+
+class Metrics:
+    """Request counters and latency histograms, rendered in the Prometheus text format."""
+
+    def __init__(self, enabled=False, worker_id=None):
+        self.enabled = enabled
+        self.worker_id = str(worker_id or os.getpid())
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self.requests = {}   # (endpoint, status) -> count
+        self.durations = {}  # endpoint -> Histogram
+        self.stages = {}     # (endpoint, stage) -> Histogram
+
+    @classmethod
+    def from_env(cls):
+        return cls(enabled=os.environ.get('METRICS_ENABLED', '0').lower() in ('1', 'true', 'yes', 'on'),
+                   worker_id=os.environ.get('WORKER_ID'))
+
+    def observe_request(self, endpoint, status, timer):
+        finished = time.perf_counter()
+        with self._lock:
+            key = (endpoint, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.durations.get(endpoint)
+            if histogram is None:
+                histogram = self.durations[endpoint] = Histogram()
+            histogram.observe(finished - timer.started)
+            for stage, seconds in timer.stages.items():
+                histogram = self.stages.get((endpoint, stage))
+                if histogram is None:
+                    histogram = self.stages[(endpoint, stage)] = Histogram()
+                histogram.observe(seconds)
+
+    def _histogram_lines(self, name, histogram, **labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(**labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(**labels)} {histogram.total:.9f}')
+        lines.append(f'{name}_count{_labels(**labels)} {histogram.count}')
+        return lines
+
+    def render(self, models=(), cache_stats=None):
+        """
+        The exposition text. `models` holds (name, LoadedModel or None) pairs;
+        `cache_stats` is PredictionCache.stats().
+        """
+        worker = self.worker_id
+        lines = [
+            '# HELP bike_api_worker_info Worker serving these metrics.',
+            '# TYPE bike_api_worker_info gauge',
+            f'bike_api_worker_info{_labels(worker=worker, pid=os.getpid())} 1',
+            '# HELP bike_api_worker_start_time_seconds Unix time the worker started.',
+            '# TYPE bike_api_worker_start_time_seconds gauge',
+            f'bike_api_worker_start_time_seconds{_labels(worker=worker)} {self.started_at:.3f}',
+            '# HELP bike_api_model_info Model version being served.',
+            '# TYPE bike_api_model_info gauge',
+        ]
+        for name, loaded in models:
+            if loaded is not None:
+                labels = _labels(worker=worker, model=name, version=loaded.version, backend=loaded.predictor.kind,
+                                 source=loaded.source)
+                lines.append(f'bike_api_model_info{labels} 1')
+
+        with self._lock:
+            lines += ['# HELP bike_api_requests_total Requests handled, by endpoint and status code.',
+                      '# TYPE bike_api_requests_total counter']
+            for (endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'bike_api_requests_total{_labels(worker=worker, endpoint=endpoint, status=status)} '
+                             f'{count}')
+            lines += ['# HELP bike_api_request_errors_total Requests answered with a 4xx or 5xx status.',
+                      '# TYPE bike_api_request_errors_total counter']
+            errors = {}
+            for (endpoint, status), count in self.requests.items():
+                if status >= 400:
+                    errors[endpoint] = errors.get(endpoint, 0) + count
+            for endpoint, count in sorted(errors.items()):
+                lines.append(f'bike_api_request_errors_total{_labels(worker=worker, endpoint=endpoint)} {count}')
+
+            lines += ['# HELP bike_api_request_duration_seconds Time from request start to response end.',
+                      '# TYPE bike_api_request_duration_seconds histogram']
+            for endpoint, histogram in sorted(self.durations.items()):
+                lines += self._histogram_lines('bike_api_request_duration_seconds', histogram,
+                                               worker=worker, endpoint=endpoint)
+            lines += ['# HELP bike_api_stage_duration_seconds Time spent in each stage of a request.',
+                      '# TYPE bike_api_stage_duration_seconds histogram']
+            for (endpoint, stage), histogram in sorted(self.stages.items()):
+                lines += self._histogram_lines('bike_api_stage_duration_seconds', histogram,
+                                               worker=worker, endpoint=endpoint, stage=stage)
+
+        if cache_stats is not None:
+            for field, kind, text in (('hits', 'counter', 'Prediction cache hits.'),
+                                      ('misses', 'counter', 'Prediction cache misses.'),
+                                      ('evictions', 'counter', 'Prediction cache evictions.'),
+                                      ('size', 'gauge', 'Entries in the prediction cache.')):
+                name = f'bike_api_prediction_cache_{field}' + ('_total' if kind == 'counter' else '')
+                lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}',
+                          f'{name}{_labels(worker=worker)} {cache_stats[field]}']
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request and recording it in `metrics`."""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if timer.stages:  # an instrumented endpoint
+                    timer.mark('serialization')
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_timer.reset(token)
+            # The route template (e.g. /predict) once routed; unmatched paths share one label
+            endpoint = getattr(scope.get('route'), 'path', None) or 'unmatched'
+            self.metrics.observe_request(endpoint, status, timer)
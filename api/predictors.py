@@ -0,0 +1,94 @@
+"""
+Prediction backends used by the API.
+
+Every backend takes the unscaled feature matrix produced by
+`api.features.FeatureTransform` and returns one prediction per row, so the
+endpoints do not need to know whether scaling happens in sklearn or has
+been folded into the model.
+"""
+
+import numpy as np
+
+from api.metrics import current_timer
+from api.tree_engine import FlatForestPredictor
+
+
+class SklearnPredictor:
+    """The trained pipeline as-is: `scaler.transform` followed by `model.predict`."""
+
+    kind = 'sklearn'
+
+    def __init__(self, model, scaler, feature_columns=None):
+        self.model = model
+        self.scaler = scaler
+        self.feature_columns = list(feature_columns) if feature_columns is not None else None
+
+    def predict(self, features):
+        scaled = self.scaler.transform(features)
+        timer = current_timer()
+        if timer is not None:
+            timer.mark('scaling')
+        return self.model.predict(scaled)
+
+
+class FusedLinearPredictor:
+    """
+    A LinearRegression with the StandardScaler folded into its coefficients.
+
+    Since model(x) = ((x - mean) / scale) @ coef + intercept, the whole
+    pipeline collapses to x @ (coef / scale) + (intercept - mean @ (coef / scale)),
+    i.e. a single dot product with no sklearn input validation.
+    """
+
+    kind = 'linear'
+
+    def __init__(self, coef, intercept, feature_columns=None):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.feature_columns = list(feature_columns) if feature_columns is not None else None
+
+    @classmethod
+    def from_sklearn(cls, model, scaler, feature_columns=None):
+        """Fold a fitted StandardScaler into a fitted LinearRegression."""
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        intercept = float(np.ravel(model.intercept_)[0])
+        if getattr(scaler, 'scale_', None) is not None:
+            coef = coef / scaler.scale_
+        if getattr(scaler, 'mean_', None) is not None:
+            intercept -= float(np.dot(scaler.mean_, coef))
+        return cls(coef, intercept, feature_columns)
+
+    def predict(self, features):
+        return np.asarray(features, dtype=np.float64) @ self.coef + self.intercept
+
+    def to_arrays(self):
+        """Numeric arrays and JSON scalars needed to rebuild the predictor."""
+        return {'coef': self.coef}, {'intercept': self.intercept}
+
+    @classmethod
+    def from_arrays(cls, arrays, params, feature_columns=None):
+        return cls(arrays['coef'], params['intercept'], feature_columns)
+
+
+# Backends that can be stored in a model bundle, by `kind`
+PREDICTOR_TYPES = {
+    FusedLinearPredictor.kind: FusedLinearPredictor,
+    FlatForestPredictor.kind: FlatForestPredictor,
+}
+
+
+def artifact_kind_for(model):
+    """The bundle backend able to serve a fitted sklearn model, or None."""
+    if hasattr(model, 'coef_'):
+        return FusedLinearPredictor.kind
+    if hasattr(model, 'tree_') or hasattr(model, 'estimators_'):
+        return FlatForestPredictor.kind
+    return None
+
+
+def predictor_from_sklearn(model, scaler, feature_columns=None):
+    """Convert a fitted scaler + model into the matching bundle backend."""
+    kind = artifact_kind_for(model)
+    if kind is None:
+        raise ValueError(f"No bundle backend for {type(model).__name__}")
+    return PREDICTOR_TYPES[kind].from_sklearn(model, scaler, feature_columns)
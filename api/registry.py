@@ -0,0 +1,139 @@
+"""
+Hot model reload for the API.
+
+`ModelRegistry` extends the startup loader so a new model can replace the
+served one without restarting the worker, either when the artifact files
+change on disk (polled every MODEL_WATCH_SECONDS) or through the admin
+POST /models/reload endpoint.
+
+The new model is loaded and smoke-validated in a worker thread while the
+old one keeps serving. If validation passes, it is swapped in by replacing
+the single `current` reference. Request handlers read `current` once and
+use that snapshot for the whole request, so the predict path needs no lock
+and in-flight requests finish on the model they started with.
+"""
+
+import asyncio
+import os
+import time
+
+from api.bundle import MANIFEST_FILE
+from api.loader import PICKLE_FILES, ModelLoader
+
+
+class ModelRegistry(ModelLoader):
+    """The served model plus background reloading and a short reload history."""
+
+    def __init__(self, *args, watch_seconds=0.0, history_size=10, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.watch_seconds = watch_seconds
+        self.history_size = history_size
+        self.history = []
+        self._signature = None
+        self._reload_lock = asyncio.Lock()
+        self._watch_task = None
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        kwargs.setdefault('watch_seconds', float(os.environ.get('MODEL_WATCH_SECONDS', '0')))
+        return super().from_env(**kwargs)
+
+    def artifact_signature(self):
+        """(path, mtime, size) of every artifact file the loader may read"""
+        paths = [os.path.join(self.bundle_dir, MANIFEST_FILE)]
+        paths += [os.path.join(self.artifact_dir, name) for name in PICKLE_FILES]
+        if self.lookup_mode != 'off':
+            # Rewritten whenever `python -m api.lookup_table` installs a new table
+            paths.append(os.path.join(self.lookup_dir, 'manifest.json'))
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def load(self):
+        # Take the signature before reading so a change during the load is noticed
+        signature = self.artifact_signature()
+        loaded = super().load()
+        if loaded:
+            self._signature = signature
+        return loaded
+
+    async def reload(self, reason='manual'):
+        """
+        Load, validate and swap in the model currently on disk.
+
+        Returns a record with status "reloaded", "unchanged" (same version as
+        the one being served) or "failed" (the old model keeps serving).
+        """
+        async with self._reload_lock:
+            previous = self.current
+            signature = self.artifact_signature()
+            record = {
+                'reason': reason,
+                'started_at': time.time(),
+                'previous_version': previous.version if previous is not None else None,
+            }
+            try:
+                candidate, timings = await asyncio.to_thread(self.load_candidate)
+            except Exception as e:
+                record.update(status='failed', version=record['previous_version'], error=str(e))
+                print(f"❌ Model reload ({reason}) failed, keeping {record['previous_version']}: {e}")
+            else:
+                if previous is not None and candidate.version == previous.version:
+                    record.update(status='unchanged', version=previous.version, timings=timings)
+                else:
+                    # Atomic reference swap: requests already running keep their snapshot
+                    self.current = candidate
+                    self.timings = timings
+                    self.phase = 'ready'
+                    self.last_error = None
+                    record.update(status='reloaded', version=candidate.version, timings=timings)
+                    print(f"🔄 Model reloaded ({reason}): {record['previous_version']} -> {candidate.version}")
+            # Remember what was attempted so an unchanged or broken file set is not retried every poll
+            self._signature = signature
+            self.history = (self.history + [record])[-self.history_size:]
+            return record
+
+    async def _watch(self):
+        pending = None
+        while True:
+            await asyncio.sleep(self.watch_seconds)
+            signature = await asyncio.to_thread(self.artifact_signature)
+            if signature == self._signature:
+                pending = None
+                continue
+            # Only reload once the files have stopped changing between two polls,
+            # so a retrain that is still writing its outputs is not picked up
+            if signature != pending:
+                pending = signature
+                continue
+            pending = None
+            await self.reload(reason='watch')
+
+    async def startup(self):
+        await super().startup()
+        if self.watch_seconds > 0:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def shutdown(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+        await super().shutdown()
+
+    def status(self):
+        status = super().status()
+        status.update(
+            version=self.current.version if self.current is not None else None,
+            watching=self._watch_task is not None,
+            last_reload=self.history[-1] if self.history else None,
+        )
+        return status
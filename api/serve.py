@@ -0,0 +1,245 @@
+"""
+Production launcher: a preforking supervisor around uvicorn.
+
+`uvicorn api.api:app` is a single process on a single core. This launcher:
+
+  1. imports the app and loads the daily and hourly models (and the
+     calendar and climatology tables) once, in the parent process;
+  2. freezes the garbage collector, so the objects loaded so far are never
+     touched again to be collected, and binds the listening socket;
+  3. forks WEB_CONCURRENCY workers (default: the CPUs available to the
+     process, from its CPU affinity and cgroup quota, at most
+     MAX_DEFAULT_WORKERS). Each serves the
+     app with uvicorn on the shared socket. The workers inherit the loaded
+     models copy-on-write: their pages stay shared until a worker writes to
+     them. The model bundle's arrays are read-only memory maps, so those
+     pages are shared anyway.
+  4. restarts a worker that exits unexpectedly. The delay doubles, up to
+     30 s, while workers keep crashing within 10 s of starting.
+     SIGTERM/SIGINT stop the workers gracefully and exit.
+
+SIGHUP reloads the daily and hourly models from disk in the parent, through
+the registries' validated reload, and then replaces the workers one by one,
+so the new workers inherit the new models. A model that fails to load or
+validate is not swapped in; the workers are replaced with the old one. The
+calendar table and climatology index are loaded once, at start.
+
+Each worker sets WORKER_ID (0..N-1), which labels its /metrics output.
+
+    python -m api.serve [--host 0.0.0.0] [--port 8000] [--workers N]
+"""
+
+import asyncio
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+# Make the `api` package importable when running `python api/serve.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+MIN_UPTIME_SECONDS = 10.0
+MAX_RESTART_DELAY_SECONDS = 30.0
+STOP_TIMEOUT_SECONDS = 30.0
+# Each worker holds its own copy of whatever it does not share with the parent, so the
+# default stays modest on large hosts; WEB_CONCURRENCY or --workers can go higher
+MAX_DEFAULT_WORKERS = 4
+
+
+def available_cpus():
+    """
+    CPUs this process may use: its CPU affinity, further limited by a cgroup v2
+    CPU quota (containers), rather than os.cpu_count(), which counts the host's
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def default_workers():
+    """WEB_CONCURRENCY, else the available CPUs, at most MAX_DEFAULT_WORKERS"""
+    configured = int(os.environ.get('WEB_CONCURRENCY', '0'))
+    return configured or min(available_cpus(), MAX_DEFAULT_WORKERS)
+
+
+def bind_socket(host, port, backlog=2048):
+    # IPPROTO_TCP explicitly: asyncio only sets TCP_NODELAY on connections whose socket says so,
+    # and without it small responses wait for the client's delayed ACK (~40 ms per request)
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload():
+    """Import the app and load its models and date tables in this (the parent) process"""
+    from api import api
+
+    for registry in (api.model_registry, api.hourly_registry):
+        registry.load()
+    api.load_date_tables()
+    return api
+
+
+def reload_models(api):
+    """Reload the models from disk in the parent, so workers forked afterwards serve them"""
+    for registry in (api.model_registry, api.hourly_registry):
+        asyncio.run(registry.reload(reason='sighup'))
+    gc.collect()
+    gc.freeze()
+
+
+def run_worker(api, sock, worker_id, log_level):
+    """Body of a forked worker: serve the app on the inherited socket, then exit"""
+    import uvicorn
+
+    os.environ['WORKER_ID'] = str(worker_id)
+    api.metrics.worker_id = str(worker_id)
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    config = uvicorn.Config(api.app, log_level=log_level, access_log=False, lifespan='on')
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    os._exit(0)
+
+
+class Supervisor:
+    """Keeps `workers` forked uvicorn workers running on one listening socket."""
+
+    def __init__(self, api, sock, workers, log_level='info'):
+        self.api = api
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children = {}  # pid -> (worker_id, started_at)
+        self.restart_delay = {}  # worker_id -> seconds waited before its last restart
+        self.restart_at = {}  # worker_id -> monotonic time of its scheduled restart
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self, worker_id):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(self.api, self.sock, worker_id, self.log_level)
+            finally:
+                os._exit(1)
+        self.children[pid] = (worker_id, time.monotonic())
+        return pid
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_hup(self, signum, frame):
+        self.reload_requested = True
+
+    def stop_children(self, pids, timeout=STOP_TIMEOUT_SECONDS):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            for pid in list(remaining):
+                done, _ = os.waitpid(pid, os.WNOHANG)
+                if done:
+                    remaining.discard(pid)
+                    self.children.pop(pid, None)
+            time.sleep(0.05)
+        for pid in remaining:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.children.pop(pid, None)
+
+    def rolling_restart(self):
+        """Replace each worker in turn, so the others keep serving meanwhile"""
+        for pid, (worker_id, _) in list(self.children.items()):
+            self.stop_children([pid])
+            self.spawn(worker_id)
+
+    def reap(self):
+        """Collect exited workers and schedule their restarts"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker_id, started_at = self.children.pop(pid, (None, None))
+            if worker_id is None or self.stopping:
+                continue
+            uptime = time.monotonic() - started_at
+            delay = self.restart_delay.get(worker_id, 0.0)
+            delay = min(max(delay * 2, 0.5), MAX_RESTART_DELAY_SECONDS) if uptime < MIN_UPTIME_SECONDS else 0.0
+            self.restart_delay[worker_id] = delay
+            self.restart_at[worker_id] = time.monotonic() + delay
+            print(f"⚠️  Worker {worker_id} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)} "
+                  f"after {uptime:.1f}s; restarting in {delay:.1f}s")
+
+    def restart_due(self):
+        now = time.monotonic()
+        for worker_id, due in list(self.restart_at.items()):
+            if due <= now:
+                del self.restart_at[worker_id]
+                self.spawn(worker_id)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_hup)
+        for worker_id in range(self.workers):
+            self.spawn(worker_id)
+        print(f"🚀 Serving with {self.workers} workers (pids {', '.join(map(str, self.children))})")
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload_requested = False
+                reload_models(self.api)
+                print("🔄 Restarting workers")
+                self.rolling_restart()
+            self.reap()
+            self.restart_due()
+            time.sleep(0.2)
+        print("🛑 Stopping workers")
+        self.stop_children(list(self.children))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the API with preforked workers sharing one loaded model")
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '8000')))
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f"worker processes (default: WEB_CONCURRENCY, else the available CPUs, "
+                             f"at most {MAX_DEFAULT_WORKERS}); SIGHUP reloads the models and replaces them")
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+
+    workers = args.workers or default_workers()
+    api = preload()
+    sock = bind_socket(args.host, args.port)
+    # Objects that exist now (the app, the models) are moved out of the collector's reach,
+    # so collections in the workers do not write to, and thereby un-share, their pages
+    gc.collect()
+    gc.freeze()
+    Supervisor(api, sock, workers, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
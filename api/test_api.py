@@ -88,6 +88,56 @@ def test_validation():
         print(f"Validation test failed: {e}")
         return False
 
+def test_batch_prediction():
+    """Test the batch prediction endpoint with one invalid record"""
+    valid_record = {
+        "season": 2, "yr": 1, "mnth": 6, "holiday": 0, "weekday": 1,
+        "workingday": 1, "weathersit": 1, "temp": 0.5, "atemp": 0.5,
+        "hum": 0.6, "windspeed": 0.2, "day_of_year": 150, "month": 6, "day_of_week": 1
+    }
+    invalid_record = dict(valid_record, season=5)  # Invalid season (should be 1-4)
+    batch = {"records": [valid_record, invalid_record, dict(valid_record, temp=0.8)]}
+
+    try:
+        response = requests.post(f"{BASE_URL}/predict/batch", json=batch)
+        if response.status_code != 200:
+            print(f"Batch prediction failed with status {response.status_code}:", response.text)
+            return False
+        result = response.json()
+        print("Batch Prediction Test:", result)
+        if result["succeeded"] == 2 and result["failed"] == 1 and result["errors"][0]["index"] == 1:
+            return True
+        print("Batch prediction test failed - expected 2 predictions and 1 error at index 1")
+        return False
+    except Exception as e:
+        print(f"Batch prediction test failed: {e}")
+        return False
+
+def test_hourly_prediction():
+    """Test the hourly endpoint: the 24-hour profile and a single hour"""
+    day = {
+        "season": 2, "yr": 1, "mnth": 6, "holiday": 0, "weekday": 1,
+        "workingday": 1, "weathersit": 1, "temp": 0.5, "atemp": 0.5,
+        "hum": 0.6, "windspeed": 0.2, "day_of_year": 150, "month": 6, "day_of_week": 1
+    }
+
+    try:
+        profile = requests.post(f"{BASE_URL}/predict/hourly", json=day)
+        single = requests.post(f"{BASE_URL}/predict/hourly", json=dict(day, hr=17))
+        if profile.status_code != 200 or single.status_code != 200:
+            print(f"Hourly prediction failed with status {profile.status_code}/{single.status_code}")
+            return False
+        profile, single = profile.json(), single.json()
+        print(f"Hourly Prediction Test: {profile['total_rentals']} rentals, peak at {profile['peak_hour']}:00")
+        if len(profile["predictions"]) == 24 and \
+                single["predictions"][0]["predicted_rentals"] == profile["predictions"][17]["predicted_rentals"]:
+            return True
+        print("Hourly prediction test failed - expected 24 hours matching the single-hour result")
+        return False
+    except Exception as e:
+        print(f"Hourly prediction test failed: {e}")
+        return False
+
 def test_multiple_predictions():
     """Test multiple different scenarios"""
     test_scenarios = [
@@ -162,6 +212,12 @@ if __name__ == "__main__":
     # Test validation
     validation_ok = test_validation()
     
+    # Test batch endpoint
+    batch_ok = test_batch_prediction()
+    
+    # Test hourly endpoint
+    hourly_ok = test_hourly_prediction()
+    
     # Test multiple scenarios
     test_multiple_predictions()
     
@@ -173,9 +229,11 @@ if __name__ == "__main__":
     print(f"Health Check: {'✅ PASS' if health_ok else '❌ FAIL'}")
     print(f"Prediction: {'✅ PASS' if prediction_ok else '❌ FAIL'}")
     print(f"Validation: {'✅ PASS' if validation_ok else '❌ FAIL'}")
+    print(f"Batch Prediction: {'✅ PASS' if batch_ok else '❌ FAIL'}")
+    print(f"Hourly Prediction: {'✅ PASS' if hourly_ok else '❌ FAIL'}")
     print(f"Documentation: {'✅ PASS' if docs_ok else '❌ FAIL'}")
     
-    if health_ok and prediction_ok and validation_ok:
+    if health_ok and prediction_ok and validation_ok and batch_ok and hourly_ok:
         print("\n🎉 All tests passed! API is working correctly.")
         print(f"📖 Swagger UI available at: {BASE_URL}/docs")
     else:
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Offline batch scoring tests for api/batch_score.py. Runs offline on hour.csv, no API server needed.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.features import HOURLY_RAW_FEATURES, raw_matrix_from_frame
+from api.loader import ModelLoader
+
+HOUR_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hour.csv')
+
+
+def test_batch_score():
+    """The offline scorer writes the API's predictions for every row of hour.csv, NaN for invalid rows"""
+    from api.api import hourly_registry
+    from api.batch_score import plan_chunks, score_csv
+
+    with open(HOUR_CSV) as f:
+        lines = f.read().splitlines()
+    lines[3] = lines[3].replace(',0.22,', ',,', 1)   # a missing temp
+    lines[500] = lines[500].replace(',1,', ',7,', 1)  # season out of range
+    fields = lines[10].split(',')
+    fields[5] = '0_' + fields[5]                     # an hr only pydantic parses: still scored
+    lines[10] = ','.join(fields)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path, out_path = os.path.join(tmp, 'hour.csv'), os.path.join(tmp, 'predictions.npy')
+        with open(data_path, 'w') as f:
+            f.write('\n'.join(lines))  # no newline after the last row
+
+        header, chunks = plan_chunks(data_path, 100_000)
+        assert header == (lines[0] + '\n').encode() and sum(chunk[3] for chunk in chunks) == len(lines) - 1
+        assert chunks[-1][1] == os.path.getsize(data_path)
+
+        report = score_csv(data_path, out_path, workers=2, chunk_bytes=100_000)
+        assert report['model'] == 'hourly' and report['rows'] == len(lines) - 1 and report['invalid_rows'] == 2
+        predictions = np.load(out_path)
+
+    df = pd.read_csv(HOUR_CSV)
+    loaded = ModelLoader(**hourly_registry.settings()).load_candidate()[0]
+    expected = np.clip(loaded.predict_raw(raw_matrix_from_frame(df, HOURLY_RAW_FEATURES)), 0, None).astype(np.float32)
+    invalid = np.isnan(predictions)
+    np.testing.assert_array_equal(np.flatnonzero(invalid), [2, 499])
+    np.testing.assert_array_equal(predictions[~invalid], expected[~invalid])
+
+
+if __name__ == "__main__":
+    test_batch_score()
+    print("All tests passed")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Micro-batching tests for api/batcher.py. Runs offline, no API server needed.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.batcher import MicroBatcher
+from api.features import raw_matrix_from_frame
+from api.registry import ModelRegistry
+
+DAY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day.csv')
+
+
+def test_micro_batching():
+    """Concurrent single-row requests are scored in a few grouped calls with unchanged results"""
+    registry = ModelRegistry()
+    assert registry.load()
+    loaded = registry.current
+    raw = raw_matrix_from_frame(pd.read_csv(DAY_CSV).head(40))
+    calls = []
+
+    async def run(model, rows):
+        calls.append(len(rows))
+        await asyncio.sleep(0.001)
+        if np.isnan(rows).any():
+            raise ValueError("bad row")
+        return model.predict_raw(rows)
+
+    async def scenario():
+        batcher = MicroBatcher(run, max_batch=16, max_wait_ms=5)
+        results = await asyncio.gather(*[batcher.predict(loaded, raw[i:i + 1]) for i in range(len(raw))])
+        np.testing.assert_array_equal(np.concatenate(results), loaded.predict_raw(raw))
+        assert sum(calls) == len(raw) and max(calls) <= 16 and len(calls) < len(raw)
+        assert batcher.stats()['batches'] == len(calls) and batcher.in_flight == 0
+
+        bad = raw[:1].copy()
+        bad[0, 0] = np.nan
+        results = await asyncio.gather(batcher.predict(loaded, raw[:1]), batcher.predict(loaded, bad),
+                                       return_exceptions=True)
+        np.testing.assert_array_equal(results[0], loaded.predict_raw(raw[:1]))
+        assert isinstance(results[1], ValueError)  # only the request with the bad row fails
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_micro_batching()
+    print("All tests passed")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk scoring tests for api/bulk.py. Runs offline on hour.csv, no API server needed.
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.features import HOURLY_RAW_FEATURES, raw_matrix_from_frame
+
+HOUR_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hour.csv')
+
+
+def test_bulk_stream():
+    """/predict/stream scores hour.csv as posted and reports bad rows in place, in input order"""
+    from fastapi.testclient import TestClient
+
+    from api import api
+    from api.bulk import iter_blocks, parse_ndjson
+
+    async def blocks(data, chunk_bytes):
+        async def stream():
+            for start in range(0, len(data), 7):
+                yield data[start:start + 7]
+        return [block async for block in iter_blocks(stream(), chunk_bytes)]
+
+    # Two values on one line must not shift the records after it
+    records, bad = parse_ndjson(b'{"a": 1}\n{"b": 2}, {"c": 3}\n{"d": 4}\n')
+    assert records == [{"a": 1}, None, {"d": 4}] and list(bad) == [1] and bad[1][0]['type'] == 'json_invalid'
+
+    data = b'a,b\n1,2\n3,4\n5,6'
+    assert b''.join(asyncio.run(blocks(data, 8))) == data
+    assert all(block.endswith(b'\n') for block in asyncio.run(blocks(data, 8))[:-1])
+
+    with open(HOUR_CSV, 'rb') as f:
+        hour_csv = f.read()
+    with TestClient(api.app) as client:
+        response = client.post('/predict/stream?model=hourly', content=hour_csv,
+                               headers={'Content-Type': 'text/csv'})
+        assert response.status_code == 200
+        assert response.headers['x-model-version'] == api.hourly_registry.current.version
+        scored = pd.read_csv(io.StringIO(response.text))
+        df = pd.read_csv(HOUR_CSV)
+        expected = np.clip(api.hourly_registry.current.predict_raw(raw_matrix_from_frame(df, HOURLY_RAW_FEATURES)),
+                           0, None).astype(np.int64)
+        np.testing.assert_array_equal(scored['index'], np.arange(len(df)))
+        np.testing.assert_array_equal(scored['predicted_rentals'], expected)
+        assert scored['error'].isna().all()
+
+        record = {"season": 2, "yr": 1, "mnth": 5, "holiday": 0, "weekday": 3, "workingday": 1, "weathersit": 1,
+                  "temp": 0.5, "atemp": 0.48, "hum": 0.6, "windspeed": 0.2, "day_of_year": 130, "month": 5,
+                  "day_of_week": 2}
+        single = client.post('/predict', json=record).json()['predicted_rentals']
+        lines = [json.dumps(record), '{"season": 2,', json.dumps({**record, "hum": 1.5}),
+                 json.dumps({**record, "temp": "0.5"})]
+        results = [json.loads(line) for line in client.post(
+            '/predict/stream', content='\n'.join(lines) + '\n',
+            headers={'Content-Type': 'application/x-ndjson'}).text.splitlines()]
+        assert [r['index'] for r in results] == [0, 1, 2, 3]
+        assert results[0]['predicted_rentals'] == single and results[3]['predicted_rentals'] == single
+        assert results[1]['errors'][0]['type'] == 'json_invalid'
+        assert results[2]['errors'][0]['loc'] == ['hum']
+
+        header = ','.join(record)
+        row = ','.join(str(v) for v in record.values())
+        csv_body = '\n'.join([header, row, row.replace('0.48', 'warm'), row.replace(',0.6,', ',,')])
+        scored = pd.read_csv(io.StringIO(client.post('/predict/stream', content=csv_body,
+                                                     headers={'Content-Type': 'text/csv'}).text))
+        assert scored['predicted_rentals'].iloc[0] == single
+        assert scored['error'].iloc[1].startswith('atemp') and scored['error'].iloc[2].startswith('hum')
+
+        assert client.post('/predict/stream', json=record).status_code == 415
+
+
+def test_bulk_spool_limit():
+    """Results a client leaves unread stop the upload once past max_spool_bytes; a client that reads is not stopped"""
+    from api.api import hourly_batch_validator
+    from api.bulk import BulkScorer
+
+    with open(HOUR_CSV, 'rb') as f:
+        header, _, rows = f.read().partition(b'\n')
+    body = header + b'\n' + (rows.rstrip(b'\n') + b'\n') * 3
+    n_rows = body.count(b'\n') - 1
+
+    async def zeros(raw):
+        return np.zeros(len(raw))
+
+    async def scored(reads_while_uploading):
+        async def upload():
+            for start in range(0, len(body), 65536):
+                if reads_while_uploading:
+                    await asyncio.sleep(0)
+                yield body[start:start + 65536]
+        scorer = BulkScorer('csv', hourly_batch_validator, zeros, max_spool_bytes=300_000)
+        return b''.join([data async for data in scorer.stream(upload())]).decode().splitlines()
+
+    lines = asyncio.run(scored(False))
+    assert lines[-1].startswith(f',,"Upload stopped after {len(lines) - 2} records: more than 300000 bytes')
+    assert 0 < len(lines) - 2 < n_rows and lines[-2] == f'{len(lines) - 3},0,'
+
+    lines = asyncio.run(scored(True))
+    assert len(lines) == n_rows + 1 and lines[-1] == f'{n_rows - 1},0,'
+
+
+if __name__ == "__main__":
+    test_bulk_stream()
+    test_bulk_spool_limit()
+    print("All tests passed")
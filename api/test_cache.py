@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Prediction cache tests for api/cache.py. Runs offline on day.csv, no API server needed.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.cache import PredictionCache
+from api.features import FeatureTransform, raw_matrix_from_frame
+from api.loader import LoadedModel
+from api.predictors import FusedLinearPredictor
+from api.testing import DAY_CSV, load_training_data
+
+
+def test_prediction_cache():
+    """Cached predictions match the model, evict LRU-first and reset on a new version"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    predictor = FusedLinearPredictor.from_sklearn(LinearRegression().fit(scaler.transform(X), y), scaler,
+                                                  list(FeatureTransform().feature_columns))
+    loaded = LoadedModel(predictor, version='v1')
+    raw = raw_matrix_from_frame(pd.read_csv(DAY_CSV))
+
+    # Exact keys (the default): every answer is the model's own, cached or not
+    cache = PredictionCache(max_entries=1000)
+    np.testing.assert_array_equal(cache.predict(loaded, raw), loaded.predict_raw(raw))
+    np.testing.assert_array_equal(cache.predict(loaded, raw[:300]), loaded.predict_raw(raw[:300]))
+    assert (cache.hits, cache.misses) == (300, len(raw))
+    cache.predict(loaded, raw[:2] + 1e-7)
+    assert cache.misses == len(raw) + 2
+
+    # Rounded keys: nearby rows hit, and a miss is still scored from the row as sent
+    cache = PredictionCache(max_entries=2, decimals=4)
+    first = cache.predict(loaded, raw[:2] + 1e-7)
+    np.testing.assert_array_equal(first, loaded.predict_raw(raw[:2] + 1e-7))
+    np.testing.assert_array_equal(cache.predict(loaded, raw[:2]), first)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    cache.predict(loaded, raw[2:3])
+    assert cache.evictions == 1 and cache.stats()['size'] == 2
+
+    cache.predict(LoadedModel(predictor, version='v2'), raw[2:3])
+    assert cache.invalidations == 1 and cache.version == 'v2' and cache.stats()['size'] == 1
+
+    # Keys follow the width of the input, e.g. the 15 columns of an hourly row
+    hourly = np.column_stack([raw[:3], [0, 12, 23]])
+    assert cache.quantize(hourly).shape == (3, 15) and cache.quantize(hourly[0]).shape == (1, 15)
+
+
+if __name__ == "__main__":
+    test_prediction_cache()
+    print("All tests passed")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Calendar table tests for api/calendar_table.py. Runs offline on day.csv, no API server needed.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.calendar_table import WEATHER_FEATURES, CalendarTable, DateOutOfRange, calendar_rows
+from api.features import RAW_INDEX, raw_matrix_from_frame
+from api.ingest import read_bike_csv
+
+DAY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day.csv')
+
+
+def test_calendar_table():
+    """Date-keyed inputs reproduce the day.csv rows; /predict/date matches /predict"""
+    from fastapi.testclient import TestClient
+
+    from api import api
+
+    df = read_bike_csv(DAY_CSV)
+    calendar = CalendarTable.from_csv(DAY_CSV, last_day='2030-12-31')
+    assert calendar.first_day == np.datetime64('2011-01-01') and calendar.last_day == np.datetime64('2030-12-31')
+    # The rules used for dates after the data reproduce the data
+    np.testing.assert_array_equal(calendar_rows(df['dteday'].to_numpy()), calendar.rows[:len(df)])
+    weather = df[list(WEATHER_FEATURES)].to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(calendar.raw_for_dates(df['dteday'].to_numpy(), weather),
+                                  raw_matrix_from_frame(df))
+    for day in ('2010-12-31', '2031-01-01'):
+        try:
+            calendar.raw_for_dates([day], weather[:1])
+            assert False, f"{day} should be out of range"
+        except DateOutOfRange:
+            pass
+
+    row = df.iloc[514]  # 2012-05-29
+    body = {name: row[name].item() for name in RAW_INDEX}
+    with TestClient(api.app) as client:
+        expected = client.post('/predict', json=body).json()
+        dated = {'dteday': str(row['dteday'].date()), **{name: body[name] for name in WEATHER_FEATURES}}
+        response = client.post('/predict/date', json=dated)
+        assert response.status_code == 200
+        assert response.json()['predicted_rentals'] == expected['predicted_rentals']
+        assert client.post('/predict/date', json=dict(dated, dteday='2099-06-01')).status_code == 422
+
+
+if __name__ == "__main__":
+    test_calendar_table()
+    print("All tests passed")
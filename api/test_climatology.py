@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Climatology index tests for api/climatology.py. Runs offline on day.csv/hour.csv, no API server needed.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.climatology import (CLIMATE_FEATURES, CLIMATOLOGY_QUANTILES, ClimatologyIndex, build_climatology,
+                             load_climatology, save_climatology)
+
+DAY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day.csv')
+
+
+def test_climatology():
+    """Climatology statistics match NumPy on each pooled window and fill missing weather fields"""
+    day_df = pd.read_csv(DAY_CSV)
+    hour_df = pd.read_csv(DAY_CSV.replace('day.csv', 'hour.csv'))
+    for df in (day_df, hour_df):
+        df['dteday'] = pd.to_datetime(df['dteday'])
+    arrays = build_climatology(day_df, hour_df, window=3)
+    assert arrays['daily_mean'].shape == (366, 4) and arrays['hourly_quantiles'].shape == (366, 24, 5, 4)
+
+    def pooled(df, day_index):
+        distance = (df['dteday'].dt.dayofyear - 1 - day_index) % 366
+        return df[(distance <= 3) | (distance >= 366 - 3)]
+
+    for day_index in (0, 100, 365):
+        window = pooled(day_df, day_index)
+        np.testing.assert_allclose(arrays['daily_quantiles'][day_index].astype(np.float64),
+                                   np.quantile(window[list(CLIMATE_FEATURES)], CLIMATOLOGY_QUANTILES, axis=0),
+                                   atol=1e-3)
+        np.testing.assert_allclose(arrays['daily_mean'][day_index], window[list(CLIMATE_FEATURES)].mean(), atol=1e-3)
+        shares = window['weathersit'].value_counts(normalize=True).reindex([1, 2, 3, 4], fill_value=0)
+        np.testing.assert_allclose(arrays['daily_weathersit'][day_index], shares, atol=1e-3)
+        hours = pooled(hour_df, day_index)
+        np.testing.assert_allclose(arrays['hourly_mean'][day_index, 17],
+                                   hours[hours['hr'] == 17][list(CLIMATE_FEATURES)].mean(), atol=1e-3)
+
+    index = ClimatologyIndex(arrays)
+    dates = np.array(['2026-01-01', '2026-07-04'], dtype='datetime64[D]')
+    weather = np.array([[2, 0.3, np.nan, 0.5, 0.1], [np.nan] * 5])
+    filled = index.fill_missing(dates, weather)
+    typical = index.typical_weather(dates)
+    np.testing.assert_array_equal(filled[0], [2, 0.3, typical[0, 2], 0.5, 0.1])
+    np.testing.assert_array_equal(filled[1], typical[1])
+    assert typical[1, 0] == np.argmax(arrays['daily_weathersit'][184]) + 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index.manifest = {'format_version': 1, 'arrays': {
+            name: {'file': f'{name}.npy', 'dtype': array.dtype.str, 'shape': list(array.shape)}
+            for name, array in arrays.items()}}
+        save_climatology(index, os.path.join(tmp, 'climatology'))
+        loaded = load_climatology(os.path.join(tmp, 'climatology'))
+        np.testing.assert_array_equal(loaded.typical_weather(dates, hours=[8, 17]),
+                                      index.typical_weather(dates, hours=[8, 17]))
+
+
+if __name__ == "__main__":
+    test_climatology()
+    print("All tests passed")
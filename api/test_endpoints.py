@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+In-process endpoint tests for api/api.py, through FastAPI's TestClient.
+Runs offline, no API server needed (see test_api.py for a running server).
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+RECORD = {"season": 2, "yr": 1, "mnth": 5, "holiday": 0, "weekday": 3, "workingday": 1, "weathersit": 1,
+          "temp": 0.5, "atemp": 0.48, "hum": 0.6, "windspeed": 0.2, "day_of_year": 130, "month": 5,
+          "day_of_week": 2}
+
+
+def expected_rentals(registry, fields, records):
+    """The registry's current model applied to `records` directly, clipped and truncated as the API does"""
+    raw = np.array([[record[name] for name in fields] for record in records], dtype=np.float64)
+    return np.clip(registry.current.predict_raw(raw), 0, None).astype(np.int64).tolist()
+
+
+def test_predict_batch():
+    """/predict/batch scores the valid records and reports each invalid one by index, with pydantic's errors"""
+    from fastapi.testclient import TestClient
+
+    from api import api
+
+    records = [{**RECORD, "temp": temp, "weathersit": weathersit}
+               for temp, weathersit in zip(np.linspace(0.1, 0.9, 8).round(2).tolist(), [1, 2, 3, 1, 2, 3, 1, 2])]
+    records[2] = {**records[2], "hum": 1.5}                            # out of bounds
+    records[4] = {k: v for k, v in records[4].items() if k != "temp"}  # missing field
+    records[5] = {**records[5], "holiday": 1}                          # holiday on a working day
+    records[6] = {**records[6], "season": "2"}                         # numeric string: accepted
+    with TestClient(api.app) as client:
+        response = client.post('/predict/batch', json={"records": records})
+        assert response.status_code == 200
+        body = response.json()
+        assert (body['total'], body['succeeded'], body['failed']) == (8, 5, 3)
+        assert body['model_version'] == api.model_registry.current.version
+
+        valid = [0, 1, 3, 6, 7]
+        assert [p['index'] for p in body['predictions']] == valid
+        expected = expected_rentals(api.model_registry, api.batch_validator.fields,
+                                    [{**records[i], "season": 2} for i in valid])
+        assert [p['predicted_rentals'] for p in body['predictions']] == expected
+        single = client.post('/predict', json=records[3]).json()
+        assert body['predictions'][2]['predicted_rentals'] == single['predicted_rentals']
+        assert body['predictions'][2]['confidence'] == single['confidence']
+
+        errors = {e['index']: e['errors'] for e in body['errors']}
+        assert sorted(errors) == [2, 4, 5]
+        assert errors[2][0]['loc'] == ['hum'] and errors[2][0]['type'] == 'less_than_equal'
+        assert errors[4][0]['loc'] == ['temp'] and errors[4][0]['type'] == 'missing'
+        assert errors[5][0]['loc'] == ['workingday'] and errors[5][0]['type'] == 'value_error'
+
+        # Only the envelope is validated up front: no records, or too many, is a 422
+        assert client.post('/predict/batch', json={"records": []}).status_code == 422
+        assert client.post('/predict/batch', json={"records": [RECORD] * 10001}).status_code == 422
+
+
+def test_predict_hourly():
+    """/predict/hourly gives one hour with `hr` and the day's 24-hour profile without it; bad hours are a 422"""
+    from fastapi.testclient import TestClient
+
+    from api import api
+
+    with TestClient(api.app) as client:
+        response = client.post('/predict/hourly', json=RECORD)
+        assert response.status_code == 200
+        day = response.json()
+        assert day['model_version'] == api.hourly_registry.current.version
+        assert [p['hr'] for p in day['predictions']] == list(range(24))
+        rentals = [p['predicted_rentals'] for p in day['predictions']]
+        assert rentals == expected_rentals(api.hourly_registry, api.hourly_batch_validator.fields,
+                                           [{**RECORD, "hr": hr} for hr in range(24)])
+        assert day['total_rentals'] == sum(rentals) and day['peak_hour'] == int(np.argmax(rentals))
+
+        hour = client.post('/predict/hourly', json={**RECORD, "hr": 17}).json()
+        assert [p['hr'] for p in hour['predictions']] == [17]
+        assert hour['predictions'][0]['predicted_rentals'] == rentals[17] == hour['total_rentals']
+        assert hour['peak_hour'] == 17 and hour['confidence'] == day['confidence']
+
+        for hr in (24, -1, "noon"):
+            response = client.post('/predict/hourly', json={**RECORD, "hr": hr})
+            assert response.status_code == 422 and response.json()['detail'][0]['loc'] == ['body', 'hr']
+        assert client.post('/predict/hourly', json={**RECORD, "hum": 1.5}).status_code == 422
+
+
+if __name__ == "__main__":
+    test_predict_batch()
+    test_predict_hourly()
+    print("All tests passed")
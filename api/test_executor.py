@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Inference executor tests for api/executor.py. Runs offline, no API server needed.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.bundle import export_bundle
+from api.executor import ExecutorSaturated, InferenceExecutor, ModelVersionMismatch
+from api.features import FeatureTransform, raw_matrix_from_frame
+from api.registry import ModelRegistry
+from api.testing import load_training_data
+
+DAY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day.csv')
+
+
+def test_inference_executor():
+    """Pooled predictions match inline ones, and a full queue is rejected rather than grown"""
+    registry = ModelRegistry()
+    assert registry.load()
+    raw = raw_matrix_from_frame(pd.read_csv(DAY_CSV).head(50))
+    expected = registry.current.predict_raw(raw)
+
+    async def scenario(executor):
+        executor.start([registry])
+        try:
+            np.testing.assert_array_equal(await executor.predict(registry, registry.current, raw), expected)
+            if executor.kind == 'thread':
+                results = await asyncio.gather(*[executor.predict(registry, registry.current, raw)
+                                                 for _ in range(3)], return_exceptions=True)
+                assert sum(isinstance(result, ExecutorSaturated) for result in results) == 2
+                assert executor.stats()['rejected'] == 2 and executor.pending == 0
+        finally:
+            executor.shutdown()
+
+    asyncio.run(scenario(InferenceExecutor('thread', workers=1, max_pending=1)))
+    asyncio.run(scenario(InferenceExecutor('process', workers=1)))
+
+
+def test_process_pool_follows_reload():
+    """A reload replaces the process pool once; a request for the replaced version gets ModelVersionMismatch"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    feature_columns = list(FeatureTransform().feature_columns)
+    raw = raw_matrix_from_frame(pd.read_csv(DAY_CSV).head(5))
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir = os.path.join(tmp, 'model_bundle')
+        export_bundle(LinearRegression().fit(scaler.transform(X), y), scaler, feature_columns, bundle_dir)
+        registry = ModelRegistry(bundle_dir=bundle_dir, artifact_dir=tmp)
+        assert registry.load()
+        executor = InferenceExecutor('process', workers=1)
+
+        async def scenario():
+            executor.start([registry])
+            try:
+                first = registry.current
+                np.testing.assert_array_equal(await executor.predict(registry, first, raw), first.predict_raw(raw))
+
+                export_bundle(LinearRegression().fit(scaler.transform(X[:400]), y[:400]), scaler,
+                              feature_columns, bundle_dir)
+                assert (await registry.reload())['status'] == 'reloaded'
+                second = registry.current
+                for _ in range(2):
+                    np.testing.assert_array_equal(await executor.predict(registry, second, raw),
+                                                  second.predict_raw(raw))
+                assert executor.stats()['recycles'] == 1
+
+                try:
+                    await executor.predict(registry, first, raw)
+                except ModelVersionMismatch:
+                    pass
+                else:
+                    raise AssertionError("a request for the replaced version was scored")
+                assert executor.stats()['recycles'] == 1
+            finally:
+                executor.shutdown()
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_inference_executor()
+    test_process_pool_follows_reload()
+    print("All tests passed")
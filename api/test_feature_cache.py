@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Feature matrix cache tests for api/feature_cache.py. Runs offline, no API server needed.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.feature_cache import load_training_matrix
+from api.features import FeatureTransform
+
+DAY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day.csv')
+
+
+def test_feature_cache():
+    """The cached matrix is memory-mapped on a hit and rebuilt when the CSV or feature list changes"""
+    with open(DAY_CSV) as f:
+        lines = f.readlines()
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path, cache_dir = os.path.join(tmp, 'day.csv'), os.path.join(tmp, 'cache')
+        with open(data_path, 'w') as f:
+            f.writelines(lines[:300])
+        X, y, cached = load_training_matrix(data_path, cache_dir=cache_dir)
+        assert not cached and X.shape == (299, len(FeatureTransform().feature_columns))
+        X_hit, y_hit, cached = load_training_matrix(data_path, cache_dir=cache_dir)
+        assert cached and isinstance(X_hit, np.memmap)
+        np.testing.assert_array_equal(X_hit, X)
+        np.testing.assert_array_equal(y_hit, y)
+
+        _, _, cached = load_training_matrix(data_path, ['temp', 'hum'], cache_dir=cache_dir)
+        assert not cached and len(os.listdir(cache_dir)) == 1  # replaced the entry for this CSV
+
+        with open(data_path, 'a') as f:
+            f.write(lines[300])
+        X, _, cached = load_training_matrix(data_path, cache_dir=cache_dir)
+        assert not cached and X.shape[0] == 300
+        assert load_training_matrix(data_path, cache_dir=cache_dir)[2]
+
+
+if __name__ == "__main__":
+    test_feature_cache()
+    print("All tests passed")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+/forecast endpoint tests for api/forecast.py. Runs offline, no API server needed.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.calendar_table import WEATHER_FEATURES
+
+
+def test_forecast():
+    """/forecast scores a date range in one response, consistently with /predict/date"""
+    from fastapi.testclient import TestClient
+
+    from api import api
+
+    weather = {"weathersit": 2, "temp": 0.4, "atemp": 0.4, "hum": 0.7, "windspeed": 0.1}
+    with TestClient(api.app) as client:
+        response = client.post('/forecast', json={"start": "2012-01-01", "end": "2012-12-31"})
+        assert response.status_code == 200
+        year = response.json()
+        assert year['days'] == 366 and len(year['predictions']) == 366
+        assert year['predictions'][-1]['date'] == '2012-12-31'
+        assert year['total_rentals'] == sum(p['predicted_rentals'] for p in year['predictions'])
+
+        week = client.post('/forecast', json={"start": "2026-05-25", "end": "2026-05-31", "scenario": "constant",
+                                              "weather": weather}).json()
+        for day in (week['predictions'][0], week['predictions'][3]):
+            single = client.post('/predict/date', json={"dteday": day['date'], **weather}).json()
+            assert single['predicted_rentals'] == day['predicted_rentals']
+
+        assert client.post('/forecast', json={"start": "2026-01-02", "end": "2026-01-01"}).status_code == 422
+        assert client.post('/forecast', json={"start": "2026-01-01", "end": "2026-01-02", "scenario": "daily",
+                                              "daily_weather": [weather]}).status_code == 422
+        assert client.post('/forecast', json={"start": "2035-12-01", "end": "2036-01-31"}).status_code == 422
+
+        # Fields left out of a constant scenario come from the climatology of each day
+        partial = client.post('/forecast', json={"start": "2026-07-01", "end": "2026-07-02", "scenario": "constant",
+                                                 "weather": {"weathersit": 1}}).json()
+        typical = api.climatology_index.typical_weather(np.array(['2026-07-01'], dtype='datetime64[D]'))[0]
+        single = client.post('/predict/date', json={"dteday": "2026-07-01", "weathersit": 1,
+                                                    **dict(zip(WEATHER_FEATURES[1:], typical[1:].tolist()))}).json()
+        assert partial['predictions'][0]['predicted_rentals'] == single['predicted_rentals']
+
+
+if __name__ == "__main__":
+    test_forecast()
+    print("All tests passed")
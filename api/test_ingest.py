@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Chunked CSV ingestion tests for api/ingest.py. Runs offline on hour.csv, no API server needed.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.features import HOURLY_RAW_FEATURES, raw_matrix_from_frame
+from api.ingest import BikeCsvReader
+
+HOUR_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hour.csv')
+
+
+def test_chunked_ingestion():
+    """Chunked compact reading gives the same raw inputs as a plain read_csv of hour.csv"""
+    chunks = list(BikeCsvReader(HOUR_CSV, chunk_rows=5000))
+    assert len(chunks) == 4
+    assert chunks[0]['weathersit'].dtype == np.int8 and chunks[0]['temp'].dtype == np.float32
+    streamed = np.vstack([raw_matrix_from_frame(chunk, HOURLY_RAW_FEATURES) for chunk in chunks])
+    expected = raw_matrix_from_frame(pd.read_csv(HOUR_CSV), HOURLY_RAW_FEATURES)
+    np.testing.assert_allclose(streamed, expected, rtol=1e-6)
+
+
+if __name__ == "__main__":
+    test_chunked_ingestion()
+    print("All tests passed")
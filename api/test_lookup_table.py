@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Precomputed lookup table tests for api/lookup_table.py. Runs offline on day.csv, no API server needed.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.features import RAW_INDEX, FeatureTransform, raw_matrix_from_frame
+from api.loader import LoadedModel
+from api.lookup_table import LookupTable, build_table, calendar_from_frame, grid_range
+from api.predictors import FusedLinearPredictor
+from api.testing import DAY_CSV, load_training_data
+
+
+def test_lookup_table():
+    """A linear model is multilinear in the weather floats, so linear lookup is exact"""
+    day_data = pd.read_csv(DAY_CSV)
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    predictor = FusedLinearPredictor.from_sklearn(LinearRegression().fit(scaler.transform(X), y), scaler,
+                                                  list(FeatureTransform().feature_columns))
+    loaded = LoadedModel(predictor, version='v1')
+    raw = raw_matrix_from_frame(day_data)
+    calendar = calendar_from_frame(day_data)
+    grid_min, grid_max = grid_range(raw)
+    table = build_table(loaded, calendar, [2, 2, 3, 2], grid_min, grid_max)
+    assert table.shape == (len(day_data), 4, 2, 2, 3, 2)
+
+    lookup = LookupTable(table, calendar, grid_min, grid_max, mode='linear')
+    np.testing.assert_allclose(lookup.predict_raw(raw, loaded.predict_model), loaded.predict_model(raw),
+                               atol=1e-2)
+
+    # Rows that contradict the calendar are scored by the fallback
+    inconsistent = raw[:2].copy()
+    inconsistent[:, RAW_INDEX['holiday']] = 1 - inconsistent[:, RAW_INDEX['holiday']]
+    assert (lookup.locate(inconsistent) == -1).all()
+    np.testing.assert_array_equal(lookup.predict_raw(inconsistent, lambda rows: np.full(len(rows), -1.0)), -1.0)
+
+
+if __name__ == "__main__":
+    test_lookup_table()
+    print("All tests passed")
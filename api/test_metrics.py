@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Request metrics tests for api/metrics.py. Runs offline, no API server needed.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.metrics import Metrics, MetricsMiddleware, current_timer
+
+
+def test_metrics_middleware():
+    """Stage timings of /predict add up and are exposed in the Prometheus format"""
+    from fastapi.testclient import TestClient
+
+    from api import api
+
+    metrics = Metrics(enabled=True, worker_id='test')
+    body = {"season": 2, "yr": 1, "mnth": 6, "holiday": 0, "weekday": 1, "workingday": 1, "weathersit": 1,
+            "temp": 0.5, "atemp": 0.5, "hum": 0.6, "windspeed": 0.2, "day_of_year": 150, "month": 6,
+            "day_of_week": 1}
+    with TestClient(MetricsMiddleware(api.app, metrics)) as client:
+        assert client.post('/predict', json=body).status_code == 200
+        assert client.post('/predict', json=dict(body, season=9)).status_code == 422
+        assert client.get('/nowhere').status_code == 404
+    assert current_timer() is None
+
+    assert metrics.requests == {('/predict', 200): 1, ('/predict', 422): 1, ('unmatched', 404): 1}
+    stages = {stage for endpoint, stage in metrics.stages if endpoint == '/predict'}
+    assert {'validation', 'feature_build', 'inference', 'serialization'} <= stages
+    stage_total = sum(histogram.total for (endpoint, _), histogram in metrics.stages.items()
+                      if endpoint == '/predict')
+    assert stage_total <= metrics.durations['/predict'].total
+
+    text = metrics.render(models=[('daily', api.model_registry.current)], cache_stats=api.prediction_cache.stats())
+    assert 'bike_api_requests_total{worker="test",endpoint="/predict",status="200"} 1' in text
+    assert 'bike_api_request_errors_total{worker="test",endpoint="/predict"} 1' in text
+    assert 'bike_api_stage_duration_seconds_count{worker="test",endpoint="/predict",stage="inference"} 1' in text
+    assert 'bike_api_prediction_cache_misses_total{worker="test"}' in text
+
+
+if __name__ == "__main__":
+    test_metrics_middleware()
+    print("All tests passed")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the prediction backends in api/predictors.py.
+Each optimized backend must reproduce the sklearn scaler + model pipeline
+it was exported from. Runs offline on day.csv, no API server needed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api import bundle
+from api.bundle import export_bundle, load_bundle, save_bundle
+from api.features import HOURLY_FEATURE_COLUMNS, FeatureTransform
+from api.loader import load_model
+from api.predictors import FusedLinearPredictor, SklearnPredictor
+from api.testing import HOUR_CSV, load_training_data
+from api.tree_engine import FlatForestPredictor
+
+
+def test_fused_linear_parity():
+    """The folded linear model matches scaler.transform + model.predict"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    model = LinearRegression().fit(scaler.transform(X), y)
+
+    expected = SklearnPredictor(model, scaler).predict(X)
+    fused = FusedLinearPredictor.from_sklearn(model, scaler).predict(X)
+
+    np.testing.assert_allclose(fused, expected, rtol=1e-9, atol=1e-6)
+    print(f"Fused linear parity: max deviation {np.max(np.abs(fused - expected)):.2e}")
+
+
+def test_fused_linear_roundtrip():
+    """The linear model bundle reloads to the same predictions"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    model = LinearRegression().fit(scaler.transform(X), y)
+    predictor = FusedLinearPredictor.from_sklearn(model, scaler, FeatureTransform().feature_columns)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model_bundle')
+        save_bundle(predictor, path)
+        loaded, manifest = load_bundle(path)
+        assert manifest['model_type'] == 'linear'
+        np.testing.assert_array_equal(loaded.predict(X), predictor.predict(X))
+
+    assert loaded.feature_columns == predictor.feature_columns
+
+
+def test_flat_forest_bit_identical():
+    """The flat tree engine reproduces RandomForestRegressor.predict exactly"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=20, random_state=42, max_depth=10).fit(scaler.transform(X), y)
+
+    expected = SklearnPredictor(model, scaler).predict(X)
+    flat = FlatForestPredictor.from_sklearn(model, scaler).predict(X)
+
+    np.testing.assert_array_equal(flat, expected)
+    np.testing.assert_array_equal(FlatForestPredictor.from_sklearn(model, scaler).predict(X[0]), expected[:1])
+
+
+def test_flat_decision_tree_bit_identical():
+    """A single DecisionTreeRegressor flattens to the same predictions"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    model = DecisionTreeRegressor(random_state=42, max_depth=10).fit(scaler.transform(X), y)
+
+    np.testing.assert_array_equal(FlatForestPredictor.from_sklearn(model, scaler).predict(X),
+                                  SklearnPredictor(model, scaler).predict(X))
+
+
+def test_flat_forest_roundtrip():
+    """The forest model bundle is memory-mapped and reloads to the same predictions"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=5, random_state=42, max_depth=6).fit(scaler.transform(X), y)
+    predictor = FlatForestPredictor.from_sklearn(model, scaler, FeatureTransform().feature_columns)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model_bundle')
+        save_bundle(predictor, path)
+        # Saving again replaces the bundle in place
+        save_bundle(predictor, path)
+        loaded, manifest = load_bundle(path)
+        assert manifest['model_type'] == 'forest'
+        assert isinstance(loaded.threshold.base, np.memmap)
+        np.testing.assert_array_equal(loaded.predict(X), predictor.predict(X))
+
+    assert loaded.feature_columns == predictor.feature_columns
+
+
+def test_stale_bundle_falls_back_to_pickles():
+    """A bundle exported with another best_model.pkl than the one on disk is not served"""
+    import pickle
+
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    feature_columns = list(FeatureTransform().feature_columns)
+
+    def write_pickles(model, artifact_dir):
+        for name, obj in (('best_model.pkl', model), ('scaler.pkl', scaler), ('feature_columns.pkl', feature_columns)):
+            with open(os.path.join(artifact_dir, name), 'wb') as f:
+                pickle.dump(obj, f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir = os.path.join(tmp, 'model_bundle')
+        model = LinearRegression().fit(scaler.transform(X), y)
+        write_pickles(model, tmp)
+        _, manifest = export_bundle(model, scaler, feature_columns, bundle_dir, pickle_dir=tmp)
+        pickle_path = os.path.join(tmp, 'best_model.pkl')
+        hashed = []
+        real_sha256 = bundle.file_sha256
+        bundle.file_sha256 = lambda path: hashed.append(path) or real_sha256(path)
+        try:
+            # The recorded size and mtime match: the pickle is not read
+            loaded = load_model('auto', bundle_dir, tmp)
+            assert loaded.source == 'bundle' and loaded.version == manifest['version'] and not hashed
+
+            # Touched but unchanged: hashed once, then known by its new stat
+            stat = os.stat(pickle_path)
+            os.utime(pickle_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            assert load_model('auto', bundle_dir, tmp).source == 'bundle'
+            assert load_model('auto', bundle_dir, tmp).source == 'bundle' and hashed == [pickle_path]
+        finally:
+            bundle.file_sha256 = real_sha256
+
+        # Retrained by a script that only writes the pickles
+        retrained = LinearRegression().fit(scaler.transform(X[:400]), y[:400])
+        write_pickles(retrained, tmp)
+        os.utime(pickle_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        loaded = load_model('auto', bundle_dir, tmp)
+        assert loaded.source == 'pickle'
+        np.testing.assert_allclose(loaded.predictor.predict(X[:5]), retrained.predict(scaler.transform(X[:5])))
+
+
+def test_hourly_flat_forest_bit_identical():
+    """The hourly transform reads `hr` and the flat forest reproduces sklearn on hour.csv"""
+    hour_data = pd.read_csv(HOUR_CSV, nrows=3000)
+    transform = FeatureTransform(HOURLY_FEATURE_COLUMNS)
+    X, y = transform.transform_frame(hour_data), hour_data['cnt'].to_numpy()
+    np.testing.assert_array_equal(X[:, -1], hour_data['hr'].to_numpy())
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(scaler.transform(X), y)
+    flat = FlatForestPredictor.from_sklearn(model, scaler, list(HOURLY_FEATURE_COLUMNS))
+    np.testing.assert_array_equal(flat.predict(X), model.predict(scaler.transform(X)))
+
+
+def benchmark_single_row(repeats=2000):
+    """Print single-row latency of the sklearn pipeline vs the folded model"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    model = LinearRegression().fit(scaler.transform(X), y)
+    row = X[:1]
+
+    for predictor in (SklearnPredictor(model, scaler), FusedLinearPredictor.from_sklearn(model, scaler)):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            predictor.predict(row)
+        elapsed = (time.perf_counter() - start) / repeats
+        print(f"{predictor.kind:<10} {elapsed * 1e6:8.2f} µs per single-row prediction")
+
+
+if __name__ == "__main__":
+    test_fused_linear_parity()
+    test_fused_linear_roundtrip()
+    test_flat_forest_bit_identical()
+    test_flat_decision_tree_bit_identical()
+    test_flat_forest_roundtrip()
+    test_stale_bundle_falls_back_to_pickles()
+    test_hourly_flat_forest_bit_identical()
+    print("All parity tests passed")
+    benchmark_single_row()
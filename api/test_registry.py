@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Hot model reload tests for api/registry.py: a retrained bundle is swapped in,
+a broken one is rejected. Runs offline on day.csv, no API server needed.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.bundle import export_bundle
+from api.features import FeatureTransform, raw_matrix_from_frame
+from api.loader import LoadedModel
+from api.lookup_table import (CONTINUOUS_FEATURES, LOOKUP_FORMAT_VERSION, build_table, calendar_from_frame,
+                              grid_range, save_lookup_table)
+from api.registry import ModelRegistry
+from api.testing import DAY_CSV, load_training_data
+
+
+def test_registry_reload():
+    """A retrained bundle is swapped in; one failing its smoke check is not"""
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    feature_columns = list(FeatureTransform().feature_columns)
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir = os.path.join(tmp, 'model_bundle')
+        export_bundle(LinearRegression().fit(scaler.transform(X), y), scaler, feature_columns, bundle_dir)
+        registry = ModelRegistry(bundle_dir=bundle_dir, artifact_dir=tmp)
+
+        async def scenario():
+            await registry.startup()
+            first = registry.current
+            assert (await registry.reload())['status'] == 'unchanged'
+
+            export_bundle(LinearRegression().fit(scaler.transform(X[:400]), y[:400]), scaler,
+                          feature_columns, bundle_dir)
+            result = await registry.reload()
+            assert result['status'] == 'reloaded' and result['previous_version'] == first.version
+            assert registry.current.version == result['version'] != first.version
+
+            manifest_path = os.path.join(bundle_dir, 'manifest.json')
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            manifest['smoke_predictions'] = [0.0] * len(manifest['smoke_predictions'])
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f)
+            assert (await registry.reload())['status'] == 'failed'
+            assert registry.current.version == result['version']
+            await registry.shutdown()
+
+        asyncio.run(scenario())
+
+
+def test_registry_reloads_rebuilt_lookup_table():
+    """Rebuilding the lookup table changes the watch signature and is swapped in on reload"""
+    day_data = pd.read_csv(DAY_CSV)
+    X, y = load_training_data()
+    scaler = StandardScaler().fit(X)
+    feature_columns = list(FeatureTransform().feature_columns)
+    raw = raw_matrix_from_frame(day_data)
+    calendar = calendar_from_frame(day_data)
+    grid_min, grid_max = grid_range(raw)
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir, lookup_dir = os.path.join(tmp, 'model_bundle'), os.path.join(tmp, 'lookup_table')
+        predictor, manifest = export_bundle(LinearRegression().fit(scaler.transform(X), y), scaler,
+                                            feature_columns, bundle_dir)
+        model = LoadedModel(predictor, version=manifest['version'])
+
+        def build(bins):
+            grid = {name: {'min': float(lo), 'max': float(hi), 'bins': bins}
+                    for name, lo, hi in zip(CONTINUOUS_FEATURES, grid_min, grid_max)}
+            save_lookup_table(lookup_dir, build_table(model, calendar, [bins] * 4, grid_min, grid_max), calendar,
+                              {'format_version': LOOKUP_FORMAT_VERSION, 'model_version': model.version, 'grid': grid})
+
+        build(2)
+        registry = ModelRegistry(bundle_dir=bundle_dir, artifact_dir=tmp, lookup_mode='nearest',
+                                 lookup_dir=lookup_dir)
+
+        async def scenario():
+            await registry.startup()
+            first = registry.current
+            assert first.lookup_table.table.shape[-1] == 2 and first.version.startswith(model.version + '+lookup.')
+            signature = registry.artifact_signature()
+
+            build(3)
+            assert registry.artifact_signature() != signature
+            result = await registry.reload()
+            assert result['status'] == 'reloaded' and registry.current.version != first.version
+            assert registry.current.lookup_table.table.shape[-1] == 3
+            await registry.shutdown()
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_registry_reload()
+    test_registry_reloads_rebuilt_lookup_table()
+    print("All tests passed")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Training pipeline tests for api/training.py. Runs offline on day.csv, no API server needed.
+"""
+
+import os
+import sys
+import tempfile
+
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.bundle import load_bundle
+from api.training import run_pipeline
+
+DAY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day.csv')
+
+
+def test_training_pipeline():
+    """CV selection over a small grid exports a bundle that reproduces the refitted model"""
+    candidates = {
+        'Linear Regression': (LinearRegression, {}),
+        'Decision Tree': (DecisionTreeRegressor, {'max_depth': [4, 8], 'random_state': [42]}),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run_pipeline(DAY_CSV, n_folds=3, n_jobs=1, artifact_dir=tmp,
+                              bundle_dir=os.path.join(tmp, 'model_bundle'), candidates=candidates,
+                              cache_dir=os.path.join(tmp, 'feature_cache'))
+        assert report['configurations'] == 3
+        assert report['best']['cv_r2'] == max(entry['cv_r2'] for entry in report['candidates'])
+        assert set(report['stages']) == {'load', 'folds', 'search', 'refit', 'export'}
+        _, manifest = load_bundle(os.path.join(tmp, 'model_bundle'))
+        assert manifest['version'] == report['bundle_version']
+
+
+if __name__ == "__main__":
+    test_training_pipeline()
+    print("All tests passed")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Column-wise batch validation tests for api/validation.py. Runs offline, no API server needed.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DAY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day.csv')
+
+
+def test_batch_validation():
+    """Column-wise batch validation accepts and rejects exactly what per-record pydantic does"""
+    from pydantic import ValidationError
+
+    from api.api import BikeRentalRequest, batch_validator
+
+    records = pd.read_csv(DAY_CSV).head(12)
+    records['dteday'] = pd.to_datetime(records['dteday'])
+    records['day_of_year'] = records['dteday'].dt.dayofyear
+    records['month'] = records['dteday'].dt.month
+    records['day_of_week'] = records['dteday'].dt.dayofweek
+    records = records[batch_validator.fields].to_dict('records')
+    records[1].pop('temp')                           # missing field
+    records[2]['season'] = "2"                       # numeric string: accepted
+    records[3]['hum'] = float('nan')                 # NaN fails the bounds
+    records[4].update(holiday=1, workingday=1)       # cross-field rule
+    records[5]['weekday'] = 2.5                      # fractional int
+    records[6].update(holiday=True, workingday=0)    # bool: accepted as 1
+    records[7]['windspeed'] = 1.5                    # out of range
+    records[8]['weathersit'] = 2.0                   # whole float: accepted
+
+    expected_valid, expected_errors = [], []
+    for index, record in enumerate(records):
+        try:
+            request = BikeRentalRequest(**record)
+            expected_valid.append([getattr(request, name) for name in batch_validator.fields])
+        except ValidationError as e:
+            expected_errors.append((index, e.errors()))
+
+    valid_indices, raw, errors = batch_validator.validate(records)
+    assert valid_indices == [0, 2, 6, 8, 9, 10, 11]
+    assert raw.dtype == np.float64
+    np.testing.assert_array_equal(raw, np.array(expected_valid, dtype=np.float64))
+    assert [(i, [(e['loc'], e['type'], e['msg']) for e in errs]) for i, errs in errors] == \
+        [(i, [(e['loc'], e['type'], e['msg']) for e in errs]) for i, errs in expected_errors]
+
+    # A value NumPy cannot read as a number sends the whole batch through pydantic
+    valid_indices, raw, errors = batch_validator.validate(records[:1] + [dict(records[0], temp=None)])
+    assert valid_indices == [0] and [i for i, _ in errors] == [1]
+    assert errors[0][1][0]['type'] == 'float_type'
+
+
+if __name__ == "__main__":
+    test_batch_validation()
+    print("All tests passed")
@@ -0,0 +1,18 @@
+"""
+Shared data helpers for the offline tests in api/test_*.py.
+"""
+
+import os
+
+import pandas as pd
+
+from api.features import FeatureTransform
+
+DAY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day.csv')
+HOUR_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hour.csv')
+
+
+def load_training_data():
+    """Feature matrix and target for day.csv, built with the shared transform"""
+    day_data = pd.read_csv(DAY_CSV)
+    return FeatureTransform().transform_frame(day_data), day_data['cnt'].to_numpy()
@@ -0,0 +1,248 @@
+"""
+Parallel model-selection pipeline.
+
+generate_models.py fits one configuration of each model on a single 80/20
+split. This pipeline selects the model with k-fold cross-validation over a
+hyperparameter grid per candidate:
+
+    load      build the feature matrix once, or memory-map it from the
+              preprocessing cache (api/feature_cache.py)
+    folds     hold out the test split, then fit one StandardScaler per CV fold
+              and cache the scaled fold matrices; every candidate reuses them
+    search    fit every (candidate, parameters, fold) task in a process pool
+    refit     refit the best configuration on the whole training split, with
+              all cores for a forest, and score it on the held-out test split
+    export    write the pickles and the model bundle the API loads
+
+The fold matrices are sent to each pool worker once, through the pool
+initializer, instead of with every task. Forests are fitted single-threaded
+inside the pool, because the pool already keeps every core busy, and use
+n_jobs=-1 for the final refit.
+
+    python -m api.training [--data day.csv] [--folds 5] [--jobs N] [--report report.json]
+"""
+
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid, train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from api.bundle import ARTIFACT_DIR, BUNDLE_DIR, HOURLY_ARTIFACT_DIR, HOURLY_BUNDLE_DIR, export_bundle
+from api.feature_cache import FEATURE_CACHE_DIR, default_feature_columns, load_training_matrix
+
+# Candidate models and the hyperparameter grid searched for each
+CANDIDATES = {
+    'Linear Regression': (LinearRegression, {}),
+    'Decision Tree': (DecisionTreeRegressor, {
+        'max_depth': [6, 8, 10, 12, 15],
+        'min_samples_leaf': [1, 5],
+        'random_state': [42],
+    }),
+    'Random Forest': (RandomForestRegressor, {
+        'n_estimators': [100, 200],
+        'max_depth': [10, 15],
+        'min_samples_leaf': [1, 5],
+        'random_state': [42],
+    }),
+}
+
+# Set in each pool worker by _init_worker: [(X_train_scaled, y_train, X_val_scaled, y_val), ...]
+_FOLDS = None
+
+
+class StageTimer:
+    """Wall-clock seconds per pipeline stage, in the order the stages ran."""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        yield
+        self.stages[name] = round(time.perf_counter() - started, 4)
+
+
+def _init_worker(folds):
+    global _FOLDS
+    _FOLDS = folds
+
+
+def _fit_fold(task):
+    """Fit one candidate configuration on one CV fold and score it on the held-out part"""
+    name, estimator, params, fold = task
+    X_train, y_train, X_val, y_val = _FOLDS[fold]
+    model = estimator(**params)
+    started = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+    pred = model.predict(X_val)
+    return name, params, fold, r2_score(y_val, pred), mean_absolute_error(y_val, pred), fit_seconds
+
+
+def build_folds(X, y, n_folds, random_state=42):
+    """Scale each CV fold with its own scaler (fitted on that fold's training part) once"""
+    folds = []
+    for train_index, val_index in KFold(n_folds, shuffle=True, random_state=random_state).split(X):
+        scaler = StandardScaler().fit(X[train_index])
+        folds.append((scaler.transform(X[train_index]), y[train_index],
+                      scaler.transform(X[val_index]), y[val_index]))
+    return folds
+
+
+def search_tasks(n_folds, candidates=CANDIDATES):
+    """Every (candidate, parameters, fold), most expensive candidates first for pool balance"""
+    tasks = []
+    for name in reversed(list(candidates)):
+        estimator, grid = candidates[name]
+        for params in ParameterGrid(grid):
+            tasks.extend((name, estimator, params, fold) for fold in range(n_folds))
+    return tasks
+
+
+def summarize(results):
+    """Mean/std of the fold scores for each configuration, best mean R² first"""
+    grouped = {}
+    for name, params, fold, r2, mae, fit_seconds in results:
+        key = (name, json.dumps(params, sort_keys=True))
+        grouped.setdefault(key, []).append((r2, mae, fit_seconds))
+    summary = []
+    for (name, params), scores in grouped.items():
+        r2, mae, fit_seconds = np.array(scores).T
+        summary.append({
+            'model': name,
+            'params': json.loads(params),
+            'cv_r2': float(r2.mean()),
+            'cv_r2_std': float(r2.std()),
+            'cv_mae': float(mae.mean()),
+            'fit_seconds': float(fit_seconds.sum()),
+        })
+    return sorted(summary, key=lambda entry: entry['cv_r2'], reverse=True)
+
+
+def run_search(folds, n_jobs, candidates=CANDIDATES):
+    tasks = search_tasks(len(folds), candidates)
+    if n_jobs == 1:
+        _init_worker(folds)
+        return [_fit_fold(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(folds,)) as pool:
+        return list(pool.map(_fit_fold, tasks))
+
+
+def run_pipeline(data_path, n_folds=5, n_jobs=None, test_size=0.2, artifact_dir=None, bundle_dir=None,
+                 save=True, candidates=CANDIDATES, cache_dir=FEATURE_CACHE_DIR):
+    """Run every stage and return the report dict (see the module docstring)"""
+    n_jobs = n_jobs or os.cpu_count() or 1
+    timer = StageTimer()
+
+    with timer.stage('load'):
+        feature_columns = default_feature_columns(data_path)
+        hourly = 'hr' in feature_columns
+        X, y, cached = load_training_matrix(data_path, feature_columns, cache_dir=cache_dir)
+
+    with timer.stage('folds'):
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+        folds = build_folds(X_train, y_train, n_folds)
+
+    with timer.stage('search'):
+        summary = summarize(run_search(folds, n_jobs, candidates))
+
+    with timer.stage('refit'):
+        best = summary[0]
+        scaler = StandardScaler().fit(X_train)
+        model = candidates[best['model']][0](**best['params'])
+        if hasattr(model, 'n_jobs'):
+            model.set_params(n_jobs=-1)
+        model.fit(scaler.transform(X_train), y_train)
+        if hasattr(model, 'n_jobs'):
+            model.set_params(n_jobs=None)
+        pred = model.predict(scaler.transform(X_test))
+        test_metrics = {'r2': float(r2_score(y_test, pred)), 'mae': float(mean_absolute_error(y_test, pred))}
+
+    report = {
+        'data': os.path.basename(data_path),
+        'rows': int(len(y)),
+        'feature_cache': cached,
+        'folds': n_folds,
+        'jobs': n_jobs,
+        'configurations': len(summary),
+        'best': dict(best, test=test_metrics),
+        'candidates': summary,
+        'stages': timer.stages,
+    }
+
+    if save:
+        with timer.stage('export'):
+            artifact_dir = artifact_dir or (HOURLY_ARTIFACT_DIR if hourly else ARTIFACT_DIR)
+            bundle_dir = bundle_dir or (HOURLY_BUNDLE_DIR if hourly else BUNDLE_DIR)
+            os.makedirs(artifact_dir, exist_ok=True)
+            for name, obj in (('best_model.pkl', model), ('scaler.pkl', scaler),
+                              ('feature_columns.pkl', feature_columns)):
+                with open(os.path.join(artifact_dir, name), 'wb') as f:
+                    pickle.dump(obj, f)
+            metrics = {'best_model': best['model'], 'params': best['params'], 'test_size': test_size,
+                       'cv_folds': n_folds, 'cv_r2': best['cv_r2'], 'test': test_metrics}
+            _, manifest = export_bundle(model, scaler, feature_columns, bundle_dir, metrics=metrics,
+                                        data_path=data_path, pickle_dir=artifact_dir)
+            report['bundle_version'] = manifest['version']
+            report['artifact_dir'] = os.path.abspath(artifact_dir)
+    return report
+
+
+def print_report(report, top=10):
+    print(f"\n📈 Cross-validation ({report['folds']} folds, {report['configurations']} configurations, "
+          f"{report['jobs']} workers)")
+    print(f"{'Model':<20} {'CV R²':>8} {'± std':>7} {'CV MAE':>9} {'fit (s)':>8}  Parameters")
+    print("-" * 90)
+    for entry in report['candidates'][:top]:
+        params = {k: v for k, v in entry['params'].items() if k != 'random_state'}
+        print(f"{entry['model']:<20} {entry['cv_r2']:>8.4f} {entry['cv_r2_std']:>7.4f} {entry['cv_mae']:>9.2f} "
+              f"{entry['fit_seconds']:>8.2f}  {params}")
+
+    best = report['best']
+    print(f"\n🏆 Best Model: {best['model']} {best['params']}")
+    print(f"Test R² Score: {best['test']['r2']:.4f}, MAE: {best['test']['mae']:.2f}")
+    if 'bundle_version' in report:
+        print(f"💾 Saved to {report['artifact_dir']} (bundle {report['bundle_version']})")
+
+    print("\n⏱️  Stage timings")
+    for stage, seconds in report['stages'].items():
+        print(f"   {stage:<8} {seconds:>8.2f}s")
+    print(f"   {'total':<8} {sum(report['stages'].values()):>8.2f}s")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Select and train the model with parallel k-fold CV")
+    parser.add_argument('--data', default='day.csv', help="day.csv or hour.csv (hourly model)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument('--no-save', action='store_true', help="report only, do not overwrite the model")
+    parser.add_argument('--report', help="also write the report as JSON to this path")
+    parser.add_argument('--no-cache', action='store_true', help="rebuild the feature matrix from the CSV")
+    args = parser.parse_args()
+
+    print(f"🚴 Training pipeline on {args.data}")
+    print("=" * 50)
+    report = run_pipeline(args.data, n_folds=args.folds, n_jobs=args.jobs, save=not args.no_save,
+                          cache_dir=None if args.no_cache else FEATURE_CACHE_DIR)
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput of the prediction API.
+
+Three measurements, all with request bodies built from day.csv rows:
+  stages      the /predict hot path taken apart in-process: validation,
+              feature build, scaling, inference, serialization
+  in-process  full requests through the ASGI app with Starlette's TestClient
+              (no network, one client)
+  sockets     `uvicorn api.api:app` in a subprocess driven over real HTTP
+              keep-alive connections by 1..N concurrent client threads, while
+              one more client polls GET /health: its latency shows whether
+              predictions stall the event loop (`--executor` picks the
+              server's INFERENCE_EXECUTOR)
+
+Each reports p50/p95/p99 latency and requests/s. The results are saved as
+JSON; `--compare` prints the change from an earlier result file, e.g. one
+saved on another commit. The prediction cache is off unless `--cache` is
+given, so every request reaches the model.
+
+Usage: python benchmarks/bench_api.py [--requests 2000] [--concurrency 1 4 16]
+                                      [--out bench_api.json] [--compare old.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from bench_cold_start import port_is_free
+
+from api.features import RAW_FEATURES
+from api.ingest import read_bike_csv
+
+BATCH_SIZE = 100
+
+
+def request_records(n, seed=0):
+    """n valid /predict bodies: day.csv rows with the weather jittered so they do not repeat"""
+    day_data = read_bike_csv(os.path.join(ROOT, 'day.csv'))
+    rng = np.random.default_rng(seed)
+    sample = day_data.iloc[rng.integers(0, len(day_data), n)]
+    records = {name: sample[name].to_numpy(dtype=np.int64).tolist() for name in RAW_FEATURES}
+    for name in ('temp', 'atemp', 'hum', 'windspeed'):
+        values = sample[name].to_numpy(dtype=np.float64) + rng.normal(0, 0.02, n)
+        records[name] = np.clip(values, 0, 1).round(6).tolist()
+    return [dict(zip(records, values)) for values in zip(*records.values())]
+
+
+def summarize(latencies, wall_seconds):
+    """p50/p95/p99/mean latency in ms and requests/s"""
+    latencies = np.asarray(latencies) * 1e3
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {'requests': int(len(latencies)), 'p50_ms': round(float(p50), 4), 'p95_ms': round(float(p95), 4),
+            'p99_ms': round(float(p99), 4), 'mean_ms': round(float(latencies.mean()), 4),
+            'rps': round(len(latencies) / wall_seconds, 1)}
+
+
+def endpoint_bodies(records):
+    """(path, list of JSON bodies) for every endpoint benchmarked"""
+    batches = [{'records': records[i:i + BATCH_SIZE]} for i in range(0, len(records), BATCH_SIZE)]
+    return {
+        '/predict': [json.dumps(record).encode() for record in records],
+        '/predict/batch': [json.dumps(batch).encode() for batch in batches],
+        '/predict/hourly': [json.dumps(record).encode() for record in records],
+    }
+
+
+def bench_stages(api, records):
+    """Time each stage of the /predict hot path separately, per request"""
+    from api.features import raw_from_records
+
+    loaded = api.model_registry.current
+    predictor = loaded.predictor
+    scaler = getattr(predictor, 'scaler', None)
+    model = getattr(predictor, 'model', None)
+    bodies = [json.dumps(record) for record in records]
+    stages = {name: [] for name in ('validation', 'feature_build', 'scaling', 'inference', 'serialization')}
+    clock = time.perf_counter
+    for body in bodies:
+        t0 = clock()
+        request = api.BikeRentalRequest.model_validate_json(body)
+        t1 = clock()
+        features = loaded.feature_transform.transform(raw_from_records([request]))
+        t2 = clock()
+        if scaler is not None:  # sklearn backend; the bundle backends fold scaling into inference
+            scaled = scaler.transform(features)
+            t3 = clock()
+            prediction = model.predict(scaled)[0]
+        else:
+            t3 = clock()
+            prediction = predictor.predict(features)[0]
+        t4 = clock()
+        api.BikeRentalResponse(predicted_rentals=max(0, int(prediction)), confidence=0.9,
+                               message=f"Predicted {int(prediction)} bike rentals for the given conditions",
+                               model_version=loaded.version).model_dump_json()
+        t5 = clock()
+        for name, seconds in zip(stages, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+            stages[name].append(seconds)
+    result = {}
+    for name, timings in stages.items():
+        timings = np.asarray(timings) * 1e6
+        result[name] = {'p50_us': round(float(np.median(timings)), 2),
+                        'p99_us': round(float(np.percentile(timings, 99)), 2)}
+    result['backend'] = predictor.kind
+    return result
+
+
+def bench_in_process(client, bodies):
+    """Sequential requests through the ASGI app, no sockets"""
+    results = {}
+    for path, payloads in bodies.items():
+        for payload in payloads[:10]:  # warm-up
+            client.post(path, content=payload, headers={'Content-Type': 'application/json'})
+        latencies = []
+        started = time.perf_counter()
+        for payload in payloads:
+            t0 = time.perf_counter()
+            response = client.post(path, content=payload, headers={'Content-Type': 'application/json'})
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+        results[path] = summarize(latencies, time.perf_counter() - started)
+    return results
+
+
+def drive_sockets(port, path, payloads, concurrency, probe_interval=0.005):
+    """
+    Send `payloads` from `concurrency` threads, each with its own keep-alive
+    connection, while another thread times GET /health every `probe_interval` seconds
+    """
+    shares = [payloads[i::concurrency] for i in range(concurrency)]
+    latencies = [[] for _ in range(concurrency)]
+    failures = []
+    health_latencies = []
+    done = threading.Event()
+
+    def probe():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            while not done.wait(probe_interval):
+                t0 = time.perf_counter()
+                connection.request('GET', '/health')
+                connection.getresponse().read()
+                health_latencies.append(time.perf_counter() - t0)
+        finally:
+            connection.close()
+
+    def client(index):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            for payload in shares[index]:
+                t0 = time.perf_counter()
+                connection.request('POST', path, body=payload, headers={'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                latencies[index].append(time.perf_counter() - t0)
+                if response.status != 200:
+                    failures.append(response.status)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    prober = threading.Thread(target=probe)
+    started = time.perf_counter()
+    prober.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    done.set()
+    prober.join()
+    stats = summarize([t for share in latencies for t in share], wall)
+    stats['failed'] = len(failures)  # 503s from a saturated inference executor
+    if health_latencies:
+        health = np.asarray(health_latencies) * 1e3
+        stats['health_p50_ms'] = round(float(np.median(health)), 4)
+        stats['health_p99_ms'] = round(float(np.percentile(health, 99)), 4)
+    return stats
+
+
+def bench_sockets(port, bodies, concurrency_levels, env):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api.api:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning', '--no-access-log'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.perf_counter() + 120
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                connection.request('GET', '/health')
+                ready = json.loads(connection.getresponse().read())['loader']['phase'] == 'ready'
+                connection.close()
+                if ready:
+                    break
+            except (ConnectionError, OSError):
+                pass
+            if time.perf_counter() > deadline:
+                raise TimeoutError("API not ready within 120s")
+            time.sleep(0.05)
+
+        results = {}
+        for path, payloads in bodies.items():
+            drive_sockets(port, path, payloads[:20], 1)  # warm-up
+            results[path] = {str(c): drive_sockets(port, path, payloads, c) for c in concurrency_levels}
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    stages = results['stages']
+    print(f"\n🔬 /predict stages in-process ({stages['backend']} backend), µs")
+    print(f"   {'stage':<15} {'p50':>9} {'p99':>9}")
+    for name, timing in stages.items():
+        if name != 'backend':
+            print(f"   {name:<15} {timing['p50_us']:>9.1f} {timing['p99_us']:>9.1f}")
+
+    header = f"   {'endpoint':<17} {'clients':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9}"
+    socket_header = header + f" {'failed':>7} {'health p99':>11}"
+    print("\n🧪 In-process (ASGI TestClient)")
+    print(header)
+    for path, stats in results['in_process'].items():
+        print(f"   {path:<17} {1:>7} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+              f"{stats['rps']:>9.1f}")
+    if results.get('sockets'):
+        print(f"\n🌐 Sockets (uvicorn, keep-alive connections, {results['executor']} executor)")
+        print(socket_header)
+        for path, levels in results['sockets'].items():
+            for clients, stats in levels.items():
+                print(f"   {path:<17} {clients:>7} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+                      f"{stats['p99_ms']:>8.2f} {stats['rps']:>9.1f} {stats['failed']:>7} "
+                      f"{stats.get('health_p99_ms', float('nan')):>8.2f} ms")
+
+
+def print_comparison(results, baseline):
+    """Relative change of p50 and requests/s against an earlier result file"""
+    print(f"\n📊 Compared with {baseline.get('commit')} ({baseline.get('created_at')})")
+    rows = [(f"in-process {path}", stats, baseline.get('in_process', {}).get(path))
+            for path, stats in results['in_process'].items()]
+    for path, levels in (results.get('sockets') or {}).items():
+        for clients, stats in levels.items():
+            rows.append((f"sockets {path} x{clients}", stats,
+                         (baseline.get('sockets') or {}).get(path, {}).get(clients)))
+    for label, stats, old in rows:
+        if old is None:
+            continue
+        p50 = (stats['p50_ms'] / old['p50_ms'] - 1) * 100
+        rps = (stats['rps'] / old['rps'] - 1) * 100
+        print(f"   {label:<32} p50 {p50:+6.1f}%   req/s {rps:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction API latency/throughput benchmark")
+    parser.add_argument('--requests', type=int, default=2000, help="requests per endpoint and client count")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--cache', action='store_true', help="leave the prediction cache on")
+    parser.add_argument('--executor', choices=['thread', 'process', 'inline'],
+                        help="INFERENCE_EXECUTOR for the API (default: the environment's, else thread)")
+    parser.add_argument('--no-sockets', action='store_true', help="skip the uvicorn measurements")
+    parser.add_argument('--out', default='bench_api.json', help="where to save the JSON results")
+    parser.add_argument('--compare', help="earlier result file to compare with")
+    args = parser.parse_args()
+
+    if not args.cache:
+        os.environ['PREDICTION_CACHE_SIZE'] = '0'
+    if args.executor:
+        os.environ['INFERENCE_EXECUTOR'] = args.executor
+    os.environ.setdefault('PYTHONWARNINGS', 'ignore')
+
+    # Imported after the environment is set: the API reads its settings at import time
+    from fastapi.testclient import TestClient
+
+    from api import api
+
+    records = request_records(args.requests)
+    bodies = endpoint_bodies(records)
+
+    print("⏱️  Prediction API benchmark")
+    print("=" * 60)
+    results = {
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'requests': args.requests,
+        'batch_size': BATCH_SIZE,
+        'prediction_cache': args.cache,
+        'executor': os.environ.get('INFERENCE_EXECUTOR', 'thread'),
+    }
+    with TestClient(api.app) as client:
+        results['model_version'] = api.model_registry.current.version
+        results['stages'] = bench_stages(api, records)
+        results['in_process'] = bench_in_process(client, bodies)
+
+    results['sockets'] = None
+    if not args.no_sockets:
+        if not port_is_free(args.port):
+            sys.exit(f"Port {args.port} is already in use")
+        results['sockets'] = bench_sockets(args.port, bodies, args.concurrency, dict(os.environ))
+
+    print_results(results)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📝 Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
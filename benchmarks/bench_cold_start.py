@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Measure API cold start: the time from launching `uvicorn api.api:app` to the
+first successful POST /predict, for the model bundle and the pickle files.
+
+Usage: python benchmarks/bench_cold_start.py [--runs 3] [--port 8765]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PREDICT_BODY = json.dumps({
+    "season": 2, "yr": 1, "mnth": 6, "holiday": 0, "weekday": 1,
+    "workingday": 1, "weathersit": 1, "temp": 0.5, "atemp": 0.5,
+    "hum": 0.6, "windspeed": 0.2, "day_of_year": 150, "month": 6, "day_of_week": 1
+}).encode()
+
+
+def port_is_free(port):
+    with socket.socket() as sock:
+        return sock.connect_ex(('127.0.0.1', port)) != 0
+
+
+def time_to_first_prediction(port, backend, timeout=120.0):
+    """Seconds from process launch to the first 200 from /predict, plus /health timings"""
+    env = dict(os.environ, MODEL_BACKEND=backend, PYTHONWARNINGS='ignore')
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api.api:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f'http://127.0.0.1:{port}'
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            request = urllib.request.Request(f'{url}/predict', data=PREDICT_BODY,
+                                             headers={'Content-Type': 'application/json'})
+            try:
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    if response.status == 200:
+                        elapsed = time.perf_counter() - started
+                        break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        else:
+            raise TimeoutError(f"No prediction within {timeout}s")
+        with urllib.request.urlopen(f'{url}/health', timeout=5) as response:
+            loader = json.load(response)['loader']
+        return elapsed, loader
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API cold-start benchmark")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    if not port_is_free(args.port):
+        sys.exit(f"Port {args.port} is already in use")
+
+    print("❄️  Cold start: launch -> first successful /predict")
+    print("=" * 60)
+    print(f"{'Backend':<10} {'first predict (ms)':>20} {'model load (ms)':>17} {'warm-up (ms)':>14}")
+    print("-" * 64)
+    for backend in ('auto', 'sklearn'):
+        results = [time_to_first_prediction(args.port, backend) for _ in range(args.runs)]
+        first = statistics.median(elapsed for elapsed, _ in results)
+        load = statistics.median(loader['timings']['load_seconds'] for _, loader in results)
+        warmup = statistics.median(loader['timings']['warmup_seconds'] for _, loader in results)
+        label = results[0][1]['source']
+        print(f"{label:<10} {first * 1e3:>20.0f} {load * 1e3:>17.1f} {warmup * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Compare loading the pickle files with loading the memory-mapped model bundle.
+Starts N worker processes per format, each loading the model and making one
+prediction like a uvicorn worker would, then reports the load time and the
+memory of all workers together. PSS (proportional set size) charges each
+shared page 1/N to every process that maps it, so it shows the saving from
+sharing the bundle's pages.
+
+Usage: python benchmarks/bench_model_loading.py [--workers 4]
+(Linux only: memory figures are read from /proc/<pid>/smaps_rollup)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+WORKER_CODE = r'''
+import json, os, sys, time
+start = time.perf_counter()
+import numpy as np
+sys.path.insert(0, {root!r})
+from api.features import FeatureTransform
+if {mode!r} == 'pickle':
+    import pickle
+    from api.predictors import SklearnPredictor
+    loaded = []
+    for name in ('best_model.pkl', 'scaler.pkl', 'feature_columns.pkl'):
+        with open(os.path.join({artifact_dir!r}, name), 'rb') as f:
+            loaded.append(pickle.load(f))
+    predictor = SklearnPredictor(*loaded)
+else:
+    from api.bundle import load_bundle
+    predictor, manifest = load_bundle({bundle_dir!r})
+features = FeatureTransform(predictor.feature_columns).transform(
+    [2, 1, 6, 0, 1, 1, 1, 0.5, 0.5, 0.6, 0.2, 150, 6, 1])
+predictor.predict(features)
+print(json.dumps({{"load_seconds": time.perf_counter() - start}}), flush=True)
+sys.stdin.read()
+'''
+
+
+def memory_kb(pid):
+    """Rss and Pss of a process in kB"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def run_workers(mode, n_workers, bundle_dir):
+    """Start n_workers loaders, wait until all have predicted, measure them"""
+    code = WORKER_CODE.format(root=ROOT, mode=mode, bundle_dir=bundle_dir,
+                              artifact_dir=os.path.dirname(bundle_dir))
+    env = dict(os.environ, PYTHONWARNINGS='ignore')
+    workers = [subprocess.Popen([sys.executable, '-c', code], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, text=True, env=env)
+               for _ in range(n_workers)]
+    try:
+        load_times = [json.loads(worker.stdout.readline())['load_seconds'] for worker in workers]
+        memory = [memory_kb(worker.pid) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+    return {
+        'mean_load_seconds': sum(load_times) / n_workers,
+        'total_rss_mb': sum(m['Rss'] for m in memory) / 1024,
+        'total_pss_mb': sum(m['Pss'] for m in memory) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    from api.bundle import BUNDLE_DIR
+    if not os.path.exists(BUNDLE_DIR):
+        print("Model bundle not found, exporting it from the pickle files first...")
+        subprocess.run([sys.executable, '-W', 'ignore', '-m', 'api.bundle'], cwd=ROOT, check=True)
+
+    print(f"📦 Model loading benchmark ({args.workers} workers per format)")
+    print("=" * 60)
+    print(f"{'Format':<10} {'load (ms)':>10} {'total RSS (MB)':>16} {'total PSS (MB)':>16}")
+    print("-" * 56)
+    for mode in ('pickle', 'bundle'):
+        result = run_workers(mode, args.workers, BUNDLE_DIR)
+        print(f"{mode:<10} {result['mean_load_seconds'] * 1e3:>10.1f} "
+              f"{result['total_rss_mb']:>16.1f} {result['total_pss_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    main()
+    print(f"\nDone in {time.perf_counter() - started:.1f}s")
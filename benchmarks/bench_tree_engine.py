@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the flat-array tree engine against sklearn's model.predict.
+Uses the pickled model in summative/linear_regression (or retrains a
+RandomForestRegressor on day.csv if the pickle is not a tree model) and
+checks that both produce bit-identical predictions before timing them.
+
+Usage: python benchmarks/bench_tree_engine.py
+"""
+
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from api.features import FeatureTransform
+from api.bundle import ARTIFACT_DIR
+from api.predictors import SklearnPredictor
+from api.tree_engine import FlatForestPredictor
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def load_tree_model():
+    """Pickled model and scaler, retrained as a forest if the winner is not a tree model"""
+    with open(os.path.join(ARTIFACT_DIR, 'best_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(ARTIFACT_DIR, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    if not (hasattr(model, 'tree_') or hasattr(model, 'estimators_')):
+        from sklearn.ensemble import RandomForestRegressor
+        day_data = pd.read_csv(os.path.join(ROOT, 'day.csv'))
+        X = FeatureTransform().transform_frame(day_data)
+        model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
+        model.fit(scaler.transform(X), day_data['cnt'].to_numpy())
+    return model, scaler
+
+
+def time_predict(predictor, X, min_time=0.5):
+    """Median seconds per predict call over at least `min_time` seconds"""
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(timings) < 3:
+        start = time.perf_counter()
+        predictor.predict(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    print("🌲 Flat tree engine benchmark")
+    print("=" * 60)
+    model, scaler = load_tree_model()
+    sklearn_predictor = SklearnPredictor(model, scaler)
+    flat_predictor = FlatForestPredictor.from_sklearn(model, scaler)
+    print(f"Model: {type(model).__name__}, {flat_predictor.n_trees} trees, "
+          f"{len(flat_predictor.value)} nodes, max depth {flat_predictor.max_depth}")
+
+    hour_data = pd.read_csv(os.path.join(ROOT, 'hour.csv'))
+    X_all = FeatureTransform().transform_frame(hour_data)
+
+    identical = np.array_equal(flat_predictor.predict(X_all), sklearn_predictor.predict(X_all))
+    print(f"Bit-identical to sklearn on hour.csv ({len(X_all)} rows): {identical}")
+
+    print(f"\n{'Batch':>8} {'sklearn (ms)':>14} {'flat (ms)':>12} {'speedup':>9}")
+    print("-" * 46)
+    for batch_size in BATCH_SIZES:
+        X = X_all[:batch_size]
+        sklearn_time = time_predict(sklearn_predictor, X)
+        flat_time = time_predict(flat_predictor, X)
+        print(f"{batch_size:>8} {sklearn_time * 1e3:>14.3f} {flat_time * 1e3:>12.3f} "
+              f"{sklearn_time / flat_time:>8.1f}x")
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
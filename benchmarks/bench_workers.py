@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Compare the preforking server (`python -m api.serve`) with 1 and N workers:
+aggregate memory of the supervisor and its workers after serving a load, and
+/predict throughput and latency under that load.
+
+RSS counts every shared page once per process. PSS charges each shared
+page 1/k to each of the k processes mapping it, so the PSS total shows what
+the workers really cost together once the model is shared copy-on-write.
+
+Usage: python benchmarks/bench_workers.py [--workers 1 4] [--requests 4000] [--concurrency 16]
+(Linux only: memory figures are read from /proc)
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from bench_api import drive_sockets, endpoint_bodies, request_records
+from bench_cold_start import port_is_free
+from bench_model_loading import memory_kb
+
+
+def process_tree(pid):
+    """pid and all its descendants"""
+    pids = [pid]
+    for parent in pids:
+        try:
+            with open(f'/proc/{parent}/task/{parent}/children') as f:
+                pids.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            pass
+    return pids
+
+
+def wait_until_ready(port, server, timeout=120.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"api.serve exited with code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/health')
+            ready = json.loads(connection.getresponse().read())['model_loaded']
+            connection.close()
+            if ready:
+                return
+        except (ConnectionError, OSError):
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"API not ready within {timeout}s")
+
+
+def measure(port, n_workers, payloads, concurrency):
+    env = dict(os.environ, PYTHONWARNINGS='ignore', PREDICTION_CACHE_SIZE='0')
+    server = subprocess.Popen([sys.executable, '-m', 'api.serve', '--host', '127.0.0.1', '--port', str(port),
+                               '--workers', str(n_workers), '--log-level', 'warning'],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, server)
+        drive_sockets(port, '/predict', payloads[:200], concurrency)  # warm up every worker
+        stats = drive_sockets(port, '/predict', payloads, concurrency)
+        pids = process_tree(server.pid)
+        memory = [memory_kb(pid) for pid in pids]
+        stats.update(processes=len(pids), rss_mb=round(sum(m['Rss'] for m in memory) / 1024, 1),
+                     pss_mb=round(sum(m['Pss'] for m in memory) / 1024, 1))
+        return stats
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and throughput of 1 vs N preforked workers")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, max(os.cpu_count() or 1, 2)])
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--out', help="also write the results as JSON to this path")
+    args = parser.parse_args()
+    if not port_is_free(args.port):
+        sys.exit(f"Port {args.port} is already in use")
+
+    payloads = endpoint_bodies(request_records(args.requests))['/predict']
+    print(f"🧮 Preforked workers: {args.requests} /predict requests from {args.concurrency} clients, "
+          f"{os.cpu_count()} CPUs")
+    print("=" * 78)
+    print(f"{'workers':>7} {'processes':>9} {'RSS MB':>8} {'PSS MB':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    print("-" * 78)
+    results = {}
+    for n_workers in args.workers:
+        stats = measure(args.port, n_workers, payloads, args.concurrency)
+        results[n_workers] = stats
+        print(f"{n_workers:>7} {stats['processes']:>9} {stats['rss_mb']:>8.1f} {stats['pss_mb']:>8.1f} "
+              f"{stats['rps']:>9.1f} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'cpus': os.cpu_count(), 'concurrency': args.concurrency, 'results': results}, f, indent=2)
+        print(f"\n📝 Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
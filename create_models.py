@@ -5,21 +5,21 @@ from sklearn.preprocessing import StandardScaler
 import pickle
 import os
 
+from api.bundle import export_bundle
+from api.features import FeatureTransform
+
 print("Creating model files...")
 
 # Load data
 df = pd.read_csv('day.csv')
 
-# Simple feature engineering
-df['temp_humidity'] = df['temp'] * df['hum']
-df['temp_windspeed'] = df['temp'] * df['windspeed']
-
 # Select features
 features = ['season', 'yr', 'mnth', 'holiday', 'weekday', 'workingday', 'weathersit',
            'temp', 'atemp', 'hum', 'windspeed', 'temp_humidity', 'temp_windspeed']
 
-X = df[features]
-y = df['cnt']
+# Simple feature engineering
+X = FeatureTransform(features).transform_frame(df)
+y = df['cnt'].to_numpy()
 
 # Train model
 model = RandomForestRegressor(n_estimators=50, random_state=42)
@@ -38,9 +38,12 @@ with open('summative/linear_regression/scaler.pkl', 'wb') as f:
     pickle.dump(scaler, f)
 with open('summative/linear_regression/feature_columns.pkl', 'wb') as f:
     pickle.dump(features, f)
+# The API serves the bundle, so it is rewritten along with the pickles
+_, manifest = export_bundle(model, scaler, features, data_path='day.csv', pickle_dir='summative/linear_regression')
 
 print("Model files created successfully!")
 print("Files saved:")
 print("- summative/linear_regression/best_model.pkl")
 print("- summative/linear_regression/scaler.pkl") 
-print("- summative/linear_regression/feature_columns.pkl") 
\ No newline at end of file
+print("- summative/linear_regression/feature_columns.pkl")
+print(f"- summative/linear_regression/model_bundle/ (version {manifest['version']})")
\ No newline at end of file
@@ -40,4 +40,6 @@ print("📁 Files created:")
 print("   - summative/linear_regression/best_model.pkl")
 print("   - summative/linear_regression/scaler.pkl")
 print("   - summative/linear_regression/feature_columns.pkl")
-print("\nNote: These are mock models for testing. Replace with real models for production.") 
\ No newline at end of file
+print("\nNote: These are mock models for testing. Replace with real models for production.")
+# A mock model has no bundle backend. The existing model_bundle/ was exported with another
+# best_model.pkl, so the API notices the mismatch and serves these pickles instead. 
\ No newline at end of file
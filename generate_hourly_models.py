@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Script to generate the hourly bike sharing prediction model from hour.csv
+This creates the model files needed for the API's /predict/hourly endpoint
+"""
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score, mean_absolute_error
+from sklearn.preprocessing import StandardScaler
+import pickle
+import os
+import time
+
+from api.features import HOURLY_FEATURE_COLUMNS, FeatureTransform
+from api.feature_cache import load_training_matrix
+from api.bundle import HOURLY_ARTIFACT_DIR, HOURLY_BUNDLE_DIR, export_bundle
+
+def main():
+    print("🚴 Generating Hourly Bike Sharing Prediction Model...")
+    print("=" * 50)
+
+    try:
+        # 1-2. Load and preprocess the dataset: the same shared transform as the
+        # daily model, plus `hr`. Cached as .npy files keyed by the CSV contents
+        # and the feature list, and memory-mapped on later runs.
+        print("📊 Loading dataset...")
+        print("\n🔧 Preprocessing data...")
+        feature_columns = list(HOURLY_FEATURE_COLUMNS)
+        feature_transform = FeatureTransform(feature_columns)
+
+        X, y, cached = load_training_matrix('hour.csv', feature_columns)
+        if cached:
+            print("Using the cached feature matrix")
+
+        print(f"Feature matrix shape: {X.shape}")
+        print(f"Target variable shape: {y.shape}")
+
+        # 3. Data splitting and scaling
+        print("\n⚖️ Splitting and scaling data...")
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+        # 4. Train models. With 24x the rows of day.csv the forest builds its
+        # trees on all CPU cores (n_jobs=-1). 50 trees with min_samples_leaf=5
+        # score within 0.002 R² of 100 unrestricted ones on this data at a quarter
+        # of the size, which keeps the committed bundle small.
+        print("\n🤖 Training models...")
+        candidates = {
+            'Linear Regression': LinearRegression(),
+            'Decision Tree': DecisionTreeRegressor(random_state=42, max_depth=12, min_samples_leaf=5),
+            'Random Forest': RandomForestRegressor(n_estimators=50, random_state=42, max_depth=12,
+                                                   min_samples_leaf=5, n_jobs=-1),
+        }
+        results = {}
+        for name, model in candidates.items():
+            started = time.perf_counter()
+            model.fit(X_train_scaled, y_train)
+            fit_seconds = time.perf_counter() - started
+            pred = model.predict(X_test_scaled)
+            results[name] = {'r2': r2_score(y_test, pred), 'mae': mean_absolute_error(y_test, pred),
+                             'fit_seconds': round(fit_seconds, 3)}
+
+        # 5. Compare models
+        print("\n📈 Model Comparison:")
+        print(f"{'Model':<20} {'R² Score':<10} {'MAE':<10} {'Fit (s)':<10}")
+        print("-" * 50)
+        for name, result in results.items():
+            print(f"{name:<20} {result['r2']:<10.4f} {result['mae']:<10.2f} {result['fit_seconds']:<10.2f}")
+
+        # 6. Select best model
+        best_model_name = max(results, key=lambda name: results[name]['r2'])
+        best_model = candidates[best_model_name]
+        if hasattr(best_model, 'n_jobs'):
+            best_model.n_jobs = None  # serving predicts a day at a time, no process pool needed
+
+        print(f"\n🏆 Best Model: {best_model_name}")
+        print(f"R² Score: {results[best_model_name]['r2']:.4f}")
+
+        # 7. Save models using pickle, in the same layout as the daily model
+        print("\n💾 Saving models with pickle...")
+        os.makedirs(HOURLY_ARTIFACT_DIR, exist_ok=True)
+        with open(os.path.join(HOURLY_ARTIFACT_DIR, 'best_model.pkl'), 'wb') as f:
+            pickle.dump(best_model, f)
+        with open(os.path.join(HOURLY_ARTIFACT_DIR, 'scaler.pkl'), 'wb') as f:
+            pickle.dump(scaler, f)
+        with open(os.path.join(HOURLY_ARTIFACT_DIR, 'feature_columns.pkl'), 'wb') as f:
+            pickle.dump(feature_columns, f)
+
+        metrics = {
+            'best_model': best_model_name,
+            'test_size': 0.2,
+            'candidates': results,
+        }
+        bundle_predictor, manifest = export_bundle(best_model, scaler, feature_columns, HOURLY_BUNDLE_DIR,
+                                                   metrics=metrics, data_path='hour.csv',
+                                                   pickle_dir=HOURLY_ARTIFACT_DIR)
+        deviation = np.max(np.abs(bundle_predictor.predict(X_test) - best_model.predict(X_test_scaled)))
+        print("✅ Models saved successfully!")
+        print("📁 Files created:")
+        print("   - summative/linear_regression/hourly/best_model.pkl")
+        print("   - summative/linear_regression/hourly/scaler.pkl")
+        print("   - summative/linear_regression/hourly/feature_columns.pkl")
+        print("   - summative/linear_regression/hourly/model_bundle/")
+        print(f"Bundle {manifest['version']} ({manifest['model_type']}) max deviation from sklearn: {deviation:.2e}")
+
+        # 8. Test prediction: a whole 24-hour profile in one call
+        print("\n🧪 Testing prediction function...")
+        day = np.array([2, 1, 6, 0, 1, 1, 1, 0.5, 0.5, 0.6, 0.2, 150, 6, 1])
+        raw = np.column_stack([np.tile(day, (24, 1)), np.arange(24)])
+        profile = best_model.predict(scaler.transform(feature_transform.transform(raw)))
+        print(f"24-hour profile: {int(profile.sum())} rentals, peak at {int(np.argmax(profile))}:00 "
+              f"({int(profile.max())} rentals)")
+
+        print("\n🎉 Hourly model generation completed successfully!")
+        print("=" * 50)
+
+    except Exception as e:
+        print(f"❌ Error during model generation: {e}")
+        print("Please make sure all required packages are installed:")
+        print("pip install pandas numpy scikit-learn")
+
+if __name__ == "__main__":
+    main()
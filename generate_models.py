@@ -4,7 +4,6 @@ Script to generate bike sharing prediction models using pickle
 This creates the model files needed for the API
 """
 
-import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
@@ -15,52 +14,29 @@ from sklearn.preprocessing import StandardScaler
 import pickle
 import os
 
+from api.features import FEATURE_COLUMNS, FeatureTransform
+from api.feature_cache import load_training_matrix
+from api.bundle import export_bundle
+from api.climatology import ClimatologyIndex, save_climatology
+
 def main():
     print("🚴 Generating Bike Sharing Prediction Models...")
     print("=" * 50)
     
     try:
-        # 1. Load the dataset
+        # 1-2. Load the dataset and preprocess it: the raw inputs, the calendar
+        # columns derived from dteday and the interaction/seasonal features,
+        # built with the shared transform. The result is cached as .npy files
+        # keyed by the CSV contents and the feature list, and memory-mapped
+        # on later runs.
         print("📊 Loading dataset...")
-        day_data = pd.read_csv('day.csv')
-        print(f"Dataset shape: {day_data.shape}")
-        
-        # 2. Data preprocessing
         print("\n🔧 Preprocessing data...")
-        df = day_data.copy()
-        
-        # Drop instant column
-        df = df.drop('instant', axis=1)
-        
-        # Convert dteday to datetime
-        df['dteday'] = pd.to_datetime(df['dteday'])
-        
-        # Extract additional temporal features
-        df['day_of_year'] = df['dteday'].dt.dayofyear
-        df['month'] = df['dteday'].dt.month
-        df['day_of_week'] = df['dteday'].dt.dayofweek
-        
-        # Create interaction features
-        df['temp_humidity'] = df['temp'] * df['hum']
-        df['temp_windspeed'] = df['temp'] * df['windspeed']
-        df['weather_temp'] = df['weathersit'] * df['temp']
-        
-        # Create seasonal temperature features
-        df['spring_temp'] = (df['season'] == 1) * df['temp']
-        df['summer_temp'] = (df['season'] == 2) * df['temp']
-        df['fall_temp'] = (df['season'] == 3) * df['temp']
-        df['winter_temp'] = (df['season'] == 4) * df['temp']
+        feature_columns = list(FEATURE_COLUMNS)
+        feature_transform = FeatureTransform(feature_columns)
         
-        # Select features for modeling
-        feature_columns = [
-            'season', 'yr', 'mnth', 'holiday', 'weekday', 'workingday', 'weathersit',
-            'temp', 'atemp', 'hum', 'windspeed', 'day_of_year', 'month', 'day_of_week',
-            'temp_humidity', 'temp_windspeed', 'weather_temp',
-            'spring_temp', 'summer_temp', 'fall_temp', 'winter_temp'
-        ]
-        
-        X = df[feature_columns]
-        y = df['cnt']
+        X, y, cached = load_training_matrix('day.csv', feature_columns)
+        if cached:
+            print("Using the cached feature matrix")
         
         print(f"Feature matrix shape: {X.shape}")
         print(f"Target variable shape: {y.shape}")
@@ -138,26 +114,35 @@ def main():
         print("   - summative/linear_regression/scaler.pkl")
         print("   - summative/linear_regression/feature_columns.pkl")
         
+        # Export the serving bundle: numeric arrays the API memory-maps, plus a
+        # manifest with the feature order, model type, metrics and data hash
+        metrics = {
+            'best_model': best_model_name,
+            'test_size': 0.2,
+            'candidates': {
+                'Linear Regression': {'r2': lr_r2, 'mae': lr_mae},
+                'Decision Tree': {'r2': dt_r2, 'mae': dt_mae},
+                'Random Forest': {'r2': rf_r2, 'mae': rf_mae},
+            },
+        }
+        bundle_predictor, manifest = export_bundle(best_model, scaler, feature_columns,
+                                                   metrics=metrics, data_path='day.csv',
+                                                   pickle_dir='summative/linear_regression')
+        deviation = np.max(np.abs(bundle_predictor.predict(X_test) - best_model.predict(X_test_scaled)))
+        print("   - summative/linear_regression/model_bundle/")
+        print(f"Bundle {manifest['version']} ({manifest['model_type']}) max deviation from sklearn: {deviation:.2e}")
+
+        # The weather climatology the API serves next to the model (fills in missing weather fields)
+        save_climatology(ClimatologyIndex.from_csv('day.csv', 'hour.csv'))
+        print("   - summative/linear_regression/climatology/")
+        
         # 8. Test prediction function
         print("\n🧪 Testing prediction function...")
         
-        # Test data
+        # Test data: raw inputs in RAW_FEATURES order
         test_features = np.array([2, 1, 6, 0, 1, 1, 1, 0.5, 0.5, 0.6, 0.2, 150, 6, 1])
         
-        # Create interaction features
-        temp_humidity = 0.5 * 0.6
-        temp_windspeed = 0.5 * 0.2
-        weather_temp = 1 * 0.5
-        spring_temp = 0
-        summer_temp = 0.5
-        fall_temp = 0
-        winter_temp = 0
-        
-        all_features = np.concatenate([test_features, [temp_humidity, temp_windspeed, weather_temp,
-                                                       spring_temp, summer_temp, fall_temp, winter_temp]])
-        
-        features_reshaped = all_features.reshape(1, -1)
-        features_scaled = scaler.transform(features_reshaped)
+        features_scaled = scaler.transform(feature_transform.transform(test_features))
         prediction = best_model.predict(features_scaled)[0]
         
         print(f"Test prediction: {int(prediction)} bike rentals")
@@ -14,6 +14,9 @@ from sklearn.preprocessing import StandardScaler
 import pickle
 import os
 
+from api.bundle import export_bundle
+from api.features import FEATURE_COLUMNS, FeatureTransform
+
 def main():
     print("🚴 Starting Bike Sharing Demand Prediction Analysis...")
     print("=" * 60)
@@ -26,40 +29,13 @@ def main():
         
         # 2. Data preprocessing
         print("\n🔧 Preprocessing data...")
-        df = day_data.copy()
-        
-        # Drop instant column
-        df = df.drop('instant', axis=1)
-        
-        # Convert dteday to datetime
-        df['dteday'] = pd.to_datetime(df['dteday'])
-        
-        # Extract additional temporal features
-        df['day_of_year'] = df['dteday'].dt.dayofyear
-        df['month'] = df['dteday'].dt.month
-        df['day_of_week'] = df['dteday'].dt.dayofweek
-        
-        # Create interaction features
-        df['temp_humidity'] = df['temp'] * df['hum']
-        df['temp_windspeed'] = df['temp'] * df['windspeed']
-        df['weather_temp'] = df['weathersit'] * df['temp']
+        # Build the raw inputs, the calendar columns derived from dteday and the
+        # interaction/seasonal features in one pass with the shared transform
+        feature_columns = list(FEATURE_COLUMNS)
+        feature_transform = FeatureTransform(feature_columns)
         
-        # Create seasonal temperature features
-        df['spring_temp'] = (df['season'] == 1) * df['temp']
-        df['summer_temp'] = (df['season'] == 2) * df['temp']
-        df['fall_temp'] = (df['season'] == 3) * df['temp']
-        df['winter_temp'] = (df['season'] == 4) * df['temp']
-        
-        # Select features for modeling
-        feature_columns = [
-            'season', 'yr', 'mnth', 'holiday', 'weekday', 'workingday', 'weathersit',
-            'temp', 'atemp', 'hum', 'windspeed', 'day_of_year', 'month', 'day_of_week',
-            'temp_humidity', 'temp_windspeed', 'weather_temp',
-            'spring_temp', 'summer_temp', 'fall_temp', 'winter_temp'
-        ]
-        
-        X = df[feature_columns]
-        y = df['cnt']
+        X = feature_transform.transform_frame(day_data)
+        y = day_data['cnt'].to_numpy()
         
         print(f"Feature matrix shape: {X.shape}")
         print(f"Target variable shape: {y.shape}")
@@ -130,33 +106,24 @@ def main():
             pickle.dump(scaler, f)
         with open('summative/linear_regression/feature_columns.pkl', 'wb') as f:
             pickle.dump(feature_columns, f)
+        # The API serves the bundle, so it is rewritten along with the pickles
+        _, manifest = export_bundle(best_model, scaler, feature_columns, data_path='day.csv',
+                                    pickle_dir='summative/linear_regression')
         
         print("✅ Models saved successfully!")
         print("📁 Files created:")
         print("   - summative/linear_regression/best_model.pkl")
         print("   - summative/linear_regression/scaler.pkl")
         print("   - summative/linear_regression/feature_columns.pkl")
+        print(f"   - summative/linear_regression/model_bundle/ (version {manifest['version']})")
         
         # 8. Test prediction function
         print("\n🧪 Testing prediction function...")
         
-        # Test data
+        # Test data: raw inputs in RAW_FEATURES order
         test_features = np.array([2, 1, 6, 0, 1, 1, 1, 0.5, 0.5, 0.6, 0.2, 150, 6, 1])
         
-        # Create interaction features
-        temp_humidity = 0.5 * 0.6
-        temp_windspeed = 0.5 * 0.2
-        weather_temp = 1 * 0.5
-        spring_temp = 0
-        summer_temp = 0.5
-        fall_temp = 0
-        winter_temp = 0
-        
-        all_features = np.concatenate([test_features, [temp_humidity, temp_windspeed, weather_temp,
-                                                       spring_temp, summer_temp, fall_temp, winter_temp]])
-        
-        features_reshaped = all_features.reshape(1, -1)
-        features_scaled = scaler.transform(features_reshaped)
+        features_scaled = scaler.transform(feature_transform.transform(test_features))
         prediction = best_model.predict(features_scaled)[0]
         
         print(f"Test prediction: {int(prediction)} bike rentals")